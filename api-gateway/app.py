@@ -1,11 +1,30 @@
-from flask import Flask, request, jsonify
-import requests
-import jwt
+from flask import Flask, request, jsonify, g
+import math
 import os
-from flasgger import Swagger
+import sys
+from contextvars import copy_context
+from concurrent.futures import ThreadPoolExecutor
+from upstream import STREAM_CHUNK_SIZE, UpstreamClient, passthrough_headers
+from resilience import UpstreamUnavailable
+from singleflight import SingleFlight
+from batch import BatchItemError, parse_items, resolve, run_bounded
+from ratelimit import RATE_LIMIT_ENABLED, client_address
+from common import (SECRET_KEY, UNLIMITED_PATHS, decode_token, endpoint_source, hedger, is_catalogue_path,
+                    rate_limiter, route_group, shedder, spaces_cache, token_cache, tracer)
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from shared.apidocs import setup_apidocs  # noqa: E402
+from shared.compression import compress_responses, negotiate, precompressed  # noqa: E402
+from shared.fastjson import loads, use_fast_json  # noqa: E402
+from shared.metrics import instrument, record_upstream  # noqa: E402
+from shared.tracing import client_span, trace_requests  # noqa: E402
 
 app = Flask(__name__)
-app.config['SECRET_KEY'] = 'secret-key'
+use_fast_json(app)
+instrument(app, 'api-gateway')
+trace_requests(app, 'api-gateway', tracer=tracer)
+compress_responses(app)
+app.config['SECRET_KEY'] = SECRET_KEY
 
 # Configuração do Swagger
 swagger_config = {
@@ -35,171 +54,264 @@ swagger_template = {
     "schemes": ["http"]
 }
 
-swagger = Swagger(app, config=swagger_config, template=swagger_template)
-
-USE_DOCKER = os.getenv('USE_DOCKER', 'false').lower() == 'true'
-
-if USE_DOCKER:
-    SERVICES = {
-        'ms-usuarios': 'http://ms-usuarios:5001',
-        'ms-espacos': 'http://ms-espacos:5002',
-        'ms-reservas': 'http://ms-reservas:5003',
-        'ms-pagamentos': 'http://ms-pagamentos:5004',
-        'ms-precos': 'http://ms-precos:5005',
-        'ms-checkin': 'http://ms-checkin:5006',
-        'ms-notificacoes': 'http://ms-notificacoes:5007',
-        'ms-financeiro': 'http://ms-financeiro:5008',
-        'ms-analytics': 'http://ms-analytics:5009'
-    }
-else:
-    SERVICES = {
-        'ms-usuarios': 'http://localhost:5001',
-        'ms-espacos': 'http://localhost:5002',
-        'ms-reservas': 'http://localhost:5003',
-        'ms-pagamentos': 'http://localhost:5004',
-        'ms-precos': 'http://localhost:5005',
-        'ms-checkin': 'http://localhost:5006',
-        'ms-notificacoes': 'http://localhost:5007',
-        'ms-financeiro': 'http://localhost:5008',
-        'ms-analytics': 'http://localhost:5009'
-    }
+swagger = setup_apidocs(app, config=swagger_config, template=swagger_template)
+
+upstream = UpstreamClient(endpoint_source.current, hedger=hedger, source=endpoint_source,
+                          observer=record_upstream, span=client_span)
+inflight = SingleFlight()
+bff_executor = ThreadPoolExecutor(max_workers=int(os.getenv('BFF_WORKERS', '32')), thread_name_prefix='bff')
+
+def on_worker_init(worker):
+    """Chamado pelo gunicorn_conf em cada worker: o descarte passa a contar a fila do gthread."""
+    # Com N threads só N requisições chegam ao handler; as demais esperam na fila do pool do worker
+    work_queue = getattr(getattr(worker, 'tpool', None), '_work_queue', None)
+    if work_queue is not None:
+        shedder.queued = work_queue.qsize
+
+def service_unavailable(error=None):
+    # Recusas do circuit breaker/bulkhead informam quando vale a pena tentar de novo
+    response = jsonify({'error': 'Service unavailable'})
+    response.status_code = 503
+    if isinstance(error, UpstreamUnavailable):
+        response.headers['Retry-After'] = str(max(1, math.ceil(error.retry_after)))
+    return response
+
+def proxy_response(response):
+    # Repassa status, cabeçalhos e bytes do microsserviço em blocos, sem decodificar o JSON
+    def body():
+        try:
+            for chunk in response.raw.stream(STREAM_CHUNK_SIZE, decode_content=False):
+                yield chunk
+        finally:
+            response.close()
+
+    proxied = app.response_class(body(), status=response.status_code, headers=passthrough_headers(response.headers))
+    # Em HEAD, 204 e 304 o Werkzeug nem começa o gerador, então o finally acima não roda: a
+    # conexão, o bulkhead e o balanceador são liberados no fechamento da resposta (idempotente)
+    proxied.call_on_close(response.close)
+    return proxied
+
+def buffered_response(response):
+    return app.response_class(response.content, status=response.status_code,
+                              headers=passthrough_headers(response.headers))
+
+def coalesced_get(service, path, params=None, query=b'', scope=None):
+    # GETs idênticos simultâneos compartilham uma única chamada ao microsserviço.
+    # scope separa respostas que dependem de quem pede (ex.: o token repassado ao upstream).
+    key = (service, path, query, scope)
+    return inflight.do(key, lambda: upstream.get(service, path, params=params, hedge=True))
+
+def fetch_spaces(path, key, params=None, query=b''):
+    # Catálogo vem do cache; no miss, uma única chamada ao ms-espacos preenche o cache
+    entry = spaces_cache.get(key)
+    if entry is not None:
+        return entry, None
+    # Uma escrita que invalide o cache durante a busca não pode ser desfeita pelo corpo antigo:
+    # a geração separa as buscas coalescidas e impede a gravação se mudou no meio
+    generation = spaces_cache.generation
+    response = coalesced_get('ms-espacos', path, params=params, query=query, scope=generation)
+    if response.status_code != 200:
+        return None, response
+    entry = spaces_cache.put(key, response.content, response.headers.get('Content-Type', 'application/json'),
+                             generation=generation)
+    return entry, None
 
 def verify_token():
-    token = request.headers.get('Authorization', '').replace('Bearer ', '')
-    if not token:
-        return None
-    try:
-        return jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-    except:
+    # Uma única verificação por requisição, reaproveitada pelos handlers
+    if 'token_claims' not in g:
+        g.token_claims = decode_token(request.headers.get('Authorization', ''))
+    return g.token_claims
+
+def rate_limit_identity(claims):
+    if claims and 'user_id' in claims:
+        return f"id:{claims['user_id']}"
+    return f"ip:{client_address(request.remote_addr, request.headers.get('X-Forwarded-For'))}"
+
+@app.before_request
+def admission_control():
+    if request.path in UNLIMITED_PATHS:
         return None
+    # Descarta cedo quando o gateway já está cheio, em vez de deixar a requisição esperar até o timeout
+    if not shedder.enter():
+        response = jsonify({'error': 'Gateway overloaded'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+    g.admitted = True
+
+    if RATE_LIMIT_ENABLED:
+        retry_after = rate_limiter.check(rate_limit_identity(verify_token()), route_group(request.path))
+        if retry_after:
+            response = jsonify({'error': 'Too many requests'})
+            response.status_code = 429
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+    return None
+
+@app.teardown_request
+def admission_release(error=None):
+    if g.pop('admitted', False):
+        shedder.leave()
 
 @app.route('/auth/<path:endpoint>', methods=['GET', 'POST'])
 def auth_proxy(endpoint):
-    url = f"{SERVICES['ms-usuarios']}/auth/{endpoint}"
-    print(url)
     try:
-        response = requests.request(
-            method=request.method,
-            url=url,
+        response = upstream.request(
+            'ms-usuarios',
+            request.method,
+            f"/auth/{endpoint}",
+            stream=True,
             headers={'Content-Type': 'application/json'},
             json=request.get_json() if request.is_json else None,
             params=request.args
         )
-        return response.json(), response.status_code
-    except:
-        return jsonify({'error': 'Service unavailable'}), 503
+        return proxy_response(response)
+    except Exception as error:
+        return service_unavailable(error)
 
 @app.route('/users/<path:endpoint>', methods=['GET', 'POST', 'PUT', 'DELETE'])
 def users_proxy(endpoint):
     if not verify_token():
         return jsonify({'error': 'Unauthorized'}), 401
     
-    url = f"{SERVICES['ms-usuarios']}/users/{endpoint}"
     try:
-        response = requests.request(
-            method=request.method,
-            url=url,
+        response = upstream.request(
+            'ms-usuarios',
+            request.method,
+            f"/users/{endpoint}",
+            stream=True,
             headers={k: v for k, v in request.headers if k.lower() != 'host'},
             json=request.get_json() if request.is_json else None,
             params=request.args
         )
-        return response.json(), response.status_code
-    except:
-        return jsonify({'error': 'Service unavailable'}), 503
+        return proxy_response(response)
+    except Exception as error:
+        return service_unavailable(error)
+
+def cached_spaces_response(path):
+    # Leituras do catálogo são servidas do cache; só o miss vai ao ms-espacos
+    entry, error_response = fetch_spaces(path, request.full_path, request.args, request.query_string)
+    if error_response is not None:
+        return buffered_response(error_response)
+
+    # A versão comprimida de cada entrada é gerada uma vez e servida pronta nas leituras seguintes
+    encoding = negotiate(entry.content_type, len(entry.body), request.headers.get('Accept-Encoding'))
+    if request.if_none_match.contains_weak(entry.etag):
+        response = app.response_class(status=304)
+    elif encoding is None:
+        response = app.response_class(entry.body, status=200, content_type=entry.content_type)
+    else:
+        response = app.response_class(precompressed(entry.variants, entry.body, encoding), status=200,
+                                      content_type=entry.content_type)
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(entry.etag, weak=encoding is not None)
+    response.cache_control.max_age = spaces_cache.max_age(entry)
+    return response
 
 @app.route('/spaces', methods=['GET'])
 def spaces_get():
-    url = f"{SERVICES['ms-espacos']}/spaces"
     try:
-        response = requests.get(url)
-        return response.json(), response.status_code
-    except:
-        return jsonify({'error': 'Service unavailable'}), 503
+        return cached_spaces_response("/spaces")
+    except Exception as error:
+        return service_unavailable(error)
 
 @app.route('/spaces', methods=['POST'])
 def spaces_create():
-    if not verify_token():
+    claims = verify_token()
+    if not claims:
         return jsonify({'error': 'Unauthorized'}), 401
+    if claims.get('role') != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
     
-    token = request.headers.get('Authorization', '').replace('Bearer ', '')
     try:
-        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        if data.get('role') != 'admin':
-            return jsonify({'error': 'Admin access required'}), 403
-    except:
-        return jsonify({'error': 'Invalid token'}), 401
-    
-    url = f"{SERVICES['ms-espacos']}/spaces"
-    try:
-        response = requests.post(url, json=request.get_json())
-        return response.json(), response.status_code
-    except:
-        return jsonify({'error': 'Service unavailable'}), 503
+        response = upstream.post('ms-espacos', "/spaces", json=request.get_json(), stream=True)
+        spaces_cache.invalidate()
+        return proxy_response(response)
+    except Exception as error:
+        return service_unavailable(error)
 
 @app.route('/spaces/<path:endpoint>', methods=['GET', 'POST', 'PUT', 'DELETE'])
 def spaces_proxy(endpoint):
-    url = f"{SERVICES['ms-espacos']}/spaces/{endpoint}"
+    if request.method == 'GET' and endpoint.isdigit():
+        try:
+            return cached_spaces_response(f"/spaces/{endpoint}")
+        except Exception as error:
+            return service_unavailable(error)
+
     try:
-        response = requests.request(
-            method=request.method,
-            url=url,
+        response = upstream.request(
+            'ms-espacos',
+            request.method,
+            f"/spaces/{endpoint}",
+            stream=True,
             headers={'Content-Type': 'application/json'},
             json=request.get_json() if request.is_json else None,
             params=request.args
         )
-        return response.json(), response.status_code
-    except:
-        return jsonify({'error': 'Service unavailable'}), 503
+        if request.method != 'GET':
+            spaces_cache.invalidate()
+        return proxy_response(response)
+    except Exception as error:
+        return service_unavailable(error)
 
 @app.route('/reservations', methods=['GET', 'POST'])
 @app.route('/reservations/<path:endpoint>', methods=['GET', 'POST', 'PUT', 'DELETE'])
 def reservations_proxy(endpoint=''):
-    if not verify_token():
+    claims = verify_token()
+    if not claims:
         return jsonify({'error': 'Unauthorized'}), 401
+    # A consulta por período traz reservas de todos os usuários: só para o admin, como /admin/reservations
+    if not endpoint and request.method in ('GET', 'HEAD') and claims.get('role') != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
     
-    url = f"{SERVICES['ms-reservas']}/reservations" + (f"/{endpoint}" if endpoint else "")
+    path = "/reservations" + (f"/{endpoint}" if endpoint else "")
     try:
-        response = requests.request(
-            method=request.method,
-            url=url,
+        response = upstream.request(
+            'ms-reservas',
+            request.method,
+            path,
+            stream=True,
             headers={k: v for k, v in request.headers if k.lower() != 'host'},
             json=request.get_json() if request.is_json else None,
             params=request.args
         )
-        return response.json(), response.status_code
-    except:
-        return jsonify({'error': 'Service unavailable'}), 503
+        return proxy_response(response)
+    except Exception as error:
+        return service_unavailable(error)
 
 @app.route('/payments/<path:endpoint>', methods=['POST'])
 def payments_proxy(endpoint):
     if not verify_token():
         return jsonify({'error': 'Unauthorized'}), 401
     
-    url = f"{SERVICES['ms-pagamentos']}/payments/{endpoint}"
     try:
-        response = requests.request(
-            method=request.method,
-            url=url,
+        response = upstream.request(
+            'ms-pagamentos',
+            request.method,
+            f"/payments/{endpoint}",
+            stream=True,
             headers={'Content-Type': 'application/json'},
             json=request.get_json()
         )
-        return response.json(), response.status_code
-    except:
-        return jsonify({'error': 'Service unavailable'}), 503
+        return proxy_response(response)
+    except Exception as error:
+        return service_unavailable(error)
 
 @app.route('/pricing/<path:endpoint>', methods=['POST'])
 def pricing_proxy(endpoint):
-    url = f"{SERVICES['ms-precos']}/pricing/{endpoint}"
     try:
-        response = requests.request(
-            method=request.method,
-            url=url,
+        response = upstream.request(
+            'ms-precos',
+            request.method,
+            f"/pricing/{endpoint}",
+            stream=True,
             headers={'Content-Type': 'application/json'},
             json=request.get_json()
         )
-        return response.json(), response.status_code
-    except:
-        return jsonify({'error': 'Service unavailable'}), 503
+        return proxy_response(response)
+    except Exception as error:
+        return service_unavailable(error)
 
 @app.route('/checkin/<int:reservation_id>', methods=['POST'])
 @app.route('/checkout/<int:reservation_id>', methods=['POST'])
@@ -208,89 +320,194 @@ def checkin_proxy(reservation_id):
         return jsonify({'error': 'Unauthorized'}), 401
     
     endpoint = 'checkin' if 'checkin' in request.path else 'checkout'
-    url = f"{SERVICES['ms-checkin']}/{endpoint}/{reservation_id}"
     try:
-        response = requests.post(url)
-        return response.json(), response.status_code
-    except:
-        return jsonify({'error': 'Service unavailable'}), 503
+        response = upstream.post('ms-checkin', f"/{endpoint}/{reservation_id}", stream=True)
+        return proxy_response(response)
+    except Exception as error:
+        return service_unavailable(error)
 
 @app.route('/analytics/<path:endpoint>', methods=['GET'])
 def analytics_proxy(endpoint):
     if not verify_token():
         return jsonify({'error': 'Unauthorized'}), 401
     
-    url = f"{SERVICES['ms-analytics']}/analytics/{endpoint}"
     try:
-        response = requests.get(url)
-        return response.json(), response.status_code
-    except:
-        return jsonify({'error': 'Service unavailable'}), 503
+        return buffered_response(coalesced_get('ms-analytics', f"/analytics/{endpoint}", query=request.query_string))
+    except Exception as error:
+        return service_unavailable(error)
 
 @app.route('/financial/<path:endpoint>', methods=['GET'])
 def financial_proxy(endpoint):
     if not verify_token():
         return jsonify({'error': 'Unauthorized'}), 401
     
-    url = f"{SERVICES['ms-financeiro']}/financial/{endpoint}"
     try:
-        response = requests.get(url)
-        return response.json(), response.status_code
-    except:
-        return jsonify({'error': 'Service unavailable'}), 503
+        return buffered_response(coalesced_get('ms-financeiro', f"/financial/{endpoint}", query=request.query_string))
+    except Exception as error:
+        return service_unavailable(error)
 
 @app.route('/notify/<path:endpoint>', methods=['POST'])
 def notify_proxy(endpoint):
-    url = f"{SERVICES['ms-notificacoes']}/notify/{endpoint}"
     try:
-        response = requests.post(url, json=request.get_json())
-        return response.json(), response.status_code
-    except:
-        return jsonify({'error': 'Service unavailable'}), 503
+        response = upstream.post('ms-notificacoes', f"/notify/{endpoint}", json=request.get_json(), stream=True)
+        return proxy_response(response)
+    except Exception as error:
+        return service_unavailable(error)
 
 @app.route('/admin/users', methods=['GET'])
 def admin_users():
-    if not verify_token():
+    claims = verify_token()
+    if not claims:
         return jsonify({'error': 'Unauthorized'}), 401
+    if claims.get('role') != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
     
-    token = request.headers.get('Authorization', '').replace('Bearer ', '')
     try:
-        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        if data.get('role') != 'admin':
-            return jsonify({'error': 'Admin access required'}), 403
-    except:
-        return jsonify({'error': 'Invalid token'}), 401
-    
-    url = f"{SERVICES['ms-usuarios']}/admin/users"
-    try:
-        response = requests.get(url)
-        return response.json(), response.status_code
-    except:
-        return jsonify({'error': 'Service unavailable'}), 503
+        response = upstream.get('ms-usuarios', "/admin/users", stream=True)
+        return proxy_response(response)
+    except Exception as error:
+        return service_unavailable(error)
 
 @app.route('/admin/reservations', methods=['GET'])
 def admin_reservations():
-    if not verify_token():
+    claims = verify_token()
+    if not claims:
         return jsonify({'error': 'Unauthorized'}), 401
+    if claims.get('role') != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
     
-    token = request.headers.get('Authorization', '').replace('Bearer ', '')
     try:
-        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        if data.get('role') != 'admin':
-            return jsonify({'error': 'Admin access required'}), 403
-    except:
-        return jsonify({'error': 'Invalid token'}), 401
-    
-    url = f"{SERVICES['ms-reservas']}/admin/reservations"
+        # Filtros, cursor e format=ndjson seguem para o ms-reservas; a exportação é repassada em blocos
+        response = upstream.get('ms-reservas', "/admin/reservations", params=request.args, stream=True)
+        return proxy_response(response)
+    except Exception as error:
+        return service_unavailable(error)
+
+def upstream_json(service, path, **kwargs):
+    response = upstream.get(service, path, hedge=True, **kwargs)
+    return response.status_code, loads(response.content)
+
+def spaces_json():
+    # '/spaces?' é a mesma chave que request.full_path gera para GET /spaces
+    entry, error_response = fetch_spaces("/spaces", '/spaces?')
+    if error_response is not None:
+        return error_response.status_code, loads(error_response.content)
+    return 200, loads(entry.body)
+
+def compose(parts):
+    # Todas as chamadas saem ao mesmo tempo: a página espera só pela dependência mais lenta
+    # Cada chamada leva uma cópia do contexto da requisição, para continuar o mesmo trace
+    futures = {name: bff_executor.submit(copy_context().run, fetch) for name, fetch in parts.items()}
+    document = {}
+    errors = {}
+    for name, future in futures.items():
+        try:
+            status, body = future.result()
+        except Exception:
+            status, body = 503, None
+        document[name] = body
+        if status >= 400:
+            errors[name] = status
+    if errors:
+        document['errors'] = errors
+        return jsonify(document), 502
+    return jsonify(document)
+
+@app.route('/bff/admin-dashboard', methods=['GET'])
+def bff_admin_dashboard():
+    claims = verify_token()
+    if not claims:
+        return jsonify({'error': 'Unauthorized'}), 401
+    if claims.get('role') != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+
+    return compose({
+        'analytics': lambda: upstream_json('ms-analytics', "/analytics/dashboard"),
+        'spaces': spaces_json,
+        'revenue': lambda: upstream_json('ms-financeiro', "/financial/revenue")
+    })
+
+@app.route('/bff/reservations', methods=['GET'])
+def bff_reservations():
+    claims = verify_token()
+    if not claims:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    # O user_id do token dispensa esperar por /users/me antes de buscar as reservas
+    headers = {'Authorization': request.headers['Authorization']}
+    return compose({
+        'user': lambda: upstream_json('ms-usuarios', "/users/me", headers=headers),
+        'reservations': lambda: upstream_json('ms-reservas', f"/reservations/user/{claims['user_id']}",
+                                              headers=headers)
+    })
+
+@app.route('/bff/financial', methods=['GET'])
+def bff_financial():
+    if not verify_token():
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    return compose({
+        'revenue': lambda: upstream_json('ms-financeiro', "/financial/revenue"),
+        'expenses': lambda: upstream_json('ms-financeiro', "/financial/expenses")
+    })
+
+def batch_item(item, claims, authorization):
+    method = str(item.get('method', 'GET')).upper()
+    path = item['path']
     try:
-        response = requests.get(url)
-        return response.json(), response.status_code
-    except:
-        return jsonify({'error': 'Service unavailable'}), 503
+        service = resolve(method, path, claims)
+        path_only, _, query = path.partition('?')
+        if method == 'GET' and is_catalogue_path(path_only):
+            entry, response = fetch_spaces(path, f'{path_only}?{query}')
+            if entry is not None:
+                return {'status': 200, 'body': loads(entry.body)}
+        else:
+            headers = {'Content-Type': 'application/json'}
+            if authorization:
+                headers['Authorization'] = authorization
+            response = upstream.request(service, method, path, headers=headers, json=item.get('body'))
+            if service == 'ms-espacos' and method != 'GET':
+                spaces_cache.invalidate()
+    except BatchItemError as error:
+        return {'status': error.status, 'body': {'error': error.message}}
+    except Exception:
+        return {'status': 503, 'body': {'error': 'Service unavailable'}}
+
+    try:
+        body = loads(response.content)
+    except ValueError:
+        body = response.text
+    return {'status': response.status_code, 'body': body}
+
+@app.route('/batch', methods=['POST'])
+def batch():
+    try:
+        items = parse_items(request.get_json(silent=True))
+    except BatchItemError as error:
+        return jsonify({'error': error.message}), error.status
+
+    # Token verificado uma vez para o lote; cada item só confere as regras de acesso da sua rota
+    claims = verify_token()
+    authorization = request.headers.get('Authorization') if claims else None
+    tasks = [lambda item=item: batch_item(item, claims, authorization) for item in items]
+    return jsonify(run_bounded(bff_executor, tasks))
 
 @app.route('/health')
 def health():
     return jsonify({'status': 'healthy'})
 
+@app.route('/gateway/stats')
+def gateway_stats():
+    return jsonify({
+        'upstreams': upstream.stats(),
+        'token_cache': token_cache.stats(),
+        'spaces_cache': spaces_cache.stats(),
+        'coalescing': inflight.stats(),
+        'rate_limit': rate_limiter.stats(),
+        'load_shedding': shedder.stats(),
+        'hedging': hedger.stats() if hedger is not None else None,
+        'endpoints': endpoint_source.stats()
+    })
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8000, debug=True)
\ No newline at end of file
@@ -0,0 +1,655 @@
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from functools import partial
+
+import aiohttp
+from aiohttp import web
+from aiohttp.helpers import ETag
+
+from common import (UNLIMITED_PATHS, decode_token, endpoint_source, hedger, is_catalogue_path, rate_limiter,
+                    route_group, shedder, spaces_cache, token_cache, tracer)
+from batch import BATCH_CONCURRENCY, BatchItemError, parse_items, resolve
+from ratelimit import RATE_LIMIT_ENABLED, client_address
+from shared.compression import (COMPRESSION_ENABLED, StreamCompressor, choose_encoding, compress,
+                                compressible, negotiate, precompressed, weak_etag)
+from shared.fastjson import dumps, loads
+from shared.metrics import CONTENT_TYPE, METRICS_PATH, record_upstream, registry, request_finished, request_started
+from shared.tracing import TRACE_ID_HEADER, TRACEPARENT, client_span
+from balancer import Balancer
+from upstream import merge_headers
+from resilience import BULKHEAD_MAX_CONCURRENCY, Bulkhead, CircuitBreaker, UpstreamUnavailable
+from singleflight import AsyncSingleFlight
+from upstream import CONNECT_TIMEOUT, MAX_IDLE, READ_TIMEOUT, STREAM_CHUNK_SIZE, passthrough_headers
+
+# No modo assíncrono cada conexão parada custa só uma corrotina, então o limite é maior
+ASYNC_POOL_SIZE = int(os.getenv('UPSTREAM_ASYNC_POOL_SIZE', '200'))
+
+# Respostas serializadas pelo mesmo encoder do modo Flask
+json_response = partial(web.json_response, dumps=dumps)
+
+HOP_BY_HOP = {'host', 'content-length', 'transfer-encoding', 'connection'}
+
+
+class AsyncUpstreamClient:
+    """Versão não bloqueante do UpstreamClient, com uma sessão aiohttp por microsserviço."""
+
+    def __init__(self, services, pool_size=ASYNC_POOL_SIZE, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, max_idle=MAX_IDLE, hedger=None, source=None):
+        self.balancers = {name: Balancer(name, urls) for name, urls in services.items()}
+        self.hedger = hedger
+        self.source = source
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.max_idle = max_idle
+        self.sessions = {}
+        self.counters = {name: {'in_use': 0, 'waits': 0, 'requests': 0} for name in services}
+        self.breakers = {name: CircuitBreaker(name) for name in services}
+        # Como no UpstreamClient, o bulkhead nunca admite mais chamadas que as conexões do pool
+        self.bulkheads = {name: Bulkhead(name, max_concurrent=min(BULKHEAD_MAX_CONCURRENCY, pool_size)) for name in services}
+
+    async def start(self):
+        for name in self.balancers:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=self.max_idle)
+            # Corpo repassado sem decodificar, como no UpstreamClient
+            self.sessions[name] = aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                                        auto_decompress=False,
+                                                        headers={'Accept-Encoding': 'identity'})
+
+    async def close(self):
+        for session in self.sessions.values():
+            await session.close()
+
+    def refresh_endpoints(self):
+        services = self.source.poll() if self.source is not None else None
+        if services:
+            for name, urls in services.items():
+                if name in self.balancers:
+                    self.balancers[name].update(urls)
+
+    @asynccontextmanager
+    async def open(self, service, method, path, tried=None, **kwargs):
+        self.refresh_endpoints()
+        breaker = self.breakers[service]
+        bulkhead = self.bulkheads[service]
+        bulkhead.acquire()
+        try:
+            breaker.before_call()
+        except BaseException:
+            bulkhead.release()
+            raise
+
+        balancer = self.balancers[service]
+        try:
+            endpoint = balancer.choose(tried or ())
+        except BaseException:
+            breaker.cancel()
+            bulkhead.release()
+            raise
+        counters = self.counters[service]
+        if counters['in_use'] >= self.pool_size:
+            counters['waits'] += 1
+        counters['in_use'] += 1
+        counters['requests'] += 1
+        started = time.monotonic()
+        recorded = False
+        success = False
+        if tried is not None:
+            tried.add(endpoint.url)
+        try:
+            url = endpoint.url + path
+            with client_span(service, method, path) as trace_headers:
+                kwargs['headers'] = merge_headers(kwargs.get('headers'), trace_headers)
+                async with self.sessions[service].request(method, url, **kwargs) as response:
+                    elapsed = time.monotonic() - started
+                    breaker.record(response.status < 500, elapsed)
+                    record_upstream(service, response.status, elapsed)
+                    recorded = True
+                    success = response.status < 500
+                    yield response
+        except asyncio.CancelledError:
+            # Tentativa cancelada (ex. a perdedora do hedging): não diz nada sobre o microsserviço
+            if not recorded:
+                breaker.cancel()
+                success = None
+            raise
+        except BaseException:
+            if not recorded:
+                elapsed = time.monotonic() - started
+                breaker.record(False, elapsed)
+                record_upstream(service, 'error', elapsed)
+            raise
+        finally:
+            balancer.release(endpoint, success)
+            counters['in_use'] -= 1
+            bulkhead.release()
+
+    async def fetch(self, service, method, path, hedge=False, **kwargs):
+        tried = set()
+
+        async def attempt():
+            async with self.open(service, method, path, tried=tried, **kwargs) as response:
+                body = await response.read()
+                return response.status, response.headers, body
+
+        if hedge and method == 'GET' and self.hedger is not None:
+            return await self.hedger.run_async(service, attempt)
+        return await attempt()
+
+    def stats(self):
+        return {
+            name: dict(counters, pool_size=self.pool_size, breaker=self.breakers[name].stats(),
+                       bulkhead=self.bulkheads[name].stats(), balancer=self.balancers[name].stats())
+            for name, counters in self.counters.items()
+        }
+
+
+UPSTREAM = web.AppKey('upstream', AsyncUpstreamClient)
+INFLIGHT = web.AppKey('inflight', AsyncSingleFlight)
+# Claims do token da requisição; RequestKey só existe a partir do aiohttp 3.12
+TOKEN_CLAIMS = web.RequestKey('token_claims', object) if hasattr(web, 'RequestKey') else 'gateway.token_claims'
+
+
+def json_error(message, status):
+    return json_response({'error': message}, status=status)
+
+
+def service_unavailable(error=None):
+    response = json_error('Service unavailable', 503)
+    if isinstance(error, UpstreamUnavailable):
+        response.headers['Retry-After'] = str(max(1, math.ceil(error.retry_after)))
+    return response
+
+
+def forwarded_headers(request):
+    return {k: v for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP}
+
+
+async def json_body(request):
+    # Equivalente a request.get_json() if request.is_json else None no modo Flask
+    if request.content_type == 'application/json' and request.can_read_body:
+        return await request.read()
+    return None
+
+
+async def forward(request, service, path, headers=None, body=None, params=None):
+    # Repassa status, cabeçalhos e bytes do microsserviço em blocos, sem decodificar o JSON
+    client = request.app[UPSTREAM]
+    response = None
+    try:
+        async with client.open(service, request.method, path, headers=headers, data=body,
+                               params=params) as upstream_response:
+            response = web.StreamResponse(status=upstream_response.status,
+                                          headers=passthrough_headers(upstream_response.headers))
+            # Mesma compressão em blocos do modo Flask: o repasse continua sem buffer
+            compressor = None
+            if request.method != 'HEAD':
+                encoding = negotiate(upstream_response.content_type, upstream_response.content_length,
+                                     request.headers.get('Accept-Encoding'), upstream_response.status,
+                                     upstream_response.headers)
+                if encoding is not None:
+                    compressor = StreamCompressor(encoding)
+                    response.headers.popall('Content-Length', None)
+                    response.headers['Content-Encoding'] = encoding
+                    response.headers.add('Vary', 'Accept-Encoding')
+            await response.prepare(request)
+            async for chunk in upstream_response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                await response.write(compressor.compress(chunk) if compressor else chunk)
+            if compressor:
+                await response.write(compressor.finish())
+            await response.write_eof()
+            return response
+    except Exception as error:
+        if response is not None and response.prepared:
+            raise
+        return service_unavailable(error)
+
+
+async def coalesced_fetch(request, service, path, params=None, query='', scope=None):
+    # Mesma chave do modo Flask: serviço, caminho, query e escopo de autenticação
+    key = (service, path, query, scope)
+    client = request.app[UPSTREAM]
+    return await request.app[INFLIGHT].do(key, lambda: client.fetch(service, 'GET', path, hedge=True, params=params))
+
+
+async def buffered(request, service, path):
+    try:
+        status, headers, content = await coalesced_fetch(request, service, path, query=request.query_string)
+    except Exception as error:
+        return service_unavailable(error)
+    return web.Response(body=content, status=status, headers=passthrough_headers(headers))
+
+
+def require_token(request):
+    # Mesmo efeito do flask.g no modo Flask: uma verificação por requisição
+    if TOKEN_CLAIMS not in request:
+        request[TOKEN_CLAIMS] = decode_token(request.headers.get('Authorization', ''))
+    return request[TOKEN_CLAIMS]
+
+
+def require_admin(request):
+    # Mesmas respostas de erro do modo Flask: 401 sem token e 403 sem role admin
+    claims = require_token(request)
+    if not claims:
+        return json_error('Unauthorized', 401)
+    if claims.get('role') != 'admin':
+        return json_error('Admin access required', 403)
+    return None
+
+
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+
+async def auth_proxy(request):
+    endpoint = request.match_info['endpoint']
+    return await forward(request, 'ms-usuarios', f"/auth/{endpoint}", headers=JSON_HEADERS,
+                         body=await json_body(request), params=request.query)
+
+
+async def users_proxy(request):
+    if not require_token(request):
+        return json_error('Unauthorized', 401)
+    endpoint = request.match_info['endpoint']
+    return await forward(request, 'ms-usuarios', f"/users/{endpoint}", headers=forwarded_headers(request),
+                         body=await json_body(request), params=request.query)
+
+
+async def fetch_spaces(request, path, key, params=None, query=''):
+    # Catálogo vem do cache; no miss, uma única chamada ao ms-espacos preenche o cache
+    entry = spaces_cache.get(key)
+    if entry is not None:
+        return entry, None
+    # Mesma proteção do modo Flask contra gravar um corpo buscado antes de uma invalidação
+    generation = spaces_cache.generation
+    status, headers, content = await coalesced_fetch(request, 'ms-espacos', path, params=params, query=query,
+                                                     scope=generation)
+    if status != 200:
+        return None, web.Response(body=content, status=status, headers=passthrough_headers(headers))
+    return spaces_cache.put(key, content, headers.get('Content-Type', 'application/json'), generation=generation), None
+
+
+async def cached_spaces(request, path):
+    # Mesmo cache com ETag do modo Flask; a chave segue o formato de request.full_path do Flask
+    key = f'{request.path}?{request.query_string}'
+    try:
+        entry, error_response = await fetch_spaces(request, path, key, request.query, request.query_string)
+    except Exception as error:
+        return service_unavailable(error)
+    if error_response is not None:
+        return error_response
+
+    encoding = negotiate(entry.content_type, len(entry.body), request.headers.get('Accept-Encoding'))
+    if any(tag.value in (entry.etag, '*') for tag in request.if_none_match or ()):
+        response = web.Response(status=304)
+    elif encoding is None:
+        response = web.Response(body=entry.body, headers={'Content-Type': entry.content_type})
+    else:
+        response = web.Response(body=precompressed(entry.variants, entry.body, encoding),
+                                headers={'Content-Type': entry.content_type, 'Content-Encoding': encoding})
+    response.headers.add('Vary', 'Accept-Encoding')
+    response.etag = ETag(value=entry.etag, is_weak=encoding is not None)
+    response.headers['Cache-Control'] = f'max-age={spaces_cache.max_age(entry)}'
+    return response
+
+
+async def spaces_get(request):
+    return await cached_spaces(request, "/spaces")
+
+
+async def spaces_create(request):
+    error = require_admin(request)
+    if error:
+        return error
+    response = await forward(request, 'ms-espacos', "/spaces", headers=JSON_HEADERS, body=await request.read())
+    spaces_cache.invalidate()
+    return response
+
+
+async def spaces_proxy(request):
+    endpoint = request.match_info['endpoint']
+    if request.method == 'GET' and endpoint.isdigit():
+        return await cached_spaces(request, f"/spaces/{endpoint}")
+    response = await forward(request, 'ms-espacos', f"/spaces/{endpoint}", headers=JSON_HEADERS,
+                             body=await json_body(request), params=request.query)
+    if request.method != 'GET':
+        spaces_cache.invalidate()
+    return response
+
+
+async def reservations_proxy(request):
+    if not require_token(request):
+        return json_error('Unauthorized', 401)
+    endpoint = request.match_info.get('endpoint', '')
+    # A consulta por período traz reservas de todos os usuários: só para o admin, como /admin/reservations
+    if not endpoint and request.method == 'GET':
+        error = require_admin(request)
+        if error:
+            return error
+    path = "/reservations" + (f"/{endpoint}" if endpoint else "")
+    return await forward(request, 'ms-reservas', path, headers=forwarded_headers(request),
+                         body=await json_body(request), params=request.query)
+
+
+async def payments_proxy(request):
+    if not require_token(request):
+        return json_error('Unauthorized', 401)
+    endpoint = request.match_info['endpoint']
+    return await forward(request, 'ms-pagamentos', f"/payments/{endpoint}", headers=JSON_HEADERS,
+                         body=await request.read())
+
+
+async def pricing_proxy(request):
+    endpoint = request.match_info['endpoint']
+    return await forward(request, 'ms-precos', f"/pricing/{endpoint}", headers=JSON_HEADERS,
+                         body=await request.read())
+
+
+async def checkin_proxy(request):
+    if not require_token(request):
+        return json_error('Unauthorized', 401)
+    endpoint = 'checkin' if 'checkin' in request.path else 'checkout'
+    reservation_id = request.match_info['reservation_id']
+    return await forward(request, 'ms-checkin', f"/{endpoint}/{reservation_id}")
+
+
+async def analytics_proxy(request):
+    if not require_token(request):
+        return json_error('Unauthorized', 401)
+    return await buffered(request, 'ms-analytics', f"/analytics/{request.match_info['endpoint']}")
+
+
+async def financial_proxy(request):
+    if not require_token(request):
+        return json_error('Unauthorized', 401)
+    return await buffered(request, 'ms-financeiro', f"/financial/{request.match_info['endpoint']}")
+
+
+async def notify_proxy(request):
+    endpoint = request.match_info['endpoint']
+    return await forward(request, 'ms-notificacoes', f"/notify/{endpoint}", headers=JSON_HEADERS,
+                         body=await request.read())
+
+
+async def admin_users(request):
+    error = require_admin(request)
+    if error:
+        return error
+    return await forward(request, 'ms-usuarios', "/admin/users")
+
+
+async def admin_reservations(request):
+    error = require_admin(request)
+    if error:
+        return error
+    return await forward(request, 'ms-reservas', "/admin/reservations", params=request.query)
+
+
+async def upstream_json(request, service, path, headers=None):
+    status, _, content = await request.app[UPSTREAM].fetch(service, 'GET', path, hedge=True, headers=headers)
+    return status, loads(content)
+
+
+async def spaces_json(request):
+    entry, error_response = await fetch_spaces(request, "/spaces", '/spaces?')
+    if error_response is not None:
+        return error_response.status, loads(error_response.body)
+    return 200, loads(entry.body)
+
+
+async def compose(parts):
+    # Todas as chamadas saem ao mesmo tempo: a página espera só pela dependência mais lenta
+    results = await asyncio.gather(*parts.values(), return_exceptions=True)
+    document = {}
+    errors = {}
+    for name, result in zip(parts, results):
+        status, body = (503, None) if isinstance(result, Exception) else result
+        document[name] = body
+        if status >= 400:
+            errors[name] = status
+    if errors:
+        document['errors'] = errors
+        return json_response(document, status=502)
+    return json_response(document)
+
+
+async def bff_admin_dashboard(request):
+    error = require_admin(request)
+    if error:
+        return error
+    return await compose({
+        'analytics': upstream_json(request, 'ms-analytics', "/analytics/dashboard"),
+        'spaces': spaces_json(request),
+        'revenue': upstream_json(request, 'ms-financeiro', "/financial/revenue")
+    })
+
+
+async def bff_reservations(request):
+    claims = require_token(request)
+    if not claims:
+        return json_error('Unauthorized', 401)
+    headers = {'Authorization': request.headers['Authorization']}
+    return await compose({
+        'user': upstream_json(request, 'ms-usuarios', "/users/me", headers=headers),
+        'reservations': upstream_json(request, 'ms-reservas', f"/reservations/user/{claims['user_id']}",
+                                      headers=headers)
+    })
+
+
+async def bff_financial(request):
+    if not require_token(request):
+        return json_error('Unauthorized', 401)
+    return await compose({
+        'revenue': upstream_json(request, 'ms-financeiro', "/financial/revenue"),
+        'expenses': upstream_json(request, 'ms-financeiro', "/financial/expenses")
+    })
+
+
+async def batch_item(request, item, claims, authorization):
+    method = str(item.get('method', 'GET')).upper()
+    path = item['path']
+    try:
+        service = resolve(method, path, claims)
+        path_only, _, query = path.partition('?')
+        if method == 'GET' and is_catalogue_path(path_only):
+            entry, error_response = await fetch_spaces(request, path, f'{path_only}?{query}')
+            if entry is not None:
+                return {'status': 200, 'body': loads(entry.body)}
+            status, content = error_response.status, error_response.body
+        else:
+            headers = {'Content-Type': 'application/json'}
+            if authorization:
+                headers['Authorization'] = authorization
+            body = dumps(item['body']) if item.get('body') is not None else None
+            status, _, content = await request.app[UPSTREAM].fetch(service, method, path, headers=headers, data=body)
+            if service == 'ms-espacos' and method != 'GET':
+                spaces_cache.invalidate()
+    except BatchItemError as error:
+        return {'status': error.status, 'body': {'error': error.message}}
+    except Exception:
+        return {'status': 503, 'body': {'error': 'Service unavailable'}}
+
+    try:
+        body = loads(content)
+    except ValueError:
+        body = content.decode(errors='replace')
+    return {'status': status, 'body': body}
+
+
+async def batch(request):
+    try:
+        items = parse_items(await request.json())
+    except ValueError:
+        return json_error('Expected a non-empty list of requests', 400)
+    except BatchItemError as error:
+        return json_error(error.message, error.status)
+
+    # Token verificado uma vez para o lote; o semáforo limita as chamadas simultâneas do lote
+    claims = require_token(request)
+    authorization = request.headers.get('Authorization') if claims else None
+    limit = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run(item):
+        async with limit:
+            return await batch_item(request, item, claims, authorization)
+
+    return json_response(await asyncio.gather(*(run(item) for item in items)))
+
+
+async def health(request):
+    return json_response({'status': 'healthy'})
+
+
+async def gateway_stats(request):
+    return json_response({
+        'upstreams': request.app[UPSTREAM].stats(),
+        'token_cache': token_cache.stats(),
+        'spaces_cache': spaces_cache.stats(),
+        'coalescing': request.app[INFLIGHT].stats(),
+        'rate_limit': rate_limiter.stats(),
+        'load_shedding': shedder.stats(),
+        'hedging': hedger.stats() if hedger is not None else None,
+        'endpoints': endpoint_source.stats()
+    })
+
+
+@web.middleware
+async def request_metrics(request, handler):
+    # Mesmas métricas e spans por rota do instrument() e trace_requests() usados nos apps Flask
+    if request.path == METRICS_PATH:
+        return await handler(request)
+    resource = request.match_info.route.resource
+    route = resource.canonical if resource is not None else 'unmatched'
+    started = time.perf_counter()
+    status = 500
+    request_started('api-gateway')
+    span, token = tracer.start(f'{request.method} {route}', 'server',
+                               traceparent=request.headers.get(TRACEPARENT), path=request.path)
+    try:
+        response = await handler(request)
+        status = response.status
+        if not response.prepared:
+            response.headers[TRACE_ID_HEADER] = span.trace_id
+        return response
+    except web.HTTPException as error:
+        status = error.status
+        raise
+    finally:
+        span.attributes['status'] = status
+        tracer.finish(span, token)
+        request_finished('api-gateway', request.method, route, status, time.perf_counter() - started)
+
+
+@web.middleware
+async def compression(request, handler):
+    # Mesmo critério do compress_responses() dos apps Flask, para as respostas com buffer
+    response = await handler(request)
+    if not COMPRESSION_ENABLED or request.method == 'HEAD' or response.prepared:
+        return response
+    body = getattr(response, 'body', None)
+    if not isinstance(body, bytes) or not compressible(response.status, response.content_type, response.headers,
+                                                       len(body)):
+        return response
+    response.headers.add('Vary', 'Accept-Encoding')
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    if encoding is not None:
+        response.body = compress(body, encoding)
+        response.headers['Content-Encoding'] = encoding
+        if 'ETag' in response.headers:
+            response.headers['ETag'] = weak_etag(response.headers['ETag'])
+    return response
+
+
+async def metrics(request):
+    return web.Response(body=registry.render().encode(), headers={'Content-Type': CONTENT_TYPE})
+
+
+@web.middleware
+async def admission_control(request, handler):
+    # Mesmo controle de admissão do modo Flask: descarte por fila cheia e limites por token bucket
+    if request.path in UNLIMITED_PATHS:
+        return await handler(request)
+    if not shedder.enter():
+        response = json_error('Gateway overloaded', 503)
+        response.headers['Retry-After'] = '1'
+        return response
+    try:
+        if RATE_LIMIT_ENABLED:
+            claims = require_token(request)
+            if claims and 'user_id' in claims:
+                identity = f"id:{claims['user_id']}"
+            else:
+                identity = f"ip:{client_address(request.remote, request.headers.get('X-Forwarded-For'))}"
+            retry_after = rate_limiter.check(identity, route_group(request.path))
+            if retry_after:
+                response = json_error('Too many requests', 429)
+                response.headers['Retry-After'] = str(retry_after)
+                return response
+        return await handler(request)
+    finally:
+        shedder.leave()
+
+
+def create_app(services=None):
+    """Cria o gateway assíncrono com as mesmas rotas do app Flask.
+
+    Sem `services`, usa as mesmas réplicas (e recargas) configuradas para o app Flask.
+    """
+    gateway = web.Application(middlewares=[request_metrics, compression, admission_control])
+    if services is None:
+        gateway[UPSTREAM] = AsyncUpstreamClient(endpoint_source.current, hedger=hedger, source=endpoint_source)
+    else:
+        gateway[UPSTREAM] = AsyncUpstreamClient(services, hedger=hedger)
+    gateway[INFLIGHT] = AsyncSingleFlight()
+
+    async def start_upstream(gateway):
+        await gateway[UPSTREAM].start()
+
+    async def close_upstream(gateway):
+        await gateway[UPSTREAM].close()
+
+    gateway.on_startup.append(start_upstream)
+    gateway.on_cleanup.append(close_upstream)
+
+    r = gateway.router
+    for method in ('GET', 'POST'):
+        r.add_route(method, '/auth/{endpoint:.+}', auth_proxy)
+    for method in ('GET', 'POST', 'PUT', 'DELETE'):
+        r.add_route(method, '/users/{endpoint:.+}', users_proxy)
+        r.add_route(method, '/spaces/{endpoint:.+}', spaces_proxy)
+        r.add_route(method, '/reservations/{endpoint:.+}', reservations_proxy)
+    r.add_get('/spaces', spaces_get, allow_head=False)
+    r.add_post('/spaces', spaces_create)
+    r.add_get('/reservations', reservations_proxy, allow_head=False)
+    r.add_post('/reservations', reservations_proxy)
+    r.add_post('/payments/{endpoint:.+}', payments_proxy)
+    r.add_post('/pricing/{endpoint:.+}', pricing_proxy)
+    r.add_post(r'/checkin/{reservation_id:\d+}', checkin_proxy)
+    r.add_post(r'/checkout/{reservation_id:\d+}', checkin_proxy)
+    r.add_get('/analytics/{endpoint:.+}', analytics_proxy, allow_head=False)
+    r.add_get('/financial/{endpoint:.+}', financial_proxy, allow_head=False)
+    r.add_post('/notify/{endpoint:.+}', notify_proxy)
+    r.add_get('/admin/users', admin_users, allow_head=False)
+    r.add_get('/admin/reservations', admin_reservations, allow_head=False)
+    r.add_get('/bff/admin-dashboard', bff_admin_dashboard, allow_head=False)
+    r.add_get('/bff/reservations', bff_reservations, allow_head=False)
+    r.add_get('/bff/financial', bff_financial, allow_head=False)
+    r.add_post('/batch', batch)
+    r.add_get('/health', health, allow_head=False)
+    r.add_get('/gateway/stats', gateway_stats, allow_head=False)
+    r.add_get(METRICS_PATH, metrics, allow_head=False)
+    return gateway
+
+
+async def app_factory():
+    """Ponto de entrada do worker aiohttp.GunicornWebWorker (perfil de produção)."""
+    return create_app()
+
+
+def main():
+    web.run_app(create_app(), host='0.0.0.0', port=8000, backlog=4096)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+import json
+import os
+import random
+import threading
+import time
+
+# Configuração do balanceamento entre réplicas de um microsserviço
+BALANCER = os.getenv('UPSTREAM_BALANCER', 'p2c')
+EJECT_CONSECUTIVE_FAILURES = int(os.getenv('UPSTREAM_EJECT_FAILURES', '5'))
+EJECT_SECONDS = float(os.getenv('UPSTREAM_EJECT_SECONDS', '30'))
+MAX_EJECTED_PERCENT = float(os.getenv('UPSTREAM_MAX_EJECTED_PERCENT', '50'))
+ENDPOINTS = os.getenv('UPSTREAM_ENDPOINTS', '')
+ENDPOINTS_FILE = os.getenv('UPSTREAM_ENDPOINTS_FILE', '')
+ENDPOINTS_RELOAD_SECONDS = float(os.getenv('UPSTREAM_ENDPOINTS_RELOAD_SECONDS', '5'))
+
+
+def endpoint_list(value):
+    """Aceita uma URL, URLs separadas por vírgula ou uma lista."""
+    urls = value.split(',') if isinstance(value, str) else value
+    return [url.strip().rstrip('/') for url in urls if url.strip()]
+
+
+def parse_endpoints(value):
+    """Lê 'servico=url1,url2;servico2=url3' no formato de UPSTREAM_ENDPOINTS."""
+    services = {}
+    for item in filter(None, (part.strip() for part in value.split(';'))):
+        name, _, urls = item.partition('=')
+        urls = endpoint_list(urls)
+        # 'servico=' sem URLs deixaria o serviço sem réplicas: a entrada é ignorada
+        if urls:
+            services[name.strip()] = urls
+    return services
+
+
+class Endpoint:
+    __slots__ = ('url', 'outstanding', 'requests', 'failures', 'consecutive_failures',
+                 'ejected_until', 'ejections')
+
+    def __init__(self, url):
+        self.url = url
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0
+        self.ejections = 0
+
+    def stats(self, now):
+        return {
+            'url': self.url,
+            'outstanding': self.outstanding,
+            'requests': self.requests,
+            'failures': self.failures,
+            'ejected': self.ejected_until > now,
+            'ejections': self.ejections
+        }
+
+
+class Balancer:
+    """Escolhe a réplica de cada chamada e ejeta por um tempo as que falham seguidamente (health check passivo)."""
+
+    def __init__(self, name, urls, strategy=BALANCER, eject_failures=EJECT_CONSECUTIVE_FAILURES,
+                 eject_seconds=EJECT_SECONDS, max_ejected_percent=MAX_EJECTED_PERCENT, clock=time.monotonic):
+        self.name = name
+        self.strategy = strategy
+        self.eject_failures = eject_failures
+        self.eject_seconds = eject_seconds
+        self.max_ejected_percent = max_ejected_percent
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.endpoints = [Endpoint(url) for url in endpoint_list(urls)]
+
+    def update(self, urls):
+        """Troca a lista de réplicas, mantendo contadores e ejeções das que continuam."""
+        urls = endpoint_list(urls)
+        if not urls:
+            # Uma lista vazia não substitui a atual: o serviço ficaria sem réplica para escolher
+            return
+        with self._lock:
+            current = {endpoint.url: endpoint for endpoint in self.endpoints}
+            self.endpoints = [current.get(url) or Endpoint(url) for url in urls]
+
+    def urls(self):
+        return [endpoint.url for endpoint in self.endpoints]
+
+    def choose(self, exclude=()):
+        """Reserva uma réplica para a chamada; `exclude` evita as já tentadas (ex. pelo hedging)."""
+        with self._lock:
+            now = self.clock()
+            candidates = [endpoint for endpoint in self.endpoints if endpoint.ejected_until <= now]
+            # Com todas ejetadas, tenta mesmo assim em vez de recusar tudo
+            candidates = candidates or list(self.endpoints)
+            fresh = [endpoint for endpoint in candidates if endpoint.url not in exclude]
+            candidates = fresh or candidates
+
+            if len(candidates) == 1:
+                chosen = candidates[0]
+            elif self.strategy == 'least':
+                fewest = min(endpoint.outstanding for endpoint in candidates)
+                chosen = random.choice([endpoint for endpoint in candidates if endpoint.outstanding == fewest])
+            else:
+                # Power of two choices: duas réplicas ao acaso, fica a com menos chamadas em andamento
+                first, second = random.sample(candidates, 2)
+                chosen = first if first.outstanding <= second.outstanding else second
+            chosen.outstanding += 1
+            chosen.requests += 1
+            return chosen
+
+    def release(self, endpoint, success):
+        """Devolve a réplica; `success` None é uma chamada abandonada, que não conta nem como falha."""
+        with self._lock:
+            endpoint.outstanding -= 1
+            if success is None:
+                return
+            if success:
+                endpoint.consecutive_failures = 0
+                return
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            now = self.clock()
+            if endpoint.consecutive_failures < self.eject_failures or endpoint.ejected_until > now:
+                return
+            ejected = sum(1 for other in self.endpoints if other.ejected_until > now)
+            if (ejected + 1) * 100 > self.max_ejected_percent * len(self.endpoints):
+                return
+            # Cada nova ejeção da mesma réplica dura mais, até 10x o tempo base
+            endpoint.ejections += 1
+            endpoint.ejected_until = now + self.eject_seconds * min(endpoint.ejections, 10)
+            endpoint.consecutive_failures = 0
+
+    def stats(self):
+        with self._lock:
+            now = self.clock()
+            return {'strategy': self.strategy, 'endpoints': [endpoint.stats(now) for endpoint in self.endpoints]}
+
+
+class EndpointSource:
+    """Lista de réplicas por microsserviço: SERVICES, sobrescrito por UPSTREAM_ENDPOINTS e pelo arquivo.
+
+    O arquivo (JSON {"servico": ["url", ...]}) é relido quando muda, sem reiniciar o gateway.
+    """
+
+    def __init__(self, defaults, env=ENDPOINTS, path=ENDPOINTS_FILE, interval=ENDPOINTS_RELOAD_SECONDS,
+                 clock=time.monotonic):
+        self.base = {name: endpoint_list(urls) for name, urls in defaults.items()}
+        self.base.update({name: urls for name, urls in parse_endpoints(env).items() if name in self.base})
+        self.path = path
+        self.interval = interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._next_check = 0
+        self._mtime = None
+        self.reloads = 0
+        self.errors = 0
+        self.current = dict(self.base)
+        self.poll(force=True)
+
+    def _read_file(self):
+        with open(self.path, encoding='utf-8') as source:
+            data = json.load(source)
+        services = {name: endpoint_list(urls) for name, urls in data.items() if name in self.base and urls}
+        # Serviços só com entradas em branco ficam com a lista padrão
+        return {name: urls for name, urls in services.items() if urls}
+
+    def poll(self, force=False):
+        """Devolve o novo mapeamento se o arquivo mudou desde a última leitura; senão None."""
+        if not self.path:
+            return None
+        now = self.clock()
+        if not force and now < self._next_check:
+            return None
+        with self._lock:
+            if not force and now < self._next_check:
+                return None
+            self._next_check = now + self.interval
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError:
+                return None
+            if mtime == self._mtime:
+                return None
+            try:
+                overrides = self._read_file()
+            except (OSError, ValueError):
+                # Arquivo inválido ou pela metade: mantém a lista atual e tenta de novo no próximo ciclo
+                self.errors += 1
+                return None
+            self._mtime = mtime
+            self.current = dict(self.base, **overrides)
+            self.reloads += 1
+            return self.current
+
+    def stats(self):
+        return {'file': self.path or None, 'reloads': self.reloads, 'errors': self.errors}
@@ -0,0 +1,102 @@
+import os
+import re
+from urllib.parse import unquote
+from contextvars import copy_context
+from concurrent.futures import FIRST_COMPLETED, wait
+
+# Configuração do endpoint /batch
+BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', '20'))
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '8'))
+
+ALL_METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+
+# Mesmas regras das rotas do gateway: (métodos, caminho, microsserviço, acesso exigido)
+BATCH_ROUTES = [
+    (('GET', 'POST'), re.compile(r'^/auth/.+'), 'ms-usuarios', None),
+    (ALL_METHODS, re.compile(r'^/users/.+'), 'ms-usuarios', 'user'),
+    (('GET',), re.compile(r'^/spaces$'), 'ms-espacos', None),
+    (('POST',), re.compile(r'^/spaces$'), 'ms-espacos', 'admin'),
+    (ALL_METHODS, re.compile(r'^/spaces/.+'), 'ms-espacos', None),
+    (('GET',), re.compile(r'^/reservations$'), 'ms-reservas', 'admin'),
+    (('POST',), re.compile(r'^/reservations$'), 'ms-reservas', 'user'),
+    (ALL_METHODS, re.compile(r'^/reservations/.+'), 'ms-reservas', 'user'),
+    (('POST',), re.compile(r'^/payments/.+'), 'ms-pagamentos', 'user'),
+    (('POST',), re.compile(r'^/pricing/.+'), 'ms-precos', None),
+    (('POST',), re.compile(r'^/(checkin|checkout)/\d+$'), 'ms-checkin', 'user'),
+    (('GET',), re.compile(r'^/analytics/.+'), 'ms-analytics', 'user'),
+    (('GET',), re.compile(r'^/financial/.+'), 'ms-financeiro', 'user'),
+    (('POST',), re.compile(r'^/notify/.+'), 'ms-notificacoes', None),
+    (('GET',), re.compile(r'^/admin/users$'), 'ms-usuarios', 'admin'),
+    (('GET',), re.compile(r'^/admin/reservations$'), 'ms-reservas', 'admin'),
+]
+
+
+class BatchItemError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def check_path(path_only):
+    """Recusa caminhos fora da forma canônica.
+
+    O cliente HTTP resolve '.' e '..' antes de enviar: '/reservations/../admin/reservations'
+    passaria pela regra de /reservations e chegaria ao ms-reservas como /admin/reservations.
+    Segmentos vazios, barras invertidas e as mesmas formas codificadas com % também são recusados.
+    """
+    if not path_only.startswith('/') or '\\' in path_only or '#' in path_only:
+        raise BatchItemError(400, 'Invalid path')
+    for candidate in (path_only, unquote(path_only)):
+        if any(segment in ('', '.', '..') for segment in candidate[1:].split('/')) or '\\' in candidate:
+            raise BatchItemError(400, 'Invalid path')
+
+
+def resolve(method, path, claims):
+    """Devolve o microsserviço de um sub-request, aplicando as regras de acesso da rota."""
+    path_only = path.split('?', 1)[0]
+    check_path(path_only)
+    matched = False
+    for methods, pattern, service, access in BATCH_ROUTES:
+        if not pattern.match(path_only):
+            continue
+        matched = True
+        if method not in methods:
+            continue
+        if access and not claims:
+            raise BatchItemError(401, 'Unauthorized')
+        if access == 'admin' and claims.get('role') != 'admin':
+            raise BatchItemError(403, 'Admin access required')
+        return service
+    if matched:
+        raise BatchItemError(405, 'Method not allowed')
+    raise BatchItemError(404, 'Not found')
+
+
+def parse_items(payload, max_size=BATCH_MAX_SIZE):
+    items = payload.get('requests') if isinstance(payload, dict) else payload
+    if not isinstance(items, list) or not items:
+        raise BatchItemError(400, 'Expected a non-empty list of requests')
+    if len(items) > max_size:
+        raise BatchItemError(413, f'Batch limited to {max_size} requests')
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            raise BatchItemError(400, 'Each request needs a path')
+    return items
+
+
+def run_bounded(executor, tasks, limit=BATCH_CONCURRENCY):
+    """Executa as tarefas com no máximo `limit` simultâneas e devolve os resultados na ordem original."""
+    results = [None] * len(tasks)
+    pending = {}
+    queue = list(enumerate(tasks))
+    queue.reverse()
+    while queue or pending:
+        while queue and len(pending) < limit:
+            index, task = queue.pop()
+            # Contexto copiado da requisição, para que o trace acompanhe cada sub-request
+            pending[executor.submit(copy_context().run, task)] = index
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            results[pending.pop(future)] = future.result()
+    return results
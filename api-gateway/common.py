@@ -0,0 +1,91 @@
+"""
+Estado e regras do gateway comuns aos modos Flask (app.py) e aiohttp (async_app.py).
+
+Fica fora dos dois apps para que o modo assíncrono não precise importar o app Flask (com o
+Swagger, os executores e os pools síncronos) só para reaproveitar caches, limites e a
+validação de token.
+"""
+import os
+import sys
+
+import jwt
+
+from balancer import EndpointSource
+from hedging import HEDGE_ENABLED, Hedger
+from ratelimit import LoadShedder, RateLimiter
+from response_cache import ResponseCache
+from token_cache import TokenCache
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from shared.metrics import METRICS_PATH, registry  # noqa: E402
+from shared.tracing import Tracer, exporter_from_env  # noqa: E402
+
+SECRET_KEY = 'secret-key'
+
+USE_DOCKER = os.getenv('USE_DOCKER', 'false').lower() == 'true'
+
+if USE_DOCKER:
+    SERVICES = {
+        'ms-usuarios': 'http://ms-usuarios:5001',
+        'ms-espacos': 'http://ms-espacos:5002',
+        'ms-reservas': 'http://ms-reservas:5003',
+        'ms-pagamentos': 'http://ms-pagamentos:5004',
+        'ms-precos': 'http://ms-precos:5005',
+        'ms-checkin': 'http://ms-checkin:5006',
+        'ms-notificacoes': 'http://ms-notificacoes:5007',
+        'ms-financeiro': 'http://ms-financeiro:5008',
+        'ms-analytics': 'http://ms-analytics:5009'
+    }
+else:
+    SERVICES = {
+        'ms-usuarios': 'http://localhost:5001',
+        'ms-espacos': 'http://localhost:5002',
+        'ms-reservas': 'http://localhost:5003',
+        'ms-pagamentos': 'http://localhost:5004',
+        'ms-precos': 'http://localhost:5005',
+        'ms-checkin': 'http://localhost:5006',
+        'ms-notificacoes': 'http://localhost:5007',
+        'ms-financeiro': 'http://localhost:5008',
+        'ms-analytics': 'http://localhost:5009'
+    }
+
+registry.describe('gateway_hedges_total', 'counter', 'Segundas tentativas por microsserviço: sent, won ou budget_exhausted')
+
+
+def record_hedge(service, event):
+    registry.inc('gateway_hedges_total', (('upstream', service), ('event', event)))
+
+
+# Cada serviço pode ter várias réplicas (UPSTREAM_ENDPOINTS / UPSTREAM_ENDPOINTS_FILE)
+endpoint_source = EndpointSource(SERVICES)
+hedger = Hedger(on_event=record_hedge) if HEDGE_ENABLED else None
+tracer = Tracer('api-gateway', exporter_from_env())
+token_cache = TokenCache()
+spaces_cache = ResponseCache()
+rate_limiter = RateLimiter.from_env()
+shedder = LoadShedder()
+
+UNLIMITED_PATHS = ('/health', '/gateway/stats', METRICS_PATH)
+
+
+def decode_token(authorization):
+    token = (authorization or '').replace('Bearer ', '')
+    if not token:
+        return None
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
+    except Exception:
+        return None
+    token_cache.put(token, claims)
+    return claims
+
+
+def route_group(path):
+    return path.strip('/').split('/', 1)[0] or 'root'
+
+
+def is_catalogue_path(path):
+    return path == '/spaces' or (path.startswith('/spaces/') and path[len('/spaces/'):].isdigit())
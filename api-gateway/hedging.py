@@ -0,0 +1,238 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+
+# Configuração do hedging (segunda tentativa após o percentil de latência) e do orçamento de retries
+HEDGE_ENABLED = os.getenv('HEDGE_ENABLED', 'false').lower() == 'true'
+HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', '95'))
+HEDGE_MIN_DELAY = float(os.getenv('HEDGE_MIN_DELAY', '0.01'))
+HEDGE_DEFAULT_DELAY = float(os.getenv('HEDGE_DEFAULT_DELAY', '0.1'))
+HEDGE_WORKERS = int(os.getenv('HEDGE_WORKERS', '64'))
+RETRY_BUDGET_RATIO = float(os.getenv('RETRY_BUDGET_RATIO', '0.1'))
+RETRY_BUDGET_MIN_PER_SECOND = float(os.getenv('RETRY_BUDGET_MIN_PER_SECOND', '1'))
+RETRY_BUDGET_WINDOW = float(os.getenv('RETRY_BUDGET_WINDOW', '10'))
+
+
+class LatencyTracker:
+    """Últimas latências de um microsserviço; o percentil é recalculado só a cada `refresh` amostras."""
+
+    def __init__(self, size=512, refresh=32, min_samples=50):
+        self.size = size
+        self.refresh = refresh
+        self.min_samples = min_samples
+        self._samples = []
+        self._next = 0
+        self._since_refresh = 0
+        self._sorted = None
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            if len(self._samples) < self.size:
+                self._samples.append(seconds)
+            else:
+                self._samples[self._next] = seconds
+                self._next = (self._next + 1) % self.size
+            self._since_refresh += 1
+            if self._since_refresh >= self.refresh:
+                self._sorted = None
+
+    def percentile(self, p):
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            if self._sorted is None:
+                self._sorted = sorted(self._samples)
+                self._since_refresh = 0
+            index = min(len(self._sorted) - 1, int(len(self._sorted) * p / 100))
+            return self._sorted[index]
+
+
+class RetryBudget:
+    """Retries limitados a uma fração das requisições normais numa janela deslizante.
+
+    Com o microsserviço fora do ar, as tentativas extras param de sair assim que o orçamento
+    acaba, em vez de multiplicar a carga sobre ele.
+    """
+
+    def __init__(self, ratio=RETRY_BUDGET_RATIO, min_per_second=RETRY_BUDGET_MIN_PER_SECOND,
+                 window=RETRY_BUDGET_WINDOW, buckets=10, clock=time.monotonic):
+        self.ratio = ratio
+        self.reserve = min_per_second * window
+        self.bucket_width = window / buckets
+        self.clock = clock
+        # Cada bucket guarda [id do bucket, requisições, retries]
+        self._buckets = [[-1, 0, 0] for _ in range(buckets)]
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _bucket(self, now):
+        bucket_id = int(now / self.bucket_width)
+        bucket = self._buckets[bucket_id % len(self._buckets)]
+        if bucket[0] != bucket_id:
+            bucket[:] = [bucket_id, 0, 0]
+        return bucket
+
+    def _totals(self, now):
+        oldest = int(now / self.bucket_width) - len(self._buckets)
+        requests = retries = 0
+        for bucket_id, bucket_requests, bucket_retries in self._buckets:
+            if bucket_id > oldest:
+                requests += bucket_requests
+                retries += bucket_retries
+        return requests, retries
+
+    def record_request(self):
+        with self._lock:
+            self._bucket(self.clock())[1] += 1
+
+    def try_spend(self):
+        with self._lock:
+            now = self.clock()
+            requests, retries = self._totals(now)
+            if retries + 1 > self.reserve + self.ratio * requests:
+                self.rejected += 1
+                return False
+            self._bucket(now)[2] += 1
+            return True
+
+    def stats(self):
+        with self._lock:
+            requests, retries = self._totals(self.clock())
+            return {
+                'ratio': self.ratio,
+                'window_requests': requests,
+                'window_retries': retries,
+                'rejected': self.rejected
+            }
+
+
+class Hedger:
+    """Envia uma segunda tentativa de um GET quando a primeira passa do percentil de latência; vale a primeira resposta."""
+
+    def __init__(self, budget=None, percentile=HEDGE_PERCENTILE, min_delay=HEDGE_MIN_DELAY,
+                 default_delay=HEDGE_DEFAULT_DELAY, workers=HEDGE_WORKERS, on_event=None):
+        self.budget = budget or RetryBudget()
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.default_delay = default_delay
+        # Recebe (serviço, evento): 'sent', 'won' ou 'budget_exhausted'
+        self.on_event = on_event
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hedge')
+        self.trackers = {}
+        self._lock = threading.Lock()
+        self.events = {'sent': 0, 'won': 0, 'budget_exhausted': 0}
+
+    def _tracker(self, service):
+        tracker = self.trackers.get(service)
+        if tracker is None:
+            with self._lock:
+                tracker = self.trackers.setdefault(service, LatencyTracker())
+        return tracker
+
+    def delay(self, service):
+        value = self._tracker(service).percentile(self.percentile)
+        return max(self.min_delay, value if value is not None else self.default_delay)
+
+    def _event(self, service, event):
+        with self._lock:
+            self.events[event] += 1
+        if self.on_event is not None:
+            self.on_event(service, event)
+
+    def _should_hedge(self, service):
+        if self.budget.try_spend():
+            self._event(service, 'sent')
+            return True
+        self._event(service, 'budget_exhausted')
+        return False
+
+    def run(self, service, call):
+        """Executa `call` (que devolve uma resposta do requests) com hedging, no pool de threads."""
+        self.budget.record_request()
+        tracker = self._tracker(service)
+
+        def attempt():
+            started = time.perf_counter()
+            response = call()
+            tracker.observe(time.perf_counter() - started)
+            return response
+
+        primary = self.executor.submit(copy_context().run, attempt)
+        done, _ = wait([primary], timeout=self.delay(service))
+        if done or not self._should_hedge(service):
+            return primary.result()
+
+        hedge = self.executor.submit(copy_context().run, attempt)
+        pending = {primary, hedge}
+        winner = None
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None and future.result().status_code < 500:
+                    winner = future
+                    break
+        if winner is None:
+            # As duas falharam: devolve o resultado da tentativa original
+            hedge.add_done_callback(close_response)
+            return primary.result()
+        if winner is hedge:
+            self._event(service, 'won')
+        # A tentativa perdedora fecha a resposta ao terminar, devolvendo a conexão ao pool
+        loser = primary if winner is hedge else hedge
+        loser.add_done_callback(close_response)
+        return winner.result()
+
+    async def run_async(self, service, call):
+        """Mesmo que run(), para o runtime assíncrono: `call` é uma corrotina que devolve (status, headers, corpo)."""
+        self.budget.record_request()
+        tracker = self._tracker(service)
+
+        async def attempt():
+            started = time.perf_counter()
+            result = await call()
+            tracker.observe(time.perf_counter() - started)
+            return result
+
+        primary = asyncio.ensure_future(attempt())
+        done, _ = await asyncio.wait({primary}, timeout=self.delay(service))
+        if done or not self._should_hedge(service):
+            return await primary
+
+        hedge = asyncio.ensure_future(attempt())
+        pending = {primary, hedge}
+        winner = None
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result()[0] < 500:
+                        winner = task
+                        break
+        finally:
+            for task in pending:
+                task.cancel()
+        if winner is None:
+            if not hedge.cancelled():
+                hedge.exception()
+            return await primary
+        if winner is hedge:
+            self._event(service, 'won')
+        return winner.result()
+
+    def stats(self):
+        with self._lock:
+            events = dict(self.events)
+        return {
+            'events': events,
+            'delays': {service: self.delay(service) for service in list(self.trackers)},
+            'retry_budget': self.budget.stats()
+        }
+
+
+def close_response(future):
+    if future.exception() is None:
+        future.result().close()
@@ -0,0 +1,232 @@
+import heapq
+import math
+import os
+import threading
+import time
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Configuração da limitação de taxa e do descarte de carga
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+RATE_LIMIT_USER = os.getenv('RATE_LIMIT_USER', '50:100')
+RATE_LIMIT_GROUP = os.getenv('RATE_LIMIT_GROUP', '500:1000')
+RATE_LIMIT_GROUPS = os.getenv('RATE_LIMIT_GROUPS', '')
+RATE_LIMIT_GLOBAL = os.getenv('RATE_LIMIT_GLOBAL', '2000:4000')
+RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL', '')
+MAX_IN_FLIGHT = int(os.getenv('GATEWAY_MAX_IN_FLIGHT', '256'))
+# Proxies confiáveis na frente do gateway (ALB, frontend) que acrescentam o cliente ao X-Forwarded-For.
+# Só ligue quando todo acesso ao gateway passa por eles: acessado direto, o cabeçalho vem do cliente
+TRUSTED_PROXIES = int(os.getenv('GATEWAY_TRUSTED_PROXIES', '0'))
+
+
+def client_address(remote, forwarded_for, trusted=None):
+    """IP do cliente para os limites de quem não tem token.
+
+    Atrás do ALB, e nas chamadas feitas pelo servidor do frontend, o endereço da conexão é o do
+    proxy e todos os clientes dividiriam o mesmo balde. Cada proxy confiável acrescenta quem o
+    chamou ao fim do X-Forwarded-For: o cliente é o `trusted`-ésimo de trás para frente. Os
+    anteriores vêm do próprio cliente e são ignorados. Sem `trusted`, vale GATEWAY_TRUSTED_PROXIES.
+    """
+    if trusted is None:
+        trusted = TRUSTED_PROXIES
+    if trusted <= 0 or not forwarded_for:
+        return remote
+    hops = [hop.strip() for hop in forwarded_for.split(',') if hop.strip()]
+    return hops[-trusted] if len(hops) >= trusted else remote
+
+
+def parse_limit(value):
+    """Converte 'taxa:rajada' (requisições por segundo : tamanho do balde) em tupla."""
+    rate, _, burst = value.partition(':')
+    rate = float(rate)
+    return rate, float(burst) if burst else rate
+
+
+def parse_group_limits(value):
+    limits = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        group, _, limit = item.partition('=')
+        limits[group.strip()] = parse_limit(limit)
+    return limits
+
+
+class LocalBackend:
+    """Baldes de tokens em memória, com locks particionados por chave."""
+
+    def __init__(self, stripes=64, max_keys=100000, sweep_interval=10, clock=time.monotonic):
+        self._buckets = {}
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self._sweep_lock = threading.Lock()
+        self._last_sweep = clock()
+        self.sweeps = 0
+
+    def take(self, key, rate, burst):
+        """Consome um token; devolve 0 se permitido ou os segundos até o próximo token."""
+        now = self.clock()
+        with self._locks[hash(key) % len(self._locks)]:
+            tokens, last = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - last) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / rate
+        if len(self._buckets) > self.max_keys:
+            self._sweep(now)
+        return wait
+
+    def _sweep(self, now):
+        # Sob ataque com chaves novas a cada requisição, varrer em toda chamada custaria O(n) por
+        # requisição: uma varredura por vez, no máximo uma a cada sweep_interval
+        if now - self._last_sweep < self.sweep_interval or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_sweep = now
+            self.sweeps += 1
+            # Baldes parados há mais de um minuto já estariam cheios: descartar equivale a recriá-los
+            recent = []
+            for key, bucket in list(self._buckets.items()):
+                if now - bucket[1] > 60:
+                    self._buckets.pop(key, None)
+                else:
+                    recent.append((key, bucket))
+            # Ainda acima do limite: saem os usados há mais tempo
+            excess = len(recent) - self.max_keys
+            if excess > 0:
+                for key, _ in heapq.nsmallest(excess, recent, key=lambda item: item[1][1]):
+                    self._buckets.pop(key, None)
+        finally:
+            self._sweep_lock.release()
+
+
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local last = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - last) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBackend:
+    """Baldes compartilhados entre réplicas do gateway; se o Redis falhar, usa os baldes locais."""
+
+    def __init__(self, url, prefix='ratelimit:'):
+        self.client = redis.Redis.from_url(url, socket_timeout=0.05, socket_connect_timeout=0.05)
+        self.script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+        self.prefix = prefix
+        self.fallback = LocalBackend()
+        self.errors = 0
+
+    def take(self, key, rate, burst):
+        try:
+            return float(self.script(keys=[self.prefix + key], args=[rate, burst]))
+        except redis.RedisError:
+            self.errors += 1
+            return self.fallback.take(key, rate, burst)
+
+
+class RateLimiter:
+    """Limites por usuário, por grupo de rotas e global, na ordem do mais específico ao mais amplo."""
+
+    def __init__(self, user_limit, group_limit, global_limit, group_limits=None, backend=None):
+        limits = {'user': user_limit, 'group': group_limit, 'global': global_limit}
+        limits.update((f'group {group}', limit) for group, limit in (group_limits or {}).items())
+        for name, (rate, burst) in limits.items():
+            # Taxa zero dividiria por zero no cálculo do Retry-After; balde menor que 1 nunca libera
+            if not rate > 0 or not burst >= 1:
+                raise ValueError(f'Invalid {name} rate limit {rate}:{burst}: rate must be > 0 and burst >= 1')
+        self.user_limit = user_limit
+        self.group_limit = group_limit
+        self.global_limit = global_limit
+        self.group_limits = group_limits or {}
+        self.backend = backend or LocalBackend()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = {'user': 0, 'group': 0, 'global': 0}
+
+    @classmethod
+    def from_env(cls):
+        backend = None
+        if RATE_LIMIT_REDIS_URL and redis is not None:
+            backend = RedisBackend(RATE_LIMIT_REDIS_URL)
+        return cls(parse_limit(RATE_LIMIT_USER), parse_limit(RATE_LIMIT_GROUP), parse_limit(RATE_LIMIT_GLOBAL),
+                   parse_group_limits(RATE_LIMIT_GROUPS), backend)
+
+    def check(self, identity, group):
+        """Devolve 0 se a requisição pode seguir ou o Retry-After (s) do limite estourado."""
+        checks = (
+            ('user', f'user:{identity}', self.user_limit),
+            ('group', f'group:{group}', self.group_limits.get(group, self.group_limit)),
+            ('global', 'global', self.global_limit),
+        )
+        for scope, key, (rate, burst) in checks:
+            wait = self.backend.take(key, rate, burst)
+            if wait:
+                with self._lock:
+                    self.limited[scope] += 1
+                return max(1, math.ceil(wait))
+        with self._lock:
+            self.allowed += 1
+        return 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': type(self.backend).__name__,
+                'allowed': self.allowed,
+                'limited': dict(self.limited)
+            }
+
+
+class LoadShedder:
+    """Recusa requisições quando já há muitas em andamento, em vez de deixá-las esperar até o timeout.
+
+    No modo assíncrono todas as requisições aceitas entram no handler e `in_flight` é a carga
+    real. No gthread só entram tantas quanto as threads do worker e o resto espera na fila do
+    pool de threads, que o handler não vê: `queued` (função) soma essa fila à conta.
+    """
+
+    def __init__(self, max_in_flight=MAX_IN_FLIGHT, queued=None):
+        self.max_in_flight = max_in_flight
+        self.queued = queued
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.shed = 0
+
+    def enter(self):
+        waiting = self.queued() if self.queued is not None else 0
+        with self._lock:
+            if self.in_flight + waiting >= self.max_in_flight:
+                self.shed += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self):
+        with self._lock:
+            return {'max_in_flight': self.max_in_flight, 'in_flight': self.in_flight,
+                    'queued': self.queued() if self.queued is not None else 0, 'shed': self.shed}
@@ -0,0 +1,179 @@
+import os
+import threading
+import time
+
+# Configuração dos circuit breakers e bulkheads por microsserviço
+BREAKER_WINDOW = float(os.getenv('BREAKER_WINDOW', '10'))
+BREAKER_MIN_REQUESTS = int(os.getenv('BREAKER_MIN_REQUESTS', '20'))
+BREAKER_FAILURE_RATE = float(os.getenv('BREAKER_FAILURE_RATE', '0.5'))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv('BREAKER_SLOW_CALL_SECONDS', '2'))
+BREAKER_SLOW_CALL_RATE = float(os.getenv('BREAKER_SLOW_CALL_RATE', '0.8'))
+BREAKER_OPEN_SECONDS = float(os.getenv('BREAKER_OPEN_SECONDS', '15'))
+BREAKER_HALF_OPEN_CALLS = int(os.getenv('BREAKER_HALF_OPEN_CALLS', '3'))
+BULKHEAD_MAX_CONCURRENCY = int(os.getenv('UPSTREAM_MAX_CONCURRENCY', '40'))
+
+
+class UpstreamUnavailable(Exception):
+    """O gateway recusou a chamada sem contatar o microsserviço."""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpen(UpstreamUnavailable):
+    pass
+
+
+class BulkheadFull(UpstreamUnavailable):
+    pass
+
+
+class CircuitBreaker:
+    """Circuit breaker com janela deslizante de erros e de chamadas lentas."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, window=BREAKER_WINDOW, buckets=10, min_requests=BREAKER_MIN_REQUESTS,
+                 failure_rate=BREAKER_FAILURE_RATE, slow_call_seconds=BREAKER_SLOW_CALL_SECONDS,
+                 slow_call_rate=BREAKER_SLOW_CALL_RATE, open_seconds=BREAKER_OPEN_SECONDS,
+                 half_open_calls=BREAKER_HALF_OPEN_CALLS, clock=time.monotonic):
+        self.name = name
+        self.bucket_width = window / buckets
+        self.min_requests = min_requests
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+
+        # Cada bucket guarda [id do bucket, chamadas, falhas, lentas]
+        self._buckets = [[-1, 0, 0, 0] for _ in range(buckets)]
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.opened_until = 0
+        self.times_opened = 0
+        self.rejected = 0
+        self._trial_in_flight = 0
+        self._trial_successes = 0
+
+    def _bucket(self, now):
+        bucket_id = int(now / self.bucket_width)
+        bucket = self._buckets[bucket_id % len(self._buckets)]
+        if bucket[0] != bucket_id:
+            bucket[:] = [bucket_id, 0, 0, 0]
+        return bucket
+
+    def _window_totals(self, now):
+        oldest = int(now / self.bucket_width) - len(self._buckets)
+        calls = failures = slow = 0
+        for bucket_id, bucket_calls, bucket_failures, bucket_slow in self._buckets:
+            if bucket_id > oldest:
+                calls += bucket_calls
+                failures += bucket_failures
+                slow += bucket_slow
+        return calls, failures, slow
+
+    def _trip(self, now):
+        self.state = self.OPEN
+        self.opened_until = now + self.open_seconds
+        self.times_opened += 1
+        for bucket in self._buckets:
+            bucket[:] = [-1, 0, 0, 0]
+
+    def before_call(self):
+        with self._lock:
+            now = self.clock()
+            if self.state == self.OPEN:
+                if now < self.opened_until:
+                    self.rejected += 1
+                    raise CircuitOpen(f'Circuit open for {self.name}', retry_after=self.opened_until - now)
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = 0
+                self._trial_successes = 0
+            if self.state == self.HALF_OPEN:
+                # Só algumas chamadas de teste passam até o microsserviço provar que se recuperou
+                if self._trial_in_flight >= self.half_open_calls:
+                    self.rejected += 1
+                    raise CircuitOpen(f'Circuit half-open for {self.name}', retry_after=1)
+                self._trial_in_flight += 1
+
+    def record(self, success, duration):
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            now = self.clock()
+            if self.state == self.HALF_OPEN:
+                self._trial_in_flight -= 1
+                if not success or slow:
+                    self._trip(now)
+                    return
+                self._trial_successes += 1
+                if self._trial_successes >= self.half_open_calls:
+                    self.state = self.CLOSED
+                return
+            if self.state == self.OPEN:
+                return
+
+            bucket = self._bucket(now)
+            bucket[1] += 1
+            bucket[2] += 0 if success else 1
+            bucket[3] += 1 if slow else 0
+
+            calls, failures, slow_calls = self._window_totals(now)
+            if calls >= self.min_requests and (failures / calls >= self.failure_rate
+                                               or slow_calls / calls >= self.slow_call_rate):
+                self._trip(now)
+
+    def cancel(self):
+        """Chamada liberada por before_call que desistiu antes de chegar ao microsserviço."""
+        # Não diz nada sobre a saúde do microsserviço: só devolve a vaga de teste do meio-aberto
+        with self._lock:
+            if self.state == self.HALF_OPEN and self._trial_in_flight > 0:
+                self._trial_in_flight -= 1
+
+    def stats(self):
+        with self._lock:
+            now = self.clock()
+            calls, failures, slow_calls = self._window_totals(now)
+            return {
+                'state': self.state,
+                'window_calls': calls,
+                'window_failures': failures,
+                'window_slow_calls': slow_calls,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+                'retry_after': max(0, self.opened_until - now) if self.state == self.OPEN else 0
+            }
+
+
+class Bulkhead:
+    """Limite de chamadas simultâneas a um microsserviço; quando cheio, recusa na hora."""
+
+    def __init__(self, name, max_concurrent=BULKHEAD_MAX_CONCURRENCY):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def acquire(self):
+        with self._lock:
+            if self.in_flight >= self.max_concurrent:
+                self.rejected += 1
+                raise BulkheadFull(f'Too many concurrent calls to {self.name}')
+            self.in_flight += 1
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'in_flight': self.in_flight,
+                'rejected': self.rejected
+            }
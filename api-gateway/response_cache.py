@@ -0,0 +1,75 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# Configuração do cache de respostas do catálogo de espaços
+SPACES_CACHE_TTL = float(os.getenv('SPACES_CACHE_TTL', '30'))
+SPACES_CACHE_SIZE = int(os.getenv('SPACES_CACHE_SIZE', '1024'))
+
+# variants guarda as versões comprimidas do corpo (gzip, br), geradas na primeira leitura que as pede
+CachedResponse = namedtuple('CachedResponse', ['body', 'content_type', 'etag', 'expires_at', 'variants'])
+
+
+class ResponseCache:
+    """Cache LRU/TTL de respostas GET já prontas, com ETag forte calculado sobre o corpo."""
+
+    def __init__(self, ttl=SPACES_CACHE_TTL, max_entries=SPACES_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Muda a cada invalidação: quem buscou o corpo antes dela não grava no cache
+        self.generation = 0
+        self.stale_puts = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body, content_type='application/json', generation=None):
+        """Grava e devolve a entrada. Com `generation` (lida antes da busca), a entrada só é
+        gravada se não houve invalidação no meio; senão apenas é devolvida para esta resposta."""
+        etag = hashlib.sha256(body).hexdigest()
+        entry = CachedResponse(body, content_type, etag, time.monotonic() + self.ttl, {})
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                self.stale_puts += 1
+                return entry
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def max_age(self, entry):
+        return max(0, int(entry.expires_at - time.monotonic()))
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+            self.generation += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'stale_puts': self.stale_puts
+            }
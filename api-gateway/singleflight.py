@@ -0,0 +1,93 @@
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Agrupa chamadas idênticas simultâneas: só a primeira executa, as demais recebem o mesmo resultado."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {'in_flight': len(self._calls), 'leaders': self.leaders, 'coalesced': self.coalesced}
+
+
+class AsyncSingleFlight:
+    """Versão asyncio do SingleFlight para o runtime assíncrono.
+
+    A chamada compartilhada roda numa task própria e cada requisição espera por ela com
+    asyncio.shield: se o cliente que abriu a chamada desconectar, só a espera dele é cancelada
+    e as demais continuam recebendo o resultado. A task só é cancelada quando não sobra ninguém
+    esperando.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        call = self._calls.get(key)
+        if call is not None:
+            self.coalesced += 1
+        else:
+            call = self._calls[key] = [asyncio.ensure_future(fn()), 0]
+            self.leaders += 1
+            call[0].add_done_callback(lambda task: self._finish(key, call))
+        task = call[0]
+        call[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and call[1] == 1:
+                task.cancel()
+            raise
+        finally:
+            call[1] -= 1
+
+    def _finish(self, key, call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Evita o aviso de exceção não consumida quando ninguém estava esperando
+        if not call[0].cancelled():
+            call[0].exception()
+
+    def stats(self):
+        return {'in_flight': len(self._calls), 'leaders': self.leaders, 'coalesced': self.coalesced}
@@ -0,0 +1,66 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Configuração do cache de tokens JWT já verificados
+TOKEN_CACHE_SIZE = int(os.getenv('JWT_CACHE_SIZE', '10000'))
+TOKEN_CACHE_TTL = float(os.getenv('JWT_CACHE_TTL', '300'))
+
+
+class TokenCache:
+    """Cache LRU/TTL das claims de tokens verificados, indexado pelo hash do token."""
+
+    def __init__(self, max_entries=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token):
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def put(self, token, claims):
+        # A entrada nunca sobrevive ao exp do próprio token
+        expires_at = time.time() + self.ttl
+        if 'exp' in claims:
+            expires_at = min(expires_at, float(claims['exp']))
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (claims, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses
+            }
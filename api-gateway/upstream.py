@@ -0,0 +1,235 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from balancer import Balancer
+from resilience import BULKHEAD_MAX_CONCURRENCY, Bulkhead, CircuitBreaker, UpstreamUnavailable
+
+# Configuração do pool de conexões com os microsserviços
+POOL_SIZE = int(os.getenv('UPSTREAM_POOL_SIZE', '20'))
+CONNECT_TIMEOUT = float(os.getenv('UPSTREAM_CONNECT_TIMEOUT', '2'))
+READ_TIMEOUT = float(os.getenv('UPSTREAM_READ_TIMEOUT', '10'))
+MAX_IDLE = float(os.getenv('UPSTREAM_MAX_IDLE', '60'))
+STREAM_CHUNK_SIZE = int(os.getenv('UPSTREAM_STREAM_CHUNK_SIZE', str(64 * 1024)))
+MAX_ENDPOINTS = int(os.getenv('UPSTREAM_MAX_ENDPOINTS', '16'))
+
+# Cabeçalhos que valem só para um salto e não são repassados ao cliente
+HOP_BY_HOP_HEADERS = frozenset([
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailers', 'transfer-encoding', 'upgrade', 'server', 'date'
+])
+
+
+def passthrough_headers(headers):
+    return [(name, value) for name, value in headers.items() if name.lower() not in HOP_BY_HOP_HEADERS]
+
+
+def merge_headers(headers, extra):
+    # Os cabeçalhos do gateway (ex. traceparent) substituem os do cliente com o mesmo nome
+    if not extra:
+        return headers
+    merged = {name: value for name, value in (headers or {}).items() if name.lower() not in extra}
+    merged.update(extra)
+    return merged
+
+
+class PoolExhausted(UpstreamUnavailable, requests.exceptions.ConnectionError):
+    """Nenhuma conexão livre no pool dentro do tempo de espera (recusa do gateway, com Retry-After)."""
+
+
+class ServicePool:
+    """Pool keep-alive limitado de conexões para um microsserviço, distribuídas entre as suas réplicas."""
+
+    def __init__(self, name, urls, pool_size=POOL_SIZE, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, max_idle=MAX_IDLE, breaker=None, bulkhead=None, observer=None,
+                 span=None, balancer=None):
+        self.name = name
+        self.balancer = balancer or Balancer(name, urls)
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_idle = max_idle
+        self.breaker = breaker or CircuitBreaker(name)
+        # Com mais vagas no bulkhead que conexões no pool, a sobrecarga esperaria por conexão em vez
+        # de ser recusada na hora
+        self.bulkhead = bulkhead or Bulkhead(name, max_concurrent=min(BULKHEAD_MAX_CONCURRENCY, pool_size))
+        # Recebe (serviço, status ou 'error', duração) de cada chamada, para as métricas de latência
+        self.observer = observer
+        # Fábrica de spans (serviço, método, caminho) que devolve os cabeçalhos de propagação do trace
+        self.span = span
+
+        # Um pool de conexões por réplica, todos limitados pelo mesmo total de vagas do microsserviço
+        self.adapter = HTTPAdapter(pool_connections=MAX_ENDPOINTS, pool_maxsize=pool_size, pool_block=False,
+                                   max_retries=0)
+        self.session = requests.Session()
+        # O corpo é repassado sem decodificar, então só pedimos compressão quando o cliente pedir
+        self.session.headers['Accept-Encoding'] = 'identity'
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.waits = 0
+        self.requests = 0
+        self.idle_resets = 0
+        self.last_used = time.monotonic()
+
+    def acquire(self):
+        # Espera por uma vaga só quando o pool está cheio, contando a espera
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.waits += 1
+            if not self._slots.acquire(timeout=self.timeout[0]):
+                raise PoolExhausted(f'No free connection for {self.name}')
+
+        with self._lock:
+            now = time.monotonic()
+            # Conexões paradas por mais de max_idle provavelmente já foram fechadas pelo servidor
+            if self.in_use == 0 and now - self.last_used > self.max_idle:
+                self.adapter.poolmanager.clear()
+                self.idle_resets += 1
+            self.in_use += 1
+            self.requests += 1
+            self.last_used = now
+
+    def release(self):
+        with self._lock:
+            self.in_use -= 1
+            self.last_used = time.monotonic()
+        self._slots.release()
+
+    def _finish(self, endpoint, success):
+        self.balancer.release(endpoint, success)
+        self.release()
+        self.bulkhead.release()
+
+    def _record(self, status, duration):
+        self.breaker.record(status != 'error' and status < 500, duration)
+        if self.observer is not None:
+            self.observer(self.name, status, duration)
+
+    def request(self, method, path, stream=False, tried=None, **kwargs):
+        if self.span is None:
+            return self._request(method, path, stream, tried, **kwargs)
+        # O span cobre a espera por conexão livre e pela resposta do microsserviço
+        with self.span(self.name, method, path) as trace_headers:
+            kwargs['headers'] = merge_headers(kwargs.get('headers'), trace_headers)
+            return self._request(method, path, stream, tried, **kwargs)
+
+    def _request(self, method, path, stream, tried, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        # Bulkhead e circuit breaker recusam na hora, antes de ocupar uma conexão
+        self.bulkhead.acquire()
+        try:
+            self.breaker.before_call()
+        except BaseException:
+            self.bulkhead.release()
+            raise
+
+        started = time.monotonic()
+        try:
+            self.acquire()
+        except BaseException:
+            # Falta de conexão é do gateway, não do microsserviço: não conta como falha no breaker
+            self.breaker.cancel()
+            self.bulkhead.release()
+            raise
+        try:
+            # tried guarda as réplicas já usadas pelas tentativas da mesma chamada (hedging)
+            endpoint = self.balancer.choose(tried or ())
+        except BaseException:
+            self.breaker.cancel()
+            self.release()
+            self.bulkhead.release()
+            raise
+        if tried is not None:
+            tried.add(endpoint.url)
+        try:
+            response = self.session.request(method, endpoint.url + path, stream=stream, **kwargs)
+        except BaseException:
+            self._record('error', time.monotonic() - started)
+            self._finish(endpoint, False)
+            raise
+        self._record(response.status_code, time.monotonic() - started)
+        success = response.status_code < 500
+        if not stream:
+            self._finish(endpoint, success)
+            return response
+
+        # Em streaming a conexão só volta ao pool quando o corpo for consumido e a resposta fechada
+        close = response.close
+        released = []
+
+        def close_and_release():
+            close()
+            if not released:
+                released.append(True)
+                self._finish(endpoint, success)
+
+        response.close = close_and_release
+        return response
+
+    def idle_connections(self):
+        pools = self.adapter.poolmanager.pools
+        idle = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None and pool.pool is not None:
+                idle += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+        return idle
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pool_size': self.pool_size,
+                'in_use': self.in_use,
+                'idle': self.idle_connections(),
+                'waits': self.waits,
+                'requests': self.requests,
+                'idle_resets': self.idle_resets,
+                'breaker': self.breaker.stats(),
+                'bulkhead': self.bulkhead.stats(),
+                'balancer': self.balancer.stats()
+            }
+
+
+class UpstreamClient:
+    """Cliente compartilhado do gateway, com um pool por entrada de SERVICES."""
+
+    def __init__(self, services, hedger=None, source=None, **pool_options):
+        self.pools = {name: ServicePool(name, urls, **pool_options) for name, urls in services.items()}
+        self.hedger = hedger
+        # EndpointSource opcional: listas de réplicas recarregadas sem reiniciar o gateway
+        self.source = source
+
+    def refresh_endpoints(self):
+        if self.source is None:
+            return
+        services = self.source.poll()
+        if services:
+            for name, urls in services.items():
+                if name in self.pools:
+                    self.pools[name].balancer.update(urls)
+
+    def request(self, service, method, path, hedge=False, **kwargs):
+        self.refresh_endpoints()
+        pool = self.pools[service]
+        # Só GETs de rotas idempotentes marcadas com hedge=True ganham segunda tentativa,
+        # sempre que possível numa réplica diferente da primeira
+        if hedge and method == 'GET' and self.hedger is not None:
+            tried = set()
+            return self.hedger.run(service, lambda: pool.request(method, path, tried=tried, **kwargs))
+        return pool.request(method, path, **kwargs)
+
+    def get(self, service, path, **kwargs):
+        return self.request(service, 'GET', path, **kwargs)
+
+    def post(self, service, path, **kwargs):
+        return self.request(service, 'POST', path, **kwargs)
+
+    def stats(self):
+        self.refresh_endpoints()
+        return {name: pool.stats() for name, pool in self.pools.items()}
@@ -1,16 +1,36 @@
-from flask import Flask, render_template, request, redirect, session, flash, jsonify
+from flask import Flask, Response, render_template, request, redirect, session, flash, jsonify, stream_with_context
+from werkzeug.middleware.proxy_fix import ProxyFix
 import requests
 import datetime
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from shared.compression import compress_responses  # noqa: E402
+from shared.fastjson import use_fast_json  # noqa: E402
+from shared.metrics import instrument  # noqa: E402
+from shared.tracing import trace_headers, trace_requests  # noqa: E402
 
 app = Flask(__name__)
+use_fast_json(app)
+instrument(app, 'frontend')
+trace_requests(app, 'frontend')
+compress_responses(app)
 app.secret_key = 'secret-key'
+# Atrás do ALB o endereço da conexão é o do balanceador: o cliente vem do X-Forwarded-For.
+# Desligado por padrão: sem um proxy na frente, o cabeçalho seria o que o cliente quisesse
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=int(os.getenv('FRONTEND_TRUSTED_PROXIES', '0')))
 
 USE_DOCKER = os.getenv('USE_DOCKER', 'false').lower() == 'true'
 API_BASE = 'http://api-gateway:8000' if USE_DOCKER else 'http://localhost:8000'
 
+def client_headers():
+    # Leva o trace da página até o gateway, para ver o fluxo inteiro num só trace, e o IP do
+    # navegador: sem ele o gateway limitaria todas as chamadas anônimas do frontend num só balde
+    return {'X-Forwarded-For': request.remote_addr, **trace_headers()}
+
 def get_headers():
-    return {'Authorization': f'Bearer {session.get("token")}'}
+    return {'Authorization': f'Bearer {session.get("token")}', **client_headers()}
 
 @app.route('/')
 def index():
@@ -19,7 +39,7 @@ def index():
 @app.route('/signup', methods=['GET', 'POST'])
 def signup():
     if request.method == 'POST':
-        response = requests.post(f'{API_BASE}/auth/signup', json=request.form.to_dict())
+        response = requests.post(f'{API_BASE}/auth/signup', json=request.form.to_dict(), headers=client_headers())
         if response.status_code == 201:
             flash('Usuário criado com sucesso!')
             return redirect('/login')
@@ -29,7 +49,7 @@ def signup():
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
-        response = requests.post(f'{API_BASE}/auth/login', json=request.form.to_dict())
+        response = requests.post(f'{API_BASE}/auth/login', json=request.form.to_dict(), headers=client_headers())
         if response.status_code == 200:
             data = response.json()
             session['token'] = data['token']
@@ -62,7 +82,7 @@ def spaces():
     if 'token' not in session:
         return redirect('/login')
     
-    spaces = requests.get(f'{API_BASE}/spaces').json()
+    spaces = requests.get(f'{API_BASE}/spaces', headers=client_headers()).json()
     return render_template('spaces.html', spaces=spaces)
 
 @app.route('/spaces/create', methods=['GET', 'POST'])
@@ -93,9 +113,16 @@ def reservations():
     if 'token' not in session:
         return redirect('/login')
     
-    user = requests.get(f'{API_BASE}/users/me', headers=get_headers()).json()
-    reservations = requests.get(f'{API_BASE}/reservations/user/{user["id"]}', headers=get_headers()).json()
-    return render_template('reservations.html', reservations=reservations)
+    response = requests.get(f'{API_BASE}/bff/reservations', headers=get_headers())
+    try:
+        page = response.json()
+    except ValueError:
+        page = None
+    # Com o BFF em 502 a parte que respondeu ainda é exibida; a que falhou vem como None
+    reservations = page.get('reservations') if isinstance(page, dict) else None
+    if response.status_code != 200:
+        flash('Erro ao carregar reservas' if reservations is None else 'Algumas informações não puderam ser carregadas')
+    return render_template('reservations.html', reservations=reservations or [])
 
 @app.route('/reserve/<int:space_id>', methods=['GET', 'POST'])
 def reserve_space(space_id):
@@ -112,7 +139,7 @@ def reserve_space(space_id):
             'end_time': request.form['end_time'],
             'user_plan': 'basic'
         }
-        price_response = requests.post(f'{API_BASE}/pricing/calc', json=pricing_data)
+        price_response = requests.post(f'{API_BASE}/pricing/calc', json=pricing_data, headers=client_headers())
         total_price = price_response.json()['total']
         
         # Criar reserva
@@ -138,9 +165,9 @@ def reserve_space(space_id):
             
             flash('Reserva criada e pagamento processado!')
             return redirect('/reservations')
-        flash('Erro ao criar reserva')
+        flash('Espaço já reservado nesse horário' if response.status_code == 409 else 'Erro ao criar reserva')
     
-    space = requests.get(f'{API_BASE}/spaces/{space_id}').json()
+    space = requests.get(f'{API_BASE}/spaces/{space_id}', headers=client_headers()).json()
     return render_template('reserve.html', space=space)
 
 @app.route('/checkin/<int:reservation_id>')
@@ -184,9 +211,8 @@ def financial():
     if 'token' not in session:
         return redirect('/login')
     
-    revenue = requests.get(f'{API_BASE}/financial/revenue', headers=get_headers()).json()
-    expenses = requests.get(f'{API_BASE}/financial/expenses', headers=get_headers()).json()
-    return render_template('financial.html', revenue=revenue, expenses=expenses)
+    page = requests.get(f'{API_BASE}/bff/financial', headers=get_headers()).json()
+    return render_template('financial.html', revenue=page['revenue'], expenses=page['expenses'])
 
 @app.route('/admin')
 def admin_dashboard():
@@ -195,10 +221,11 @@ def admin_dashboard():
         return redirect('/login')
     
     try:
-        analytics = requests.get(f'{API_BASE}/analytics/dashboard', headers=get_headers()).json()
-        spaces = requests.get(f'{API_BASE}/spaces').json()
-        revenue = requests.get(f'{API_BASE}/financial/revenue', headers=get_headers()).json()
-        return render_template('admin.html', analytics=analytics, spaces=spaces, revenue=revenue)
+        response = requests.get(f'{API_BASE}/bff/admin-dashboard', headers=get_headers())
+        response.raise_for_status()
+        page = response.json()
+        return render_template('admin.html', analytics=page['analytics'], spaces=page['spaces'],
+                               revenue=page['revenue'])
     except:
         flash('Erro ao carregar painel')
         return redirect('/login')
@@ -209,12 +236,41 @@ def admin_users():
         return redirect('/login')
     return render_template('admin_users.html', users=list(requests.get(f'{API_BASE}/admin/users', headers=get_headers()).json()))
 
+RESERVATION_FILTERS = ('status', 'space_id', 'from', 'to')
+
+def reservation_filters():
+    return {name: request.args[name] for name in RESERVATION_FILTERS if request.args.get(name)}
+
 @app.route('/admin/reservations')
 def admin_reservations():
     if 'token' not in session or session.get('role') != 'admin':
         return redirect('/login')
-    reservations = requests.get(f'{API_BASE}/admin/reservations', headers=get_headers()).json()
-    return render_template('admin_reservations.html', reservations=reservations)
+    # Uma página por vez: o cursor da próxima vem do gateway em X-Next-Cursor
+    filters = reservation_filters()
+    params = dict(filters, cursor=request.args['cursor']) if request.args.get('cursor') else filters
+    response = requests.get(f'{API_BASE}/admin/reservations', params=params, headers=get_headers())
+    reservations = response.json() if response.status_code == 200 else []
+    if response.status_code == 400:
+        flash('Filtro inválido')
+    return render_template('admin_reservations.html', reservations=reservations, filters=filters,
+                           next_cursor=response.headers.get('X-Next-Cursor'))
+
+@app.route('/admin/reservations/export')
+def export_reservations():
+    if 'token' not in session or session.get('role') != 'admin':
+        return redirect('/login')
+    upstream = requests.get(f'{API_BASE}/admin/reservations', params=dict(reservation_filters(), format='ndjson'),
+                            headers=get_headers(), stream=True)
+
+    def body():
+        # Repassa a exportação do gateway em blocos, sem juntar o arquivo na memória
+        try:
+            yield from upstream.iter_content(65536)
+        finally:
+            upstream.close()
+
+    return Response(stream_with_context(body()), status=upstream.status_code, mimetype='application/x-ndjson',
+                    headers={'Content-Disposition': 'attachment; filename=reservas.ndjson'})
 
 @app.route('/admin/notify', methods=['POST'])
 def admin_notify():
@@ -251,7 +307,7 @@ def edit_space(space_id):
         flash('Espaço atualizado com sucesso!')
         return redirect('/spaces')
     
-    space = requests.get(f'{API_BASE}/spaces/{space_id}').json()
+    space = requests.get(f'{API_BASE}/spaces/{space_id}', headers=client_headers()).json()
     return render_template('edit_space.html', space=space)
 
 @app.route('/spaces/<int:space_id>/delete', methods=['POST'])
@@ -1,9 +1,19 @@
 from flask import Flask, jsonify
-from flasgger import Swagger
 import random
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from shared.apidocs import setup_apidocs  # noqa: E402
+from shared.fastjson import use_fast_json  # noqa: E402
+from shared.metrics import instrument  # noqa: E402
+from shared.tracing import trace_requests  # noqa: E402
 
 app = Flask(__name__)
-swagger = Swagger(app)
+use_fast_json(app)
+instrument(app, 'ms-analytics')
+trace_requests(app, 'ms-analytics')
+swagger = setup_apidocs(app)
 
 @app.route('/analytics/dashboard', methods=['GET'])
 def get_dashboard():
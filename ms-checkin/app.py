@@ -1,10 +1,20 @@
 from flask import Flask, request, jsonify
-from flasgger import Swagger
 import requests
 import datetime
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from shared.apidocs import setup_apidocs  # noqa: E402
+from shared.fastjson import use_fast_json  # noqa: E402
+from shared.metrics import instrument  # noqa: E402
+from shared.tracing import client_span, trace_requests  # noqa: E402
 
 app = Flask(__name__)
-swagger = Swagger(app)
+use_fast_json(app)
+instrument(app, 'ms-checkin')
+trace_requests(app, 'ms-checkin')
+swagger = setup_apidocs(app)
 
 @app.route('/checkin/<int:reservation_id>', methods=['POST'])
 def checkin(reservation_id):
@@ -38,7 +48,9 @@ def checkin(reservation_id):
     """
     # Validar reserva
     try:
-        response = requests.get(f'http://ms-reservas:5003/reservations/{reservation_id}')
+        path = f'/reservations/{reservation_id}'
+        with client_span('ms-reservas', 'GET', path) as headers:
+            response = requests.get(f'http://ms-reservas:5003{path}', headers=headers)
         reservation = response.json()
         
         now = datetime.datetime.now()
@@ -1,8 +1,18 @@
 from flask import Flask, request, jsonify
-from flasgger import Swagger
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from shared.apidocs import setup_apidocs  # noqa: E402
+from shared.fastjson import use_fast_json  # noqa: E402
+from shared.metrics import instrument  # noqa: E402
+from shared.tracing import trace_requests  # noqa: E402
 
 app = Flask(__name__)
-swagger = Swagger(app)
+use_fast_json(app)
+instrument(app, 'ms-espacos')
+trace_requests(app, 'ms-espacos')
+swagger = setup_apidocs(app)
 
 spaces_db = {}
 
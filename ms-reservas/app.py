@@ -1,10 +1,65 @@
-from flask import Flask, request, jsonify
-from flasgger import Swagger
+from flask import Flask, Response, request, jsonify, stream_with_context
+from itertools import islice
+from urllib.parse import urlencode
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from shared.apidocs import setup_apidocs  # noqa: E402
+from shared.fastjson import dumps_bytes, use_fast_json  # noqa: E402
+from shared.metrics import instrument  # noqa: E402
+from shared.tracing import trace_requests  # noqa: E402
+from intervals import parse_time  # noqa: E402
+from journal import JOURNAL_DIR, Journal  # noqa: E402
+from recurrence import expand  # noqa: E402
+from store import ReservationStore  # noqa: E402
 
 app = Flask(__name__)
-swagger = Swagger(app)
+use_fast_json(app)
+instrument(app, 'ms-reservas')
+trace_requests(app, 'ms-reservas')
+swagger = setup_apidocs(app)
+
+# Com JOURNAL_DIR as reservas sobrevivem a reinícios: o store é reconstruído do snapshot e do log
+store = ReservationStore.open(Journal(JOURNAL_DIR)) if JOURNAL_DIR else ReservationStore()
+
+# Paginação da listagem do admin
+ADMIN_PAGE_SIZE = int(os.getenv('ADMIN_PAGE_SIZE', '100'))
+ADMIN_PAGE_MAX = int(os.getenv('ADMIN_PAGE_MAX', '1000'))
+EXPORT_CHUNK = 500
 
-reservations_db = {}
+# Maior número de reservas num POST /reservations/bulk, depois de expandir a recorrência
+BULK_MAX = int(os.getenv('BULK_MAX', '1000'))
+
+def new_reservation(data):
+    """(reserva, início, fim) a partir do corpo de uma criação; ValueError com a mensagem de erro."""
+    if not isinstance(data, dict):
+        raise ValueError('Invalid reservation')
+    try:
+        start, end = parse_time(data['start_time']), parse_time(data['end_time'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Invalid start_time or end_time')
+    if end <= start:
+        raise ValueError('end_time must be after start_time')
+    missing = [field for field in ('user_id', 'space_id', 'total_price') if field not in data]
+    if missing:
+        raise ValueError(f"Missing {', '.join(missing)}")
+    if not isinstance(data['user_id'], int) or isinstance(data['user_id'], bool):
+        raise ValueError('Invalid user_id')
+    # O espaço é a chave do índice de conflitos e dos locks: "1" e 1 não podem ser espaços distintos
+    if not isinstance(data['space_id'], int) or isinstance(data['space_id'], bool):
+        raise ValueError('Invalid space_id')
+    if not isinstance(data['total_price'], (int, float)) or isinstance(data['total_price'], bool):
+        raise ValueError('Invalid total_price')
+    reservation = {
+        'user_id': data['user_id'],
+        'space_id': data['space_id'],
+        'start_time': data['start_time'],
+        'end_time': data['end_time'],
+        'status': 'active',
+        'total_price': data['total_price']
+    }
+    return reservation, start, end
 
 @app.route('/reservations', methods=['POST'])
 def create_reservation():
@@ -42,21 +97,155 @@ def create_reservation():
         description: Reserva criada
       400:
         description: Dados inválidos
+      409:
+        description: Espaço já reservado no período
     """
-    data = request.json
-    reservation_id = len(reservations_db) + 1
-    reservation = {
-        'id': reservation_id,
-        'user_id': data['user_id'],
-        'space_id': data['space_id'],
-        'start_time': data['start_time'],
-        'end_time': data['end_time'],
-        'status': 'active',
-        'total_price': data['total_price']
-    }
-    reservations_db[reservation_id] = reservation
+    try:
+        reservation, start, end = new_reservation(request.json)
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    reservation_id, conflict_id = store.create(reservation, start, end)
+    if conflict_id is not None:
+        return jsonify({'error': 'Space already booked for this period', 'conflict_id': conflict_id}), 409
     return jsonify({'id': reservation_id}), 201
 
+@app.route('/reservations/bulk', methods=['POST'])
+def create_reservations_bulk():
+    """
+    Criar várias reservas de uma vez, tudo ou nada
+    ---
+    tags:
+      - Reservas
+    parameters:
+      - in: body
+        name: bulk
+        description: >
+          Uma lista em `reservations` ou uma reserva com `recurrence`, expandida no servidor.
+          frequency daily repete a cada `interval` dias nos `weekdays` (0 = segunda); weekly, a
+          cada `interval` semanas. Termina em `until` ou depois de `count` ocorrências.
+        schema:
+          type: object
+          properties:
+            reservations:
+              type: array
+              items:
+                type: object
+            user_id:
+              type: integer
+            space_id:
+              type: integer
+            start_time:
+              type: string
+              format: date-time
+              description: Primeira ocorrência
+            end_time:
+              type: string
+              format: date-time
+            total_price:
+              type: number
+              description: Preço de cada ocorrência
+            recurrence:
+              type: object
+              properties:
+                frequency:
+                  type: string
+                  enum: [daily, weekly]
+                interval:
+                  type: integer
+                weekdays:
+                  type: array
+                  items:
+                    type: integer
+                until:
+                  type: string
+                count:
+                  type: integer
+    responses:
+      201:
+        description: Todas as reservas criadas; ids na ordem do pedido e soma dos preços
+      400:
+        description: Dados ou regra de recorrência inválidos (index aponta o item)
+      409:
+        description: Conflitos com reservas existentes ou entre itens do lote; nada foi criado
+    """
+    data = request.json
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Invalid request body'}), 400
+    if 'recurrence' in data:
+        try:
+            periods = expand(data.get('start_time'), data.get('end_time'), data['recurrence'], BULK_MAX)
+        except ValueError as error:
+            return jsonify({'error': str(error)}), 400
+        items = [dict(data, start_time=start_time, end_time=end_time) for start_time, end_time in periods]
+    else:
+        items = data.get('reservations')
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'Expected reservations or recurrence'}), 400
+        if len(items) > BULK_MAX:
+            return jsonify({'error': f'At most {BULK_MAX} reservations per request'}), 400
+
+    batch = []
+    for index, item in enumerate(items):
+        try:
+            batch.append(new_reservation(item))
+        except ValueError as error:
+            return jsonify({'error': str(error), 'index': index}), 400
+    ids, conflicts = store.create_many(batch)
+    if conflicts:
+        return jsonify({'error': 'Space already booked for this period', 'conflicts': conflicts}), 409
+    return jsonify({'ids': ids, 'count': len(ids),
+                    'total_price': sum(reservation['total_price'] for reservation, _, _ in batch)}), 201
+
+@app.route('/reservations', methods=['GET'])
+def get_reservations_in_period():
+    """
+    Listar reservas que se sobrepõem a um período
+    ---
+    tags:
+      - Reservas
+    parameters:
+      - in: query
+        name: from
+        type: string
+        format: date-time
+        required: true
+      - in: query
+        name: to
+        type: string
+        format: date-time
+        required: true
+      - in: query
+        name: space_id
+        type: integer
+        required: false
+      - in: query
+        name: status
+        type: string
+        enum: [active, cancelled]
+        required: false
+    responses:
+      200:
+        description: Reservas com início antes de to e fim depois de from, em ordem de início
+      400:
+        description: Parâmetros inválidos
+    """
+    try:
+        start, end = parse_time(request.args['from']), parse_time(request.args['to'])
+    except (KeyError, ValueError):
+        return jsonify({'error': 'Invalid from or to'}), 400
+    if end <= start:
+        return jsonify({'error': 'to must be after from'}), 400
+    space_id = request.args.get('space_id')
+    if space_id:
+        try:
+            space_id = int(space_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid space_id'}), 400
+    status = request.args.get('status')
+    if status and status not in ('active', 'cancelled'):
+        return jsonify({'error': 'Invalid status'}), 400
+    return jsonify(store.between(start, end, space_id=space_id or None, status=status or None))
+
 @app.route('/reservations/<int:reservation_id>', methods=['GET'])
 def get_reservation(reservation_id):
     """
@@ -75,7 +264,7 @@ def get_reservation(reservation_id):
       404:
         description: Reserva não encontrada
     """
-    reservation = reservations_db.get(reservation_id)
+    reservation = store.get(reservation_id)
     if not reservation:
         return jsonify({'error': 'Reservation not found'}), 404
     return jsonify(reservation)
@@ -96,7 +285,7 @@ def get_user_reservations(user_id):
       200:
         description: Lista de reservas do usuário
     """
-    user_reservations = [r for r in reservations_db.values() if r['user_id'] == user_id]
+    user_reservations = store.find('user_id', user_id)
     return jsonify(user_reservations)
 
 @app.route('/reservations/<int:reservation_id>', methods=['DELETE'])
@@ -117,24 +306,118 @@ def cancel_reservation(reservation_id):
       404:
         description: Reserva não encontrada
     """
-    reservation = reservations_db.get(reservation_id)
-    if not reservation:
+    # O horário volta a ficar livre para novas reservas
+    if not store.cancel(reservation_id):
         return jsonify({'error': 'Reservation not found'}), 404
-    reservation['status'] = 'cancelled'
     return jsonify({'message': 'Reservation cancelled'})
 
+def listing_filters(args):
+    """Filtros da listagem do admin; ValueError com a mensagem de erro para parâmetros inválidos."""
+    filters = {}
+    try:
+        filters['after'] = int(args.get('cursor', 0))
+    except ValueError:
+        raise ValueError('Invalid cursor')
+    status = args.get('status')
+    if status:
+        if status not in ('active', 'cancelled'):
+            raise ValueError('Invalid status')
+        filters['status'] = status
+    if args.get('space_id'):
+        try:
+            filters['space_id'] = int(args['space_id'])
+        except ValueError:
+            raise ValueError('Invalid space_id')
+    for name, key in (('from', 'start_from'), ('to', 'start_to')):
+        if args.get(name):
+            try:
+                filters[key] = parse_time(args[name])
+            except ValueError:
+                raise ValueError(f'Invalid {name}')
+    return filters
+
+def export_ndjson(reservations):
+    # Uma reserva por linha, enviadas em blocos: a memória não cresce com o total exportado
+    chunk = []
+    for reservation in reservations:
+        chunk.append(dumps_bytes(reservation))
+        if len(chunk) == EXPORT_CHUNK:
+            yield b'\n'.join(chunk) + b'\n'
+            chunk = []
+    if chunk:
+        yield b'\n'.join(chunk) + b'\n'
+
 @app.route('/admin/reservations', methods=['GET'])
 def get_all_reservations():
     """
-    Listar todas as reservas (Admin)
+    Listar reservas (Admin), paginadas por cursor
     ---
     tags:
       - Admin
+    parameters:
+      - in: query
+        name: status
+        type: string
+        enum: [active, cancelled]
+        required: false
+      - in: query
+        name: space_id
+        type: integer
+        required: false
+      - in: query
+        name: from
+        type: string
+        format: date-time
+        required: false
+        description: Início da reserva a partir deste horário
+      - in: query
+        name: to
+        type: string
+        format: date-time
+        required: false
+        description: Início da reserva antes deste horário
+      - in: query
+        name: cursor
+        type: string
+        required: false
+        description: Valor de X-Next-Cursor da página anterior
+      - in: query
+        name: limit
+        type: integer
+        required: false
+      - in: query
+        name: format
+        type: string
+        enum: [json, ndjson]
+        required: false
+        description: ndjson exporta todas as reservas filtradas em streaming, uma por linha
     responses:
       200:
-        description: Lista de todas as reservas
+        description: Página de reservas em ordem de id; X-Next-Cursor e Link indicam a próxima
+      400:
+        description: Parâmetros inválidos
     """
-    return jsonify(list(reservations_db.values()))
+    try:
+        filters = listing_filters(request.args)
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+
+    if request.args.get('format') == 'ndjson' or request.accept_mimetypes.best == 'application/x-ndjson':
+        return Response(stream_with_context(export_ndjson(store.scan(**filters))), mimetype='application/x-ndjson')
+
+    try:
+        limit = min(max(int(request.args.get('limit', ADMIN_PAGE_SIZE)), 1), ADMIN_PAGE_MAX)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+    # Um item a mais só para saber se existe próxima página
+    page = list(islice(store.scan(**filters), limit + 1))
+    response = jsonify(page[:limit])
+    if len(page) > limit:
+        cursor = str(page[limit - 1]['id'])
+        query = urlencode({**request.args.to_dict(), 'cursor': cursor})
+        response.headers['X-Next-Cursor'] = cursor
+        response.headers['Link'] = f'<{request.path}?{query}>; rel="next"'
+    return response
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5003)
\ No newline at end of file
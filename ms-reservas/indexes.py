@@ -0,0 +1,70 @@
+class SecondaryIndex:
+    """Ids das reservas agrupados pelo valor de um campo (user_id, space_id, status).
+
+    Cada grupo é um dict usado como conjunto ordenado: a busca custa O(k) no tamanho do grupo
+    e devolve os ids na ordem de inserção, a mesma da varredura de todas as reservas.
+    """
+
+    __slots__ = ('field', 'groups')
+
+    def __init__(self, field):
+        self.field = field
+        self.groups = {}
+
+    def add(self, reservation):
+        group = self.groups.get(reservation[self.field])
+        if group is None:
+            group = self.groups[reservation[self.field]] = {}
+        group[reservation['id']] = None
+
+    def extend(self, reservations):
+        groups, field = self.groups, self.field
+        for reservation in reservations:
+            group = groups.get(reservation[field])
+            if group is None:
+                group = groups[reservation[field]] = {}
+            group[reservation['id']] = None
+
+    def discard(self, reservation):
+        group = self.groups.get(reservation[self.field])
+        if group is not None:
+            group.pop(reservation['id'], None)
+            if not group:
+                del self.groups[reservation[self.field]]
+
+    def ids(self, value):
+        return list(self.groups.get(value, ()))
+
+    def count(self, value):
+        return len(self.groups.get(value, ()))
+
+
+class ReservationIndexes:
+    """Índices secundários das reservas, mantidos junto com cada criação e alteração."""
+
+    def __init__(self, fields):
+        self.indexes = {field: SecondaryIndex(field) for field in fields}
+
+    def add(self, reservation):
+        for index in self.indexes.values():
+            index.add(reservation)
+
+    def extend(self, reservations):
+        """Indexa várias reservas de uma vez (reconstrução na subida)."""
+        for index in self.indexes.values():
+            index.extend(reservations)
+
+    def update(self, reservation, **changes):
+        """Aplica as alterações na reserva e move o id para os novos grupos dos campos indexados."""
+        touched = [self.indexes[field] for field in changes if field in self.indexes]
+        for index in touched:
+            index.discard(reservation)
+        reservation.update(changes)
+        for index in touched:
+            index.add(reservation)
+
+    def ids(self, field, value):
+        return self.indexes[field].ids(value)
+
+    def count(self, field, value):
+        return self.indexes[field].count(value)
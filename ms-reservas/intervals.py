@@ -0,0 +1,224 @@
+import bisect
+from datetime import datetime, timezone
+from itertools import repeat
+from math import frexp
+from operator import itemgetter, sub, truediv
+
+HOUR = 3600.0
+
+
+def parse_time(value):
+    """Converte o horário ISO 8601 da reserva em segundos (sem fuso = UTC), uma vez, na criação."""
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class SpaceSchedule:
+    """Reservas ativas de um espaço, ordenadas pelo início.
+
+    Como as reservas ativas de um espaço nunca se sobrepõem, a ordem pelo início é também a
+    ordem pelo fim: para saber se [start, end) colide basta olhar a última reserva que começa
+    antes de `end` (busca binária).
+    """
+
+    __slots__ = ('starts', 'ends', 'ids')
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.ids = []
+
+    @classmethod
+    def build(cls, intervals):
+        """Monta a agenda de uma vez a partir de tuplas (start, end, id) sem sobreposição."""
+        schedule = cls()
+        intervals.sort()
+        schedule.starts = [start for start, _, _ in intervals]
+        schedule.ends = [end for _, end, _ in intervals]
+        schedule.ids = [reservation_id for _, _, reservation_id in intervals]
+        return schedule
+
+    def conflict(self, start, end):
+        """Id da reserva ativa que se sobrepõe a [start, end), ou None."""
+        index = bisect.bisect_left(self.starts, end) - 1
+        if index >= 0 and self.ends[index] > start:
+            return self.ids[index]
+        return None
+
+    def add(self, start, end, reservation_id):
+        index = bisect.bisect_left(self.starts, start)
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+        self.ids.insert(index, reservation_id)
+
+    def remove(self, start, reservation_id):
+        index = bisect.bisect_left(self.starts, start)
+        while index < len(self.starts) and self.starts[index] == start:
+            if self.ids[index] == reservation_id:
+                del self.starts[index], self.ends[index], self.ids[index]
+                return True
+            index += 1
+        return False
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class IntervalIndex:
+    """Um SpaceSchedule por space_id: verificação de conflito em O(log n) por espaço."""
+
+    def __init__(self):
+        self.spaces = {}
+
+    @classmethod
+    def build(cls, intervals_by_space):
+        """Índice completo a partir de {space_id: [(start, end, id), ...]}, na subida do serviço."""
+        index = cls()
+        index.spaces = {space_id: SpaceSchedule.build(intervals) for space_id, intervals in intervals_by_space.items()}
+        return index
+
+    def conflict(self, space_id, start, end):
+        schedule = self.spaces.get(space_id)
+        return schedule.conflict(start, end) if schedule is not None else None
+
+    def add(self, space_id, start, end, reservation_id):
+        schedule = self.spaces.get(space_id)
+        if schedule is None:
+            schedule = self.spaces[space_id] = SpaceSchedule()
+        schedule.add(start, end, reservation_id)
+
+    def remove(self, space_id, start, reservation_id):
+        schedule = self.spaces.get(space_id)
+        return schedule is not None and schedule.remove(start, reservation_id)
+
+
+class StartList:
+    """Listas paralelas (início, fim, id) ordenadas pelo início, como em SpaceSchedule.
+
+    Aqui as reservas podem se sobrepor, então a ordem pelo início não é a ordem pelo fim:
+    guarda-se a maior duração da lista, e uma reserva em andamento em `start` começou no
+    máximo `longest` antes.
+    """
+
+    __slots__ = ('starts', 'ends', 'ids', 'longest')
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.ids = []
+        self.longest = 0.0
+
+    def add(self, start, end, reservation_id):
+        # bisect_right: com o mesmo início, a ordem é a de criação
+        index = bisect.bisect_right(self.starts, start)
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+        self.ids.insert(index, reservation_id)
+        if end - start > self.longest:
+            self.longest = end - start
+
+    def overlapping(self, start, end):
+        """(início, id) das reservas da lista que se sobrepõem a [start, end)."""
+        first = bisect.bisect_right(self.starts, start - self.longest)
+        last = bisect.bisect_left(self.starts, end)
+        starts, ends, ids = self.starts, self.ends, self.ids
+        return [(starts[index], ids[index]) for index in range(first, last) if ends[index] > start]
+
+
+def duration_class(start, end):
+    """Classe de duração: o expoente e com 2^(e-1) <= duração em horas < 2^e (1 h a 2 h: 1, 2 h a 4 h: 2...)."""
+    return frexp((end - start) / HOUR)[1]
+
+
+class StartIndex:
+    """Reservas (ativas e canceladas) ordenadas pelo início, para as consultas por período.
+
+    Uma StartList por classe de duração. Numa lista única, uma só reserva de anos faria toda
+    consulta recuar anos antes de `start`. Numa classe, toda reserva dura mais que metade da
+    maior: as reservas lidas à toa, que terminaram antes de `start`, são da ordem das que de
+    fato estão em andamento, e a consulta custa O(c log n + k) para as c classes em uso.
+    """
+
+    __slots__ = ('classes', 'count')
+
+    def __init__(self):
+        self.classes = {}
+        self.count = 0
+
+    @classmethod
+    def build(cls, groups):
+        """Monta o índice de uma vez a partir de {classe: [(start, id, end, ...), ...]} já ordenadas."""
+        index = cls()
+        for key, group in groups.items():
+            run = index.classes[key] = StartList()
+            run.starts = [interval[0] for interval in group]
+            run.ids = [interval[1] for interval in group]
+            run.ends = [interval[2] for interval in group]
+            run.longest = max(map(sub, run.ends, run.starts))
+            index.count += len(group)
+        return index
+
+    def add(self, start, end, reservation_id):
+        key = duration_class(start, end)
+        run = self.classes.get(key)
+        if run is None:
+            run = self.classes[key] = StartList()
+        run.add(start, end, reservation_id)
+        self.count += 1
+
+    def overlapping(self, start, end):
+        """Ids das reservas que se sobrepõem a [start, end), em ordem de início."""
+        found = []
+        for run in self.classes.values():
+            found.extend(run.overlapping(start, end))
+        if len(self.classes) > 1:
+            found.sort()
+        return [reservation_id for _, reservation_id in found]
+
+    def __len__(self):
+        return self.count
+
+
+class TimeIndex:
+    """Um StartIndex com todas as reservas e um por space_id, para consultar um período com ou sem espaço."""
+
+    def __init__(self):
+        self.everything = StartIndex()
+        self.spaces = {}
+
+    @classmethod
+    def build(cls, intervals):
+        """Índice completo a partir de tuplas (start, id, end, space_id) em ordem de id, na subida do serviço."""
+        # Uma ordenação só, estável e comparando só o início (bem mais barato que comparar as tuplas):
+        # com o mesmo início fica a ordem de id, e cada espaço recebe as suas reservas já em ordem
+        intervals.sort(key=itemgetter(0))
+        # Classe de cada reserva calculada uma vez (em C, sem uma chamada Python por reserva),
+        # para o índice geral e para o do espaço
+        durations = map(sub, map(itemgetter(2), intervals), map(itemgetter(0), intervals))
+        keys = map(itemgetter(1), map(frexp, map(truediv, durations, repeat(HOUR))))
+        everything, by_space = {}, {}
+        for interval, key in zip(intervals, keys):
+            everything.setdefault(key, []).append(interval)
+            by_space.setdefault((interval[3], key), []).append(interval)
+        spaces = {}
+        for (space_id, key), group in by_space.items():
+            spaces.setdefault(space_id, {})[key] = group
+        index = cls()
+        index.everything = StartIndex.build(everything)
+        index.spaces = {space_id: StartIndex.build(groups) for space_id, groups in spaces.items()}
+        return index
+
+    def add(self, space_id, start, end, reservation_id):
+        self.everything.add(start, end, reservation_id)
+        schedule = self.spaces.get(space_id)
+        if schedule is None:
+            schedule = self.spaces[space_id] = StartIndex()
+        schedule.add(start, end, reservation_id)
+
+    def overlapping(self, start, end, space_id=None):
+        if space_id is None:
+            return self.everything.overlapping(start, end)
+        schedule = self.spaces.get(space_id)
+        return schedule.overlapping(start, end) if schedule is not None else []
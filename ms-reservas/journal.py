@@ -0,0 +1,279 @@
+import atexit
+import fcntl
+import glob
+import os
+import threading
+
+from shared.fastjson import dumps_bytes, loads
+
+# Persistência das reservas: sem JOURNAL_DIR os dados ficam só na memória (testes, desenvolvimento)
+JOURNAL_DIR = os.getenv('JOURNAL_DIR', '')
+JOURNAL_FSYNC = os.getenv('JOURNAL_FSYNC', 'always')
+JOURNAL_SNAPSHOT_EVERY = int(os.getenv('JOURNAL_SNAPSHOT_EVERY', '100000'))
+
+FSYNC_MODES = ('always', 'batch', 'off')
+SNAPSHOT = 'snapshot.ndjson'
+SEGMENT = 'journal-{:08d}.log'
+
+
+class JournalError(RuntimeError):
+    """O log não aceita mais gravações (falha de disco ou processo filho de um fork)."""
+
+
+class Journal:
+    """Log append-only das alterações das reservas, com group commit e snapshots compactados.
+
+    Cada registro é uma linha JSON. As gravações entram numa fila e uma única thread grava e
+    sincroniza tudo o que acumulou desde o último fsync de uma vez (group commit), de modo que
+    o custo do fsync é dividido entre as requisições simultâneas. O log é dividido em segmentos:
+    a compactação abre um segmento novo, grava num snapshot o estado que cobre os anteriores e
+    então os apaga. Na subida, `replay()` lê o snapshot e os segmentos seguintes.
+
+    Modos de fsync: 'always' (a gravação só retorna depois do fsync do seu grupo), 'batch' (não
+    espera; os grupos são sincronizados em segundo plano logo em seguida) e 'off' (sem fsync).
+    """
+
+    def __init__(self, directory, fsync=JOURNAL_FSYNC, snapshot_every=JOURNAL_SNAPSHOT_EVERY):
+        if fsync not in FSYNC_MODES:
+            raise ValueError(f'Invalid JOURNAL_FSYNC {fsync!r}, expected one of {FSYNC_MODES}')
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fsync = fsync
+        self.snapshot_every = snapshot_every
+        # Um único processo grava no diretório: num restart gracioso o worker novo espera o antigo sair
+        self._lock_file = open(os.path.join(directory, 'LOCK'), 'ab')
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+
+        self._lock = threading.Lock()
+        self._pending = threading.Condition(self._lock)
+        self._durable = threading.Condition(self._lock)
+        self._queue = []
+        self._queued = 0
+        self._written = 0
+        self._changes = 0
+        self._error = None
+        self._closed = False
+        self._file = None
+        self._thread = None
+        self._compactor = None
+        self._compacting = False
+        self.generation = 0
+        self.since_snapshot = 0
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _segments(self):
+        segments = []
+        for path in glob.glob(self._path(SEGMENT.replace('{:08d}', '*'))):
+            name = os.path.basename(path)
+            segments.append(int(name[len('journal-'):-len('.log')]))
+        return sorted(segments)
+
+    def replay(self):
+        """Registros do snapshot e dos segmentos que ele não cobre, na ordem em que foram gravados."""
+        first = 0
+        if os.path.exists(self._path(SNAPSHOT)):
+            with open(self._path(SNAPSHOT), 'rb') as snapshot:
+                header, _, body = snapshot.read().partition(b'\n')
+            first = loads(header)['segment']
+            yield from map(loads, body.split(b'\n')[:-1])
+        for generation in self._segments():
+            if generation < first:
+                # Compactação interrompida depois de trocar o snapshot: o segmento já está coberto
+                os.remove(self._path(SEGMENT.format(generation)))
+                continue
+            records = self._read_segment(self._path(SEGMENT.format(generation)))
+            self.since_snapshot += len(records)
+            yield from records
+            self.generation = generation
+        self.generation = max(self.generation, first)
+
+    def _read_segment(self, path):
+        with open(path, 'rb') as segment:
+            data = segment.read()
+        lines = data.split(b'\n')
+        # Depois do último '\n' só pode haver uma linha cortada por uma queda no meio da gravação
+        valid = len(data) - len(lines.pop())
+        try:
+            records = list(map(loads, lines))
+        except ValueError:
+            records = []
+            for index, line in enumerate(lines):
+                try:
+                    records.append(loads(line))
+                except ValueError:
+                    if index < len(lines) - 1:
+                        offset = sum(len(previous) + 1 for previous in lines[:index])
+                        raise JournalError(f'Corrupted journal segment {path} at offset {offset}')
+                    valid -= len(line) + 1
+        if valid < len(data):
+            # A gravação cortada nunca foi confirmada ao cliente: sai do segmento
+            with open(path, 'rb+') as segment:
+                segment.truncate(valid)
+        return records
+
+    def start(self, compactor=None):
+        """Abre um segmento novo e inicia a thread de gravação; chamado depois do replay."""
+        self._compactor = compactor
+        self.generation += 1
+        self._file = open(self._path(SEGMENT.format(self.generation)), 'ab')
+        self._sync_directory()
+        self._thread = threading.Thread(target=self._run, name='journal-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        # O estado em memória do mestre fica velho depois do fork: o worker precisa abrir o próprio log
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+        if self.since_snapshot >= self.snapshot_every:
+            self._start_compaction()
+
+    def _after_fork(self):
+        self._error = JournalError('Journal opened before fork; run ms-reservas with GUNICORN_PRELOAD=false')
+
+    def append(self, record, count=1):
+        """Enfileira o registro e devolve sua posição, para `wait()` depois de soltar os locks.
+
+        `count` é o número de alterações no registro (um lote conta cada reserva), usado para
+        decidir quando compactar.
+        """
+        line = dumps_bytes(record) + b'\n'
+        with self._lock:
+            if self._error is not None:
+                raise self._error
+            if self._closed:
+                raise JournalError('Journal is closed')
+            self._queue.append(line)
+            self._queued += 1
+            self._changes += count
+            self._pending.notify()
+            return self._queued
+
+    def wait(self, position):
+        """No modo 'always', bloqueia até o registro estar no disco."""
+        if self.fsync != 'always' or position is None:
+            return
+        with self._lock:
+            while self._written < position:
+                if self._error is not None:
+                    raise self._error
+                self._durable.wait()
+
+    def rotate(self):
+        """Fecha o segmento atual na posição de agora; devolve a geração do novo segmento."""
+        with self._lock:
+            if self._closed:
+                raise JournalError('Journal is closed')
+            self.generation += 1
+            self._queue.append(self.generation)
+            self._queued += 1
+            self._pending.notify()
+            return self.generation, self._queued
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._queue and not self._closed:
+                    self._pending.wait()
+                if not self._queue:
+                    return
+                batch, self._queue = self._queue, []
+                changes, self._changes = self._changes, 0
+                position = self._queued
+            try:
+                self._write(batch)
+            except OSError as error:
+                # Depois de um fsync com erro não se sabe o que chegou ao disco: para de aceitar gravações
+                with self._lock:
+                    self._error = JournalError(f'Journal write failed: {error}')
+                    self._durable.notify_all()
+                return
+            with self._lock:
+                self._written = position
+                self._durable.notify_all()
+            self.since_snapshot += changes
+            if self.since_snapshot >= self.snapshot_every:
+                self._start_compaction()
+
+    def _write(self, batch):
+        lines = []
+        for item in batch:
+            if isinstance(item, int):
+                # Marca de rotação: o que veio antes fica no segmento atual
+                self._file.write(b''.join(lines))
+                lines = []
+                self._sync()
+                self._file.close()
+                self._file = open(self._path(SEGMENT.format(item)), 'ab')
+                self._sync_directory()
+            else:
+                lines.append(item)
+        self._file.write(b''.join(lines))
+        self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        if self.fsync != 'off':
+            os.fdatasync(self._file.fileno())
+
+    def _sync_directory(self):
+        # Torna a criação, a troca e a remoção de arquivos duráveis
+        descriptor = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    def _start_compaction(self):
+        with self._lock:
+            if self._compacting or self._compactor is None or self._closed:
+                return
+            self._compacting = True
+            self.since_snapshot = 0
+        threading.Thread(target=self._compact, name='journal-compactor', daemon=True).start()
+
+    def _compact(self):
+        try:
+            self._compactor()
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def write_snapshot(self, generation, position, records):
+        """Grava o snapshot que substitui os segmentos anteriores a `generation` e apaga esses segmentos."""
+        temporary = self._path(SNAPSHOT + '.tmp')
+        with open(temporary, 'wb') as snapshot:
+            snapshot.write(dumps_bytes({'segment': generation}) + b'\n')
+            chunk = []
+            for record in records:
+                chunk.append(dumps_bytes(record))
+                if len(chunk) >= 1000:
+                    snapshot.write(b'\n'.join(chunk) + b'\n')
+                    chunk = []
+            if chunk:
+                snapshot.write(b'\n'.join(chunk) + b'\n')
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temporary, self._path(SNAPSHOT))
+        self._sync_directory()
+        # Os segmentos antigos só saem depois que a thread de gravação terminou de escrevê-los
+        with self._lock:
+            while self._written < position and self._error is None:
+                self._durable.wait()
+        for old in self._segments():
+            if old < generation:
+                os.remove(self._path(SEGMENT.format(old)))
+        self._sync_directory()
+
+    def close(self):
+        """Grava o que falta na fila e libera o diretório."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._pending.notify()
+        if self._thread is not None:
+            self._thread.join()
+        if self._file is not None:
+            self._file.close()
+        self._lock_file.close()
@@ -0,0 +1,90 @@
+import os
+from datetime import datetime, timedelta
+
+FREQUENCIES = ('daily', 'weekly')
+
+# Ocorrências só até esta distância (dias) da primeira: limita a expansão de regras esparsas
+MAX_DAYS = int(os.getenv('RECURRENCE_MAX_DAYS', '1096'))
+
+
+def expand(start_time, end_time, rule, limit, max_days=MAX_DAYS):
+    """Horários (start_time, end_time) ISO 8601 de cada ocorrência da regra a partir de start_time.
+
+    Regra: {'frequency': 'daily'|'weekly', 'interval': N, 'weekdays': [0..6] (0 = segunda),
+    'until': data ou data/hora, 'count': N}. 'daily' repete a cada N dias, só nos dias da semana
+    em `weekdays` (padrão: todos); 'weekly' repete a cada N semanas nos dias de `weekdays`
+    (padrão: o dia da primeira ocorrência). É preciso `until` ou `count`. ValueError com a
+    mensagem de erro para regras inválidas, que passem de `limit` ocorrências ou que continuem
+    além de `max_days` dias depois de start_time.
+    """
+    if not isinstance(rule, dict):
+        raise ValueError('Invalid recurrence')
+    try:
+        start, end = datetime.fromisoformat(start_time), datetime.fromisoformat(end_time)
+    except (TypeError, ValueError):
+        raise ValueError('Invalid start_time or end_time')
+    frequency = rule.get('frequency')
+    if frequency not in FREQUENCIES:
+        raise ValueError(f'Invalid frequency, expected one of {FREQUENCIES}')
+    interval = rule.get('interval', 1)
+    if not isinstance(interval, int) or isinstance(interval, bool) or interval < 1:
+        raise ValueError('Invalid interval')
+    weekdays = rule.get('weekdays')
+    if weekdays is None:
+        weekdays = range(7) if frequency == 'daily' else [start.weekday()]
+    elif not isinstance(weekdays, list):
+        raise ValueError('Invalid weekdays, expected a list of days 0-6')
+    if not weekdays or not all(isinstance(day, int) and not isinstance(day, bool) and 0 <= day <= 6
+                               for day in weekdays):
+        raise ValueError('Invalid weekdays')
+    weekdays = set(weekdays)
+
+    count, until = rule.get('count'), rule.get('until')
+    if count is None and until is None:
+        raise ValueError('Recurrence needs until or count')
+    if count is not None and (not isinstance(count, int) or isinstance(count, bool) or count < 1):
+        raise ValueError('Invalid count')
+    last = None
+    if until is not None:
+        try:
+            last = datetime.fromisoformat(until)
+        except (TypeError, ValueError):
+            raise ValueError('Invalid until')
+        if len(until) == 10:
+            # Só a data: o dia inteiro entra
+            last = last.replace(hour=23, minute=59, second=59, microsecond=999999)
+        if last.tzinfo is None:
+            last = last.replace(tzinfo=start.tzinfo)
+        elif start.tzinfo is None:
+            raise ValueError('Invalid until')
+
+    occurrences = []
+    duration = end - start
+    first_weekday = start.weekday()
+    offset = 0
+    while count is None or len(occurrences) < count:
+        # O padrão se repete a cada `interval` semanas: se nada caiu na primeira volta, nunca cai
+        if not occurrences and offset >= 7 * interval:
+            break
+        try:
+            moment = start + timedelta(days=offset)
+            moment_end = moment + duration
+        except OverflowError:
+            raise ValueError('Recurrence goes past the last supported date')
+        if last is not None and moment > last:
+            break
+        if offset > max_days:
+            raise ValueError(f'Recurrence spans more than {max_days} days')
+        if frequency == 'daily':
+            period = offset
+        else:
+            # Semanas de segunda a domingo, contadas a partir da semana de start_time
+            period = (offset + first_weekday) // 7
+        if period % interval == 0 and moment.weekday() in weekdays:
+            if len(occurrences) == limit:
+                raise ValueError(f'Recurrence expands to more than {limit} reservations')
+            occurrences.append((moment.isoformat(), moment_end.isoformat()))
+        offset += 1
+    if not occurrences:
+        raise ValueError('Recurrence has no occurrences')
+    return occurrences
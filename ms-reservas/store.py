@@ -0,0 +1,299 @@
+import bisect
+import gc
+import threading
+
+from indexes import ReservationIndexes
+from intervals import IntervalIndex, TimeIndex
+
+
+INDEXED_FIELDS = ('user_id', 'space_id', 'status')
+
+
+def check_indexed(reservation):
+    """ValueError se algum campo indexado não servir de chave: nada disso pode chegar ao log."""
+    for field in INDEXED_FIELDS:
+        try:
+            hash(reservation[field])
+        except (KeyError, TypeError):
+            raise ValueError(f'Invalid {field}')
+
+
+class ReservationStore:
+    """Reservas em memória, seguras para os workers com threads do gunicorn.
+
+    - ids vêm de um contador monotônico, nunca de len(): duas criações simultâneas não
+      disputam o mesmo id nem se sobrescrevem;
+    - verificação de conflito e gravação rodam sob o lock do espaço (locks particionados por
+      space_id), então são linearizáveis por espaço e espaços diferentes seguem em paralelo;
+    - os índices secundários, compartilhados entre espaços, têm um lock próprio de seção curta;
+    - com um Journal, cada alteração é registrada no log sob o lock do espaço (a ordem do log é
+      a da memória) e a espera pelo fsync acontece depois de soltá-lo.
+    """
+
+    def __init__(self, stripes=64, journal=None):
+        self.reservations = {}
+        # Horários já convertidos de cada reserva e índice por espaço das reservas ativas
+        self.times = {}
+        self.schedules = IntervalIndex()
+        # Todas as reservas, ativas e canceladas, pelo início: consultas por período em O(log n + k)
+        self.timeline = TimeIndex()
+        # Índices secundários: listar as reservas de um usuário, espaço ou status sem varrer tudo
+        self.indexes = ReservationIndexes(INDEXED_FIELDS)
+        # Ids em ordem crescente, para a paginação por cursor (keyset) da listagem do admin
+        self.ids = []
+        self.journal = journal
+        self._space_locks = [threading.Lock() for _ in range(stripes)]
+        self._index_lock = threading.Lock()
+        self._id_lock = threading.Lock()
+        self._last_id = 0
+        self._compact_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, journal, stripes=64):
+        """Reconstrói o store a partir do snapshot e do log e passa a registrar as alterações."""
+        store = cls(stripes=stripes)
+        # Milhões de objetos novos disparariam coletas do gc a cada poucos milhares de alocações
+        gc.disable()
+        try:
+            for record in journal.replay():
+                store.apply(record)
+            store.rebuild()
+        finally:
+            gc.enable()
+        # As reservas carregadas vivem até o fim do processo: ficam fora das próximas varreduras do gc
+        gc.freeze()
+        store.journal = journal
+        journal.start(compactor=store.compact)
+        return store
+
+    def space_lock(self, space_id):
+        return self._space_locks[hash(space_id) % len(self._space_locks)]
+
+    def next_id(self):
+        with self._id_lock:
+            self._last_id += 1
+            return self._last_id
+
+    def next_ids(self, count):
+        """`count` ids seguidos, reservados de uma vez."""
+        with self._id_lock:
+            first = self._last_id + 1
+            self._last_id += count
+            return list(range(first, first + count))
+
+    def _log(self, record, count=1):
+        return self.journal.append(record, count) if self.journal is not None else None
+
+    def _wait(self, position):
+        if self.journal is not None:
+            self.journal.wait(position)
+
+    def create(self, reservation, start, end):
+        """Grava a reserva se [start, end) estiver livre no espaço.
+
+        Devolve (id, None) ou (None, id da reserva em conflito).
+        """
+        check_indexed(reservation)
+        space_id = reservation['space_id']
+        with self.space_lock(space_id):
+            conflict_id = self.schedules.conflict(space_id, start, end)
+            if conflict_id is not None:
+                return None, conflict_id
+            reservation_id = reservation['id'] = self.next_id()
+            position = self._log({'op': 'create', 'reservation': reservation, 'times': [start, end]})
+            self._insert(reservation, start, end)
+        self._wait(position)
+        return reservation_id, None
+
+    def create_many(self, batch):
+        """Grava todas as reservas de `batch`, uma lista de (reservation, start, end), ou nenhuma.
+
+        Os locks de todos os espaços envolvidos são tomados de uma vez, em ordem de partição (a
+        mesma da compactação, então não há deadlock), e os conflitos são verificados numa
+        passada: por espaço, os horários do lote em ordem de início contra o índice e contra o
+        item anterior do próprio lote. Sem conflitos, o lote vai para o log num único registro, o
+        que também o torna atômico numa queda. Devolve (ids, []) ou (None, conflitos), cada
+        conflito um dict com o `index` no lote e `conflict_id` (reserva existente) ou
+        `conflict_index` (outro item do lote).
+        """
+        for reservation, _, _ in batch:
+            check_indexed(reservation)
+        by_space = {}
+        for index, (reservation, start, end) in enumerate(batch):
+            by_space.setdefault(reservation['space_id'], []).append((start, end, index))
+        stripes = sorted({hash(space_id) % len(self._space_locks) for space_id in by_space})
+        for stripe in stripes:
+            self._space_locks[stripe].acquire()
+        try:
+            conflicts = []
+            for space_id, items in by_space.items():
+                items.sort()
+                previous_end, previous_index = None, None
+                for start, end, index in items:
+                    conflict_id = self.schedules.conflict(space_id, start, end)
+                    if conflict_id is not None:
+                        conflicts.append({'index': index, 'conflict_id': conflict_id})
+                    elif previous_end is not None and start < previous_end:
+                        conflicts.append({'index': index, 'conflict_index': previous_index})
+                    if previous_end is None or end > previous_end:
+                        previous_end, previous_index = end, index
+            if conflicts:
+                conflicts.sort(key=lambda conflict: conflict['index'])
+                return None, conflicts
+            ids = self.next_ids(len(batch))
+            for reservation_id, (reservation, _, _) in zip(ids, batch):
+                reservation['id'] = reservation_id
+            position = self._log({'op': 'batch', 'records': [
+                {'op': 'create', 'reservation': reservation, 'times': [start, end]}
+                for reservation, start, end in batch]}, len(batch))
+            self._insert_many(batch)
+        finally:
+            for stripe in stripes:
+                self._space_locks[stripe].release()
+        self._wait(position)
+        return ids, []
+
+    def cancel(self, reservation_id):
+        """Cancela a reserva e libera o horário; None se ela não existe."""
+        reservation = self.reservations.get(reservation_id)
+        if reservation is None:
+            return None
+        position = None
+        with self.space_lock(reservation['space_id']):
+            if reservation['status'] == 'active':
+                position = self._log({'op': 'cancel', 'id': reservation_id})
+                self._cancel(reservation)
+        self._wait(position)
+        return reservation
+
+    def _insert(self, reservation, start, end):
+        self._insert_many(((reservation, start, end),))
+
+    def _insert_many(self, batch):
+        # Índices secundários primeiro: são eles que dependem dos valores dos campos, e uma falha
+        # aqui não deixa a reserva visível pela metade em reservations/schedules
+        with self._index_lock:
+            for reservation, start, end in batch:
+                self.indexes.add(reservation)
+                self.timeline.add(reservation['space_id'], start, end, reservation['id'])
+                # Quase sempre o maior id até agora: a inserção cai no fim da lista
+                bisect.insort(self.ids, reservation['id'])
+        for reservation, start, end in batch:
+            self.reservations[reservation['id']] = reservation
+            self.times[reservation['id']] = (start, end)
+            if reservation['status'] == 'active':
+                self.schedules.add(reservation['space_id'], start, end, reservation['id'])
+
+    def _cancel(self, reservation):
+        self.schedules.remove(reservation['space_id'], self.times[reservation['id']][0], reservation['id'])
+        with self._index_lock:
+            self.indexes.update(reservation, status='cancelled')
+
+    def apply(self, record):
+        """Reaplica um registro do log ou do snapshot; os índices são montados depois, por `rebuild()`."""
+        if record['op'] == 'create':
+            reservation = record['reservation']
+            self.reservations[reservation['id']] = reservation
+            self.times[reservation['id']] = tuple(record['times'])
+        elif record['op'] == 'cancel':
+            reservation = self.reservations.get(record['id'])
+            if reservation is not None:
+                reservation['status'] = 'cancelled'
+        elif record['op'] == 'batch':
+            for item in record['records']:
+                self.apply(item)
+
+    def rebuild(self):
+        """Monta os índices de uma vez a partir das reservas, em vez de um registro por vez."""
+        self.ids = sorted(self.reservations)
+        intervals, timeline = {}, []
+        for reservation_id in self.ids:
+            reservation = self.reservations[reservation_id]
+            start, end = self.times[reservation_id]
+            timeline.append((start, reservation_id, end, reservation['space_id']))
+            if reservation['status'] == 'active':
+                intervals.setdefault(reservation['space_id'], []).append((start, end, reservation_id))
+        self.schedules = IntervalIndex.build(intervals)
+        self.timeline = TimeIndex.build(timeline)
+        self.indexes = ReservationIndexes(INDEXED_FIELDS)
+        self.indexes.extend(self.reservations.values())
+        self._last_id = max(self.reservations, default=0)
+
+    def compact(self):
+        """Grava um snapshot do estado atual e descarta os segmentos do log que ele cobre."""
+        # Uma compactação por vez: duas rotações intercaladas apagariam um segmento ainda necessário
+        with self._compact_lock:
+            # Com todos os locks de espaço nenhuma alteração está pela metade: tudo o que foi para o
+            # log antes da rotação já está na memória e entra na lista abaixo
+            for lock in self._space_locks:
+                lock.acquire()
+            try:
+                generation, position = self.journal.rotate()
+                reservations = list(self.reservations.values())
+            finally:
+                for lock in self._space_locks:
+                    lock.release()
+            # Cancelamentos posteriores podem aparecer já aplicados: reaplicá-los no replay não muda nada
+            records = ({'op': 'create', 'reservation': reservation, 'times': self.times[reservation['id']]}
+                       for reservation in reservations)
+            self.journal.write_snapshot(generation, position, records)
+
+    def get(self, reservation_id):
+        return self.reservations.get(reservation_id)
+
+    def find(self, field, value):
+        """Reservas com o campo indexado igual a value, em O(k)."""
+        with self._index_lock:
+            ids = self.indexes.ids(field, value)
+        return [self.reservations[i] for i in ids]
+
+    def between(self, start, end, space_id=None, status=None):
+        """Reservas que se sobrepõem a [start, end) (epoch UTC), em ordem de início."""
+        with self._index_lock:
+            ids = self.timeline.overlapping(start, end, space_id)
+        reservations = [self.reservations[i] for i in ids]
+        if status is not None:
+            reservations = [reservation for reservation in reservations if reservation['status'] == status]
+        return reservations
+
+    def all(self):
+        return list(self.reservations.values())
+
+    def scan(self, after=0, status=None, space_id=None, start_from=None, start_to=None, chunk=500):
+        """Reservas com id maior que `after`, em ordem de id, que passam nos filtros.
+
+        Gerador preguiçoso: lê os ids em blocos, retomando pelo último id visto, então percorrer
+        todas as reservas usa memória constante e não segura locks entre um bloco e outro.
+        Com `space_id` só os ids daquele espaço são percorridos. `start_from`/`start_to` filtram
+        o início da reserva (epoch UTC) em [start_from, start_to).
+        """
+        if space_id is not None:
+            with self._index_lock:
+                # Um espaço nunca muda de space_id: a lista dos seus ids vale para a varredura toda
+                ids = sorted(self.indexes.ids('space_id', space_id))
+            lock = None
+        else:
+            ids, lock = self.ids, self._index_lock
+        while True:
+            if lock is not None:
+                with lock:
+                    position = bisect.bisect_right(ids, after)
+                    block = ids[position:position + chunk]
+            else:
+                position = bisect.bisect_right(ids, after)
+                block = ids[position:position + chunk]
+            if not block:
+                return
+            for reservation_id in block:
+                reservation = self.reservations[reservation_id]
+                if status is not None and reservation['status'] != status:
+                    continue
+                if start_from is not None or start_to is not None:
+                    start = self.times[reservation_id][0]
+                    if (start_from is not None and start < start_from) or (start_to is not None and start >= start_to):
+                        continue
+                yield reservation
+            after = block[-1]
+
+    def __len__(self):
+        return len(self.reservations)
@@ -2,11 +2,21 @@ from flask import Flask, request, jsonify
 from werkzeug.security import generate_password_hash, check_password_hash
 import jwt
 import datetime
-from flasgger import Swagger
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from shared.apidocs import setup_apidocs  # noqa: E402
+from shared.fastjson import use_fast_json  # noqa: E402
+from shared.metrics import instrument  # noqa: E402
+from shared.tracing import trace_requests  # noqa: E402
 
 app = Flask(__name__)
+use_fast_json(app)
+instrument(app, 'ms-usuarios')
+trace_requests(app, 'ms-usuarios')
 app.config['SECRET_KEY'] = 'secret-key'
-swagger = Swagger(app)
+swagger = setup_apidocs(app)
 
 users_db = {}
 
@@ -0,0 +1,147 @@
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import sys
+
+from flask import Blueprint, Response, request
+
+# Documentação da API: live (flasgger lê as docstrings), static (spec pré-gerada no build) ou off
+API_DOCS = os.getenv('API_DOCS', 'live')
+API_SPEC_FILE = os.getenv('API_SPEC_FILE', 'apispec.json')
+
+DEFAULT_SPEC_ROUTE = '/apispec_1.json'
+DEFAULT_DOCS_ROUTE = '/apidocs/'
+DEFAULT_STATIC_URL = '/flasgger_static'
+
+logger = logging.getLogger(__name__)
+
+UI_PAGE = """<!DOCTYPE html>
+<html lang="en">
+  <head>
+    <meta charset="UTF-8">
+    <title>{title}</title>
+    <link rel="stylesheet" type="text/css" href="{static}/swagger-ui.css">
+  </head>
+  <body>
+    <div id="swagger-ui"></div>
+    <script src="{static}/swagger-ui-bundle.js"></script>
+    <script src="{static}/swagger-ui-standalone-preset.js"></script>
+    <script>
+      window.ui = SwaggerUIBundle({{
+        url: "{spec}",
+        dom_id: '#swagger-ui',
+        validatorUrl: null,
+        deepLinking: true,
+        presets: [SwaggerUIBundle.presets.apis, SwaggerUIStandalonePreset],
+        layout: "StandaloneLayout"
+      }});
+    </script>
+  </body>
+</html>
+"""
+
+
+def spec_path(app):
+    return API_SPEC_FILE if os.path.isabs(API_SPEC_FILE) else os.path.join(app.root_path, API_SPEC_FILE)
+
+
+def flasgger_static_folder():
+    """Pasta com os arquivos do Swagger UI, localizada sem importar o flasgger."""
+    found = importlib.util.find_spec('flasgger')
+    if found is None or not found.submodule_search_locations:
+        return None
+    return os.path.join(list(found.submodule_search_locations)[0], 'ui3', 'static')
+
+
+def setup_apidocs(app, config=None, template=None, mode=None):
+    """Registra /apidocs/ e a spec conforme API_DOCS; devolve o Swagger no modo live, senão None."""
+    mode = mode or API_DOCS
+    if mode == 'off':
+        return None
+    if mode == 'static':
+        path = spec_path(app)
+        if os.path.exists(path):
+            serve_static_spec(app, path, config or {})
+            return None
+        logger.warning('API spec %s not found; falling back to live docs', path)
+
+    # O flasgger (e o jsonschema que ele traz) só é importado quando a spec é montada em tempo de execução
+    from flasgger import Swagger
+    return Swagger(app, config=config, template=template)
+
+
+def serve_static_spec(app, path, config):
+    """Serve a spec pré-gerada e o Swagger UI sem carregar o flasgger."""
+    specs = config.get('specs') or [{'route': DEFAULT_SPEC_ROUTE}]
+    spec_route = specs[0]['route']
+    docs_route = config.get('specs_route', DEFAULT_DOCS_ROUTE)
+    static_url = config.get('static_url_path', DEFAULT_STATIC_URL)
+    cached = {}
+
+    def spec():
+        # Lido na primeira chamada e mantido em memória: o arquivo não muda com o processo no ar
+        if 'body' not in cached:
+            with open(path, 'rb') as source:
+                cached['body'] = source.read()
+            cached['title'] = json.loads(cached['body']).get('info', {}).get('title', app.name)
+        return cached['body']
+
+    def apispec():
+        response = Response(spec(), mimetype='application/json')
+        response.headers['Cache-Control'] = 'public, max-age=300'
+        response.add_etag()
+        return response.make_conditional(request)
+
+    def apidocs():
+        spec()
+        return Response(UI_PAGE.format(title=cached['title'], static=static_url, spec=spec_route),
+                        mimetype='text/html')
+
+    blueprint = Blueprint('flasgger', __name__, static_folder=flasgger_static_folder(),
+                          static_url_path=static_url)
+    blueprint.add_url_rule(spec_route, 'apispec', apispec)
+    if config.get('swagger_ui', True):
+        blueprint.add_url_rule(docs_route, 'apidocs', apidocs)
+    app.register_blueprint(blueprint)
+
+
+def build(service_dir, output=None):
+    """Importa o app.py do serviço com a documentação live e grava a spec completa em JSON."""
+    service_dir = os.path.abspath(service_dir)
+    sys.path.insert(0, service_dir)
+    name = 'apidocs_' + os.path.basename(service_dir).replace('-', '_')
+    module_spec = importlib.util.spec_from_file_location(name, os.path.join(service_dir, 'app.py'))
+    module = importlib.util.module_from_spec(module_spec)
+    sys.modules[name] = module
+    module_spec.loader.exec_module(module)
+
+    app = module.app
+    if not hasattr(app, 'swag'):
+        raise RuntimeError(f'{service_dir}/app.py does not document its API with flasgger')
+    with app.app_context():
+        spec = app.swag.get_apispecs(app.swag.config['specs'][0]['endpoint'])
+    output = output or os.path.join(service_dir, API_SPEC_FILE)
+    with open(output, 'w', encoding='utf-8') as target:
+        json.dump(spec, target, ensure_ascii=False, sort_keys=True)
+    return output, len(spec.get('paths', {}))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gera a spec OpenAPI estática de um serviço')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build_command = commands.add_parser('build', help='Grava <serviço>/apispec.json a partir das docstrings')
+    build_command.add_argument('service_dir')
+    build_command.add_argument('--output')
+    args = parser.parse_args(argv)
+
+    # A spec sai das docstrings, mesmo que o ambiente do build peça o modo static
+    os.environ['API_DOCS'] = 'live'
+    output, paths = build(args.service_dir, args.output)
+    print(f'{output}: {paths} rotas')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+import os
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - sem brotli, só gzip é oferecido
+    brotli = None
+
+# Configuração da compressão de respostas (gateway e frontend)
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/x-ndjson', 'application/javascript',
+                      'application/xml', 'image/svg+xml')
+SKIP_STATUS = (204, 206, 304)
+
+
+def supported_encodings():
+    # Ordem de preferência no empate de q: brotli gera corpos menores que gzip
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encoding, supported=None):
+    """Escolhe a codificação pelo Accept-Encoding (valores q, q=0 e '*'); None mantém o corpo original."""
+    supported = supported or supported_encodings()
+    weights = {}
+    for item in (accept_encoding or '').split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in supported:
+        quality = weights.get(encoding, weights.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compressible(status, content_type, headers, length=None, min_size=COMPRESSION_MIN_SIZE):
+    """Corpo vale ser comprimido: tipo textual, status com corpo, ainda sem Content-Encoding e acima do limite."""
+    if status < 200 or status in SKIP_STATUS or 'Content-Encoding' in headers:
+        return False
+    if not (content_type or '').startswith(COMPRESSIBLE_TYPES):
+        return False
+    return length is None or length >= min_size
+
+
+def compress(body, encoding, gzip_level=COMPRESSION_GZIP_LEVEL, brotli_quality=COMPRESSION_BROTLI_QUALITY):
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality)
+    compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+class StreamCompressor:
+    """Comprime um corpo em blocos, para respostas repassadas sem buffer."""
+
+    def __init__(self, encoding, gzip_level=COMPRESSION_GZIP_LEVEL, brotli_quality=COMPRESSION_BROTLI_QUALITY):
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+            self._compress = self._compressor.process
+            self._flush = self._compressor.flush
+            self._finish = self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self._compress = self._compressor.compress
+            self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._compressor.flush
+
+    def compress(self, chunk):
+        # Cada bloco sai logo, para o cliente começar a ler antes do fim do repasse
+        return self._compress(chunk) + self._flush()
+
+    def finish(self):
+        return self._finish()
+
+    def wrap(self, chunks):
+        try:
+            for chunk in chunks:
+                data = self.compress(chunk)
+                if data:
+                    yield data
+            yield self.finish()
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+
+def precompressed(variants, body, encoding):
+    """Variante comprimida de um corpo que não muda (ex. entrada do cache do catálogo), gerada uma vez."""
+    data = variants.get(encoding)
+    if data is None:
+        # Corrida inofensiva: duas threads podem comprimir o mesmo corpo, o resultado é igual
+        data = variants[encoding] = compress(body, encoding)
+    return data
+
+
+def negotiate(content_type, length, accept_encoding, status=200, headers=(), min_size=COMPRESSION_MIN_SIZE):
+    """Codificação a usar na resposta, ou None para enviar o corpo como está."""
+    if not COMPRESSION_ENABLED or not compressible(status, content_type, headers, length, min_size):
+        return None
+    return choose_encoding(accept_encoding)
+
+
+def weak_etag(etag):
+    # O ETag forte identifica os bytes sem compressão; a variante comprimida só é equivalente
+    return etag if etag.startswith('W/') else f'W/{etag}'
+
+
+def compress_responses(app, min_size=COMPRESSION_MIN_SIZE):
+    """Comprime as respostas do app Flask conforme o Accept-Encoding do cliente.
+
+    Registrado depois de instrument(): o after_request roda antes do das métricas, que assim
+    incluem o tempo de compressão das respostas com buffer.
+    """
+    if not COMPRESSION_ENABLED:
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if request.method == 'HEAD' or response.direct_passthrough:
+            return response
+        length = None if response.is_streamed else response.calculate_content_length()
+        if not compressible(response.status_code, response.mimetype, response.headers, length, min_size):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            declared = response.headers.get('Content-Length')
+            if declared is not None and int(declared) < min_size:
+                return response
+            response.response = StreamCompressor(encoding).wrap(response.response)
+            response.headers.pop('Content-Length', None)
+        else:
+            response.set_data(compress(response.get_data(), encoding))
+        response.headers['Content-Encoding'] = encoding
+        if 'ETag' in response.headers:
+            response.headers['ETag'] = weak_etag(response.headers['ETag'])
+        return response
@@ -0,0 +1,68 @@
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - sem orjson, tudo passa pelo json da biblioteca padrão
+    orjson = None
+
+# Mesmas regras do provider padrão do Flask: chaves ordenadas, datas no formato HTTP (via default)
+ORJSON_OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                  | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson is not None else 0
+
+
+def _default(obj):
+    return DefaultJSONProvider.default(obj)
+
+
+def dumps_bytes(obj, indent=False):
+    """Serializa em UTF-8 com o orjson quando disponível; tipos que ele recusa voltam para o json."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_default,
+                                option=ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0))
+        except TypeError:
+            # Ex.: inteiros acima de 64 bits ou chaves de tipos mistos
+            pass
+    if indent:
+        return json.dumps(obj, default=_default, sort_keys=True, indent=2).encode()
+    return json.dumps(obj, default=_default, sort_keys=True, separators=(',', ':')).encode()
+
+
+def dumps(obj):
+    return dumps_bytes(obj).decode()
+
+
+def loads(data):
+    """Aceita str ou bytes; documentos que o orjson não aceita (ex. NaN) são lidos pelo json."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify, request.get_json e app.json usando o orjson, com o json da biblioteca padrão como reserva."""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(dumps_bytes(obj, indent=indent) + b'\n', mimetype=self.mimetype)
+
+
+def use_fast_json(app):
+    app.json = FastJSONProvider(app)
+    return app.json
@@ -0,0 +1,68 @@
+"""
+Perfil de produção do gunicorn, comum a todos os apps.
+
+    gunicorn -c shared/gunicorn_conf.py app:app
+
+Todos os valores vêm de variáveis de ambiente, com padrões calculados pelos núcleos disponíveis.
+"""
+import importlib
+import os
+
+
+def available_cores():
+    """Núcleos que o processo pode usar (respeita cpuset/affinity do contêiner)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', str(available_cores() * 2 + 1)))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+backlog = int(os.getenv('GUNICORN_BACKLOG', '2048'))
+
+# Conexões keep-alive vindas do gateway e do balanceador
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Reciclagem de workers: limita o efeito de vazamentos de memória; o jitter evita reinícios simultâneos
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+# Encerramento gracioso: no SIGTERM (deploy no ECS) os workers terminam as requisições em andamento
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+
+# App importado uma vez no mestre e compartilhado pelos workers (copy-on-write)
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Heartbeat dos workers em memória, não no disco do contêiner
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = os.getenv('GUNICORN_ACCESSLOG') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOGLEVEL', 'info')
+
+
+def run_startup(app_uri):
+    startup = getattr(importlib.import_module(app_uri.split(':')[0]), 'on_startup', None)
+    if startup is not None:
+        startup()
+
+
+def on_starting(server):
+    """Roda o `on_startup()` do app (ex. criar tabelas) uma única vez, no mestre, antes dos workers."""
+    # Sem preload o mestre não importa o app (ex. ms-reservas, que abre o log de reservas no import)
+    if server.cfg.preload_app:
+        run_startup(server.app.app_uri)
+
+
+def post_worker_init(worker):
+    # Sem preload o `on_startup()` roda em cada worker, depois de o app ser importado nele
+    if not worker.cfg.preload_app:
+        run_startup(worker.app.app_uri)
+    # `on_worker_init(worker)` do app recebe o worker já montado (ex. a fila de threads do gthread)
+    init = getattr(importlib.import_module(worker.app.app_uri.split(':')[0]), 'on_worker_init', None)
+    if init is not None:
+        init(worker)
@@ -0,0 +1,193 @@
+import bisect
+import threading
+import time
+
+from flask import Response, g, request
+
+METRICS_PATH = '/metrics'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Limites logarítmicos dos histogramas de latência: 0,5 ms a ~16 s, fator √2 entre buckets
+# (resolução suficiente para acompanhar o p99 por rota)
+LATENCY_BUCKETS = tuple(round(0.0005 * 2 ** (i / 2), 6) for i in range(31))
+
+# A cada tantas threads novas, os contadores das já encerradas são somados em _retired
+PRUNE_EVERY = 64
+
+
+class _Shard:
+    """Contadores de uma única thread: só ela escreve, a coleta só lê."""
+
+    __slots__ = ('thread', 'counters', 'histograms')
+
+    def __init__(self, thread):
+        self.thread = thread
+        self.counters = {}
+        self.histograms = {}
+
+    def merge(self, other):
+        for key, value in other.counters.copy().items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        for key, counts in other.histograms.copy().items():
+            mine = self.histograms.get(key)
+            if mine is None:
+                self.histograms[key] = list(counts)
+            else:
+                for index, value in enumerate(counts):
+                    mine[index] += value
+
+
+class Registry:
+    """Métricas em contadores por thread, sem lock no caminho da requisição; somadas só na coleta."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS, prune_every=PRUNE_EVERY):
+        self.buckets = buckets
+        self.prune_every = prune_every
+        self.descriptions = {}
+        self._local = threading.local()
+        self._shards = []
+        # Contadores de threads encerradas (o servidor de desenvolvimento cria uma thread por requisição)
+        self._retired = _Shard(None)
+        self._registered = 0
+        self._lock = threading.Lock()
+
+    def describe(self, name, kind, text):
+        self.descriptions[name] = (kind, text)
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                # Sem scrape, os shards de threads encerradas se acumulariam até a próxima coleta
+                self._registered += 1
+                if self._registered % self.prune_every == 0:
+                    self._retire_dead()
+                self._shards.append(shard)
+        return shard
+
+    def _retire_dead(self):
+        # Chamado com o lock: uma thread encerrada não escreve mais no seu shard
+        alive = []
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                alive.append(shard)
+            else:
+                self._retired.merge(shard)
+        self._shards = alive
+        return alive
+
+    def inc(self, name, labels, value=1):
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, labels, seconds):
+        histograms = self._shard().histograms
+        key = (name, labels)
+        counts = histograms.get(key)
+        if counts is None:
+            # Um contador por bucket, mais o +Inf, e a soma no final
+            counts = histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        counts[-1] += seconds
+
+    def collect(self):
+        total = _Shard(None)
+        with self._lock:
+            alive = self._retire_dead()
+            total.merge(self._retired)
+        for shard in alive:
+            total.merge(shard)
+        return total.counters, total.histograms
+
+    def render(self):
+        counters, histograms = self.collect()
+        lines = []
+        for name in sorted({key[0] for key in counters} | {key[0] for key in histograms}):
+            kind, text = self.descriptions.get(name, ('untyped', ''))
+            lines.append(f'# HELP {name} {text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for (series, labels), value in sorted(counters.items()):
+                if series == name:
+                    lines.append(f'{name}{format_labels(labels)} {format_value(value)}')
+            for (series, labels), counts in sorted(histograms.items()):
+                if series != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{format_labels(labels + (("le", le),))} {cumulative}')
+                lines.append(f'{name}_sum{format_labels(labels)} {format_value(counts[-1])}')
+                lines.append(f'{name}_count{format_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels) + '}'
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = Registry()
+registry.describe('http_requests_total', 'counter', 'Requisições atendidas por rota, método e status')
+registry.describe('http_request_duration_seconds', 'histogram', 'Latência das requisições por rota e método')
+registry.describe('http_requests_in_flight', 'gauge', 'Requisições em andamento')
+registry.describe('upstream_request_duration_seconds', 'histogram',
+                  'Latência das chamadas do gateway aos microsserviços')
+
+
+def request_started(service):
+    registry.inc('http_requests_in_flight', (('service', service),))
+
+
+def request_finished(service, method, route, status, seconds):
+    registry.inc('http_requests_in_flight', (('service', service),), -1)
+    labels = (('service', service), ('method', method), ('route', route))
+    registry.inc('http_requests_total', labels + (('status', str(status)),))
+    registry.observe('http_request_duration_seconds', labels, seconds)
+
+
+def record_upstream(upstream, status, seconds):
+    """Registra uma chamada a um microsserviço; status é o código HTTP ou 'error'."""
+    registry.observe('upstream_request_duration_seconds', (('upstream', upstream), ('status', str(status))), seconds)
+
+
+def metrics_response():
+    return Response(registry.render(), content_type=CONTENT_TYPE)
+
+
+def instrument(app, service):
+    """Registra as métricas por rota no app Flask e expõe GET /metrics."""
+
+    @app.before_request
+    def metrics_start():
+        if request.path != METRICS_PATH:
+            g.metrics_started = time.perf_counter()
+            request_started(service)
+
+    @app.teardown_request
+    def metrics_finish(error=None):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        status = g.pop('metrics_status', 500)
+        request_finished(service, request.method, route, status, time.perf_counter() - started)
+
+    @app.after_request
+    def metrics_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    app.add_url_rule(METRICS_PATH, 'metrics', metrics_response, methods=['GET'])
+    return app
@@ -0,0 +1,365 @@
+import argparse
+import atexit
+import collections
+import contextvars
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from flask import g, request
+
+# Configuração do rastreamento distribuído (cabeçalho W3C traceparent)
+TRACE_EXPORTER = os.getenv('TRACE_EXPORTER', 'none')
+TRACE_FILE = os.getenv('TRACE_FILE', 'traces.jsonl')
+TRACE_COLLECTOR_URL = os.getenv('TRACE_COLLECTOR_URL', 'http://localhost:9411/spans')
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '1'))
+TRACE_FLUSH_INTERVAL = float(os.getenv('TRACE_FLUSH_INTERVAL', '1'))
+TRACE_QUEUE_SIZE = int(os.getenv('TRACE_QUEUE_SIZE', '10000'))
+
+TRACEPARENT = 'traceparent'
+TRACE_ID_HEADER = 'X-Trace-Id'
+
+_current = contextvars.ContextVar('current_span', default=None)
+
+
+def new_id(length):
+    return f'{random.getrandbits(length * 4):0{length}x}'
+
+
+def parse_traceparent(value):
+    """Devolve (trace_id, span_id pai, amostrado) ou None se o cabeçalho for inválido."""
+    parts = (value or '').strip().split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == '0' * 32 or parts[2] == '0' * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+class Span:
+    __slots__ = ('tracer', 'trace_id', 'span_id', 'parent_id', 'sampled', 'name', 'kind',
+                 'start', 'started', 'duration', 'attributes')
+
+    def __init__(self, tracer, name, kind, trace_id, parent_id, sampled, attributes):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = new_id(16)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start = time.time()
+        self.started = time.perf_counter()
+        self.duration = None
+
+    def traceparent(self):
+        return f'00-{self.trace_id}-{self.span_id}-{"01" if self.sampled else "00"}'
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'service': self.tracer.service,
+            'name': self.name,
+            'kind': self.kind,
+            'start': self.start,
+            'duration_ms': round(self.duration * 1000, 3),
+            'attributes': self.attributes
+        }
+
+
+class BatchExporter:
+    """Fila limitada de spans enviada em lotes por uma thread de fundo, fora do caminho da requisição."""
+
+    def __init__(self, sink, interval=TRACE_FLUSH_INTERVAL, max_queue=TRACE_QUEUE_SIZE):
+        self.sink = sink
+        self.interval = interval
+        self.max_queue = max_queue
+        self._queue = collections.deque()
+        self.exported = 0
+        self.dropped = 0
+        self.errors = 0
+        self._start()
+        atexit.register(self.flush)
+        # Workers do gunicorn nascem por fork do mestre (preload) e não herdam a thread de envio
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+        self._thread.start()
+
+    def _after_fork(self):
+        # Spans ainda na fila pertencem ao mestre, que os envia
+        self._queue.clear()
+        self._start()
+
+    def export(self, span):
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._queue.append(span.to_dict())
+
+    def flush(self):
+        batch = []
+        while self._queue:
+            batch.append(self._queue.popleft())
+        if not batch:
+            return
+        try:
+            self.sink(batch)
+            self.exported += len(batch)
+        except Exception:
+            self.errors += 1
+            self.dropped += len(batch)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+    def stats(self):
+        return {'queued': len(self._queue), 'exported': self.exported, 'dropped': self.dropped, 'errors': self.errors}
+
+
+class FileSink:
+    """Grava os spans como JSON, um por linha."""
+
+    def __init__(self, path=TRACE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, batch):
+        lines = ''.join(json.dumps(span) + '\n' for span in batch)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as output:
+            output.write(lines)
+
+
+class HttpSink:
+    """Envia os lotes de spans como JSON para um coletor HTTP."""
+
+    def __init__(self, url=TRACE_COLLECTOR_URL, timeout=2):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, batch):
+        body = json.dumps(batch).encode()
+        post = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(post, timeout=self.timeout) as response:
+            response.read()
+
+
+def exporter_from_env():
+    if TRACE_EXPORTER == 'file':
+        return BatchExporter(FileSink())
+    if TRACE_EXPORTER == 'http':
+        return BatchExporter(HttpSink())
+    return None
+
+
+class Tracer:
+    def __init__(self, service, exporter=None, sample_rate=TRACE_SAMPLE_RATE):
+        self.service = service
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def start(self, name, kind='internal', traceparent=None, **attributes):
+        """Abre um span filho do span atual, do traceparent recebido ou, sem nenhum dos dois, um novo trace."""
+        parent = _current.get()
+        if parent is not None:
+            trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+        else:
+            incoming = parse_traceparent(traceparent)
+            if incoming:
+                trace_id, parent_id, sampled = incoming
+            else:
+                trace_id, parent_id, sampled = new_id(32), None, random.random() < self.sample_rate
+        span = Span(self, name, kind, trace_id, parent_id, sampled, attributes)
+        return span, _current.set(span)
+
+    def finish(self, span, token):
+        span.duration = time.perf_counter() - span.started
+        _current.reset(token)
+        if span.sampled and self.exporter is not None:
+            self.exporter.export(span)
+
+    @contextmanager
+    def span(self, name, kind='internal', **attributes):
+        span, token = self.start(name, kind, **attributes)
+        try:
+            yield span
+        except BaseException as error:
+            span.attributes['error'] = type(error).__name__
+            raise
+        finally:
+            self.finish(span, token)
+
+
+def current_span():
+    return _current.get()
+
+
+def trace_headers():
+    """Cabeçalho traceparent do span atual, para repassar numa chamada a outro serviço."""
+    span = _current.get()
+    return {TRACEPARENT: span.traceparent()} if span is not None else {}
+
+
+@contextmanager
+def client_span(service, method, path):
+    """Span de espera por outro serviço; devolve os cabeçalhos que levam o trace adiante."""
+    parent = _current.get()
+    if parent is None:
+        yield {}
+        return
+    with parent.tracer.span(f'{method} {path}', 'client', upstream=service) as span:
+        yield {TRACEPARENT: span.traceparent()}
+
+
+def trace_requests(app, service, exporter=None, tracer=None):
+    """Abre um span de servidor por requisição no app Flask, continuando o trace recebido.
+
+    `tracer` reaproveita um Tracer já criado (ex. compartilhado com o modo aiohttp do gateway).
+    """
+    if tracer is None:
+        tracer = Tracer(service, exporter if exporter is not None else exporter_from_env())
+
+    @app.before_request
+    def trace_start():
+        route = request.url_rule.rule if request.url_rule is not None else request.path
+        span, token = tracer.start(f'{request.method} {route}', 'server',
+                                   traceparent=request.headers.get(TRACEPARENT), path=request.path)
+        g.trace = (span, token)
+
+    @app.after_request
+    def trace_response(response):
+        trace = g.get('trace')
+        if trace is not None:
+            trace[0].attributes['status'] = response.status_code
+            response.headers[TRACE_ID_HEADER] = trace[0].trace_id
+        return response
+
+    @app.teardown_request
+    def trace_finish(error=None):
+        trace = g.pop('trace', None)
+        if trace is not None:
+            tracer.finish(*trace)
+
+    return tracer
+
+
+def instrument_sqlalchemy():
+    """Registra um span 'db' para cada comando SQL executado dentro de uma requisição rastreada."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def db_span_start(conn, cursor, statement, parameters, context, executemany):
+        parent = _current.get()
+        if parent is not None:
+            verb = statement.split(None, 1)[0].upper() if statement.strip() else 'SQL'
+            conn.info.setdefault('trace_spans', []).append(
+                parent.tracer.start(verb, 'db', statement=statement[:200]))
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def db_span_end(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get('trace_spans')
+        if spans:
+            span, token = spans.pop()
+            span.tracer.finish(span, token)
+
+    @event.listens_for(Engine, 'handle_error')
+    def db_span_error(context):
+        spans = context.connection.info.get('trace_spans') if context.connection is not None else None
+        if spans:
+            span, token = spans.pop()
+            span.attributes['error'] = type(context.original_exception).__name__
+            span.tracer.finish(span, token)
+
+
+def load_spans(paths):
+    spans = []
+    for path in paths:
+        with open(path, encoding='utf-8') as source:
+            spans.extend(json.loads(line) for line in source if line.strip())
+    return spans
+
+
+def breakdown(spans):
+    """Árvore de um trace em linhas (profundidade, span, tempo próprio em ms), na ordem de início."""
+    children = collections.defaultdict(list)
+    ids = {span['span_id'] for span in spans}
+    for span in spans:
+        parent = span['parent_id'] if span['parent_id'] in ids else None
+        children[parent].append(span)
+    for siblings in children.values():
+        siblings.sort(key=lambda span: span['start'])
+
+    rows = []
+
+    def walk(parent, depth):
+        for span in children.get(parent, ()):
+            own = span['duration_ms'] - sum(child['duration_ms'] for child in children.get(span['span_id'], ()))
+            rows.append((depth, span, max(0.0, own)))
+            walk(span['span_id'], depth + 1)
+
+    walk(None, 0)
+    return rows
+
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    sink = None
+
+    def do_POST(self):
+        batch = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'[]')
+        self.sink(batch)
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Coletor local e relatório de traces')
+    commands = parser.add_subparsers(dest='command', required=True)
+    collect = commands.add_parser('collect', help='Recebe spans por HTTP e grava em JSON por linha')
+    collect.add_argument('--port', type=int, default=9411)
+    collect.add_argument('--output', default=TRACE_FILE)
+    report = commands.add_parser('report', help='Mostra o tempo de cada salto de um trace')
+    report.add_argument('trace_id')
+    report.add_argument('files', nargs='+')
+    args = parser.parse_args(argv)
+
+    if args.command == 'collect':
+        CollectorHandler.sink = FileSink(args.output)
+        print(f'Coletando spans em http://0.0.0.0:{args.port}/spans -> {args.output}')
+        ThreadingHTTPServer(('0.0.0.0', args.port), CollectorHandler).serve_forever()
+        return 0
+
+    spans = [span for span in load_spans(args.files) if span['trace_id'] == args.trace_id]
+    if not spans:
+        print(f'Trace {args.trace_id} não encontrado', file=sys.stderr)
+        return 1
+    print(f'{"span":<60} {"total ms":>10} {"próprio ms":>11}')
+    for depth, span, own in breakdown(spans):
+        label = f'{"  " * depth}{span["service"]} [{span["kind"]}] {span["name"]}'
+        print(f'{label[:60]:<60} {span["duration_ms"]:>10.2f} {own:>11.2f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Benchmark de partida a frio: tempo do início do processo até a primeira resposta.
+
+Para cada serviço e cada modo de documentação (API_DOCS=live, static, off), sobe um
+interpretador novo que importa o app.py, atende GET /health pelo cliente de teste do Flask
+e em seguida busca a spec da API. O modo static usa a spec gerada por
+`python -m shared.apidocs build`, gravada num diretório temporário.
+
+Uso:
+    python tests/performance/bench_cold_start.py --runs 5 --services ms-reservas ms-usuarios
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+SERVICES = ['api-gateway', 'ms-usuarios', 'ms-espacos', 'ms-reservas', 'ms-precos', 'ms-checkin',
+            'ms-notificacoes', 'ms-financeiro', 'ms-analytics']
+
+# Executado no processo filho: mede até a primeira resposta e depois a primeira leitura da spec
+PROBE = """
+import importlib.util, json, sys, time
+service_dir = sys.argv[1]
+sys.path.insert(0, service_dir)
+spec = importlib.util.spec_from_file_location('app', service_dir + '/app.py')
+module = importlib.util.module_from_spec(spec)
+sys.modules['app'] = module
+spec.loader.exec_module(module)
+client = module.app.test_client()
+client.get('/health')
+ready = time.time()
+status = 404
+for route in ('/apispec.json', '/apispec_1.json'):
+    status = client.get(route).status_code
+    if status != 404:
+        break
+print(json.dumps({'ready': ready, 'spec': time.time() - ready, 'status': status,
+                  'flasgger': 'flasgger' in sys.modules}))
+"""
+
+
+def cold_start(service, mode, spec_file):
+    env = dict(os.environ, API_DOCS=mode, API_SPEC_FILE=spec_file, TRACE_EXPORTER='none')
+    # Relógio de parede dos dois lados: o filho informa quando a primeira resposta ficou pronta
+    started = time.time()
+    output = subprocess.run([sys.executable, '-c', PROBE, os.path.join(ROOT, service)], env=env,
+                            capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result['ready'] - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--services', nargs='+', default=SERVICES)
+    args = parser.parse_args()
+
+    print(f"{'serviço':<16} {'modo':<7} {'1ª resposta (ms)':>17} {'1ª spec (ms)':>13} {'status':>7} {'flasgger':>9}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for service in args.services:
+            spec_file = os.path.join(workdir, f'{service}.json')
+            subprocess.run([sys.executable, '-m', 'shared.apidocs', 'build', service, '--output', spec_file],
+                           cwd=ROOT, capture_output=True, check=True)
+            for mode in ('live', 'static', 'off'):
+                samples = [cold_start(service, mode, spec_file) for _ in range(args.runs)]
+                ready = statistics.median(sample[0] for sample in samples) * 1000
+                spec = statistics.median(sample[1]['spec'] for sample in samples) * 1000
+                last = samples[-1][1]
+                print(f"{service:<16} {mode:<7} {ready:>17.1f} {spec:>13.1f} {last['status']:>7} "
+                      f"{'sim' if last['flasgger'] else 'não':>9}")
+
+
+if __name__ == '__main__':
+    main()
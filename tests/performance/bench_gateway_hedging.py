@@ -0,0 +1,129 @@
+"""
+Benchmark de latência de cauda do API Gateway com e sem hedging.
+
+Sobe um ms-analytics falso em que uma fração das respostas é lenta, dispara GETs em
+/analytics/dashboard pelo gateway Flask e compara o p99 da rota antes e depois de ligar o
+hedging. O p99 é lido do histograma http_request_duration_seconds exposto em /metrics.
+
+Uso:
+    python tests/performance/bench_gateway_hedging.py --requests 2000 --concurrency 20 --slow-ratio 0.03
+"""
+import argparse
+import asyncio
+import datetime
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import urllib.request
+
+import jwt
+from aiohttp import ClientSession, TCPConnector, web
+from werkzeug.serving import make_server
+
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'api-gateway'))
+
+import app as flask_gateway  # noqa: E402
+from hedging import Hedger, RetryBudget  # noqa: E402
+from upstream import UpstreamClient  # noqa: E402
+
+ROUTE = '/analytics/<path:endpoint>'
+BUCKET_LINE = re.compile(r'^http_request_duration_seconds_bucket\{(?P<labels>[^}]*)\} (?P<count>\d+)$')
+
+
+def start_fake_upstream(loop, port, fast, slow, slow_ratio):
+    async def dashboard(request):
+        await asyncio.sleep(slow if random.random() < slow_ratio else fast)
+        return web.json_response({'occupancy': 0.7})
+
+    upstream = web.Application()
+    upstream.router.add_get('/analytics/dashboard', dashboard)
+    runner = web.AppRunner(upstream)
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, '127.0.0.1', port, backlog=4096).start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+
+def route_buckets(metrics_url):
+    """Contagem cumulativa por limite (le) do histograma da rota de analytics."""
+    text = urllib.request.urlopen(metrics_url).read().decode()
+    buckets = {}
+    for line in text.splitlines():
+        match = BUCKET_LINE.match(line)
+        if match and f'route="{ROUTE}"' in match['labels']:
+            le = re.search(r'le="([^"]+)"', match['labels'])[1]
+            buckets[float('inf') if le == '+Inf' else float(le)] = int(match['count'])
+    return buckets
+
+
+def quantile(before, after, q):
+    """Quantil aproximado do intervalo entre duas leituras do histograma (limite superior do bucket)."""
+    deltas = sorted((le, after.get(le, 0) - before.get(le, 0)) for le in after)
+    total = deltas[-1][1]
+    for le, count in deltas:
+        if count >= total * q:
+            return le
+    return float('inf')
+
+
+async def hammer(url, total, concurrency, headers):
+    queue = asyncio.Queue()
+    for index in range(total):
+        queue.put_nowait(index)
+
+    async with ClientSession(connector=TCPConnector(limit=concurrency), headers=headers) as session:
+        async def worker():
+            while not queue.empty():
+                index = queue.get_nowait()
+                # Query diferente em cada GET, para o single-flight não agrupar as chamadas
+                async with session.get(f'{url}?n={index}') as response:
+                    await response.read()
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--fast', type=float, default=0.005, help='latência normal do microsserviço (s)')
+    parser.add_argument('--slow', type=float, default=0.3, help='latência das respostas lentas (s)')
+    parser.add_argument('--slow-ratio', type=float, default=0.03, help='fração de respostas lentas')
+    parser.add_argument('--upstream-port', type=int, default=18012)
+    parser.add_argument('--gateway-port', type=int, default=18010)
+    args = parser.parse_args()
+
+    start_fake_upstream(asyncio.new_event_loop(), args.upstream_port, args.fast, args.slow, args.slow_ratio)
+    services = {'ms-analytics': f'http://127.0.0.1:{args.upstream_port}'}
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    flask_gateway.upstream = UpstreamClient(services, pool_size=args.concurrency * 2)
+    server = make_server('127.0.0.1', args.gateway_port, flask_gateway.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    token = jwt.encode({'user_id': 1, 'role': 'user',
+                        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)}, 'secret-key')
+    headers = {'Authorization': f'Bearer {token}'}
+    gateway_url = f'http://127.0.0.1:{args.gateway_port}'
+
+    print(f"{args.requests} GETs, concorrência {args.concurrency}, "
+          f"{args.slow_ratio:.0%} das respostas com {args.slow * 1000:.0f} ms")
+    print(f"{'hedging':<10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'extras':>8}")
+    for label, hedger in (('desligado', None), ('ligado', Hedger(budget=RetryBudget(ratio=0.1)))):
+        flask_gateway.upstream.hedger = hedger
+        before = route_buckets(gateway_url + '/metrics')
+        asyncio.run(hammer(gateway_url + '/analytics/dashboard', args.requests, args.concurrency, headers))
+        after = route_buckets(gateway_url + '/metrics')
+        extras = hedger.stats()['events']['sent'] if hedger else 0
+        print(f"{label:<10} {quantile(before, after, 0.5) * 1000:>10.1f} "
+              f"{quantile(before, after, 0.99) * 1000:>10.1f} {extras:>8}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
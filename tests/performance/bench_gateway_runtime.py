@@ -0,0 +1,125 @@
+"""
+Benchmark de vazão do API Gateway: modo Flask (threads) x modo assíncrono (aiohttp).
+
+Sobe um microsserviço falso com latência fixa, aponta os dois gateways para ele
+e dispara requisições concorrentes em GET /spaces.
+
+Uso:
+    python tests/performance/bench_gateway_runtime.py --requests 2000 --concurrency 200 --delay 0.05
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+
+from aiohttp import ClientSession, TCPConnector, web
+from werkzeug.serving import make_server
+
+# Todas as requisições saem do mesmo IP: sem isso o limite por cliente recusaria a maior parte
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'api-gateway'))
+
+import app as flask_gateway  # noqa: E402
+import async_app  # noqa: E402
+from upstream import UpstreamClient  # noqa: E402
+
+
+def start_fake_upstream(loop, port, delay):
+    async def spaces(request):
+        await asyncio.sleep(delay)
+        return web.json_response([{'id': i, 'name': f'Sala {i}'} for i in range(20)])
+
+    upstream = web.Application()
+    upstream.router.add_get('/spaces', spaces)
+    runner = web.AppRunner(upstream)
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, '127.0.0.1', port, backlog=4096).start())
+    return runner
+
+
+def run_loop_in_thread(loop):
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+async def hammer(url, total, concurrency):
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async with ClientSession(connector=TCPConnector(limit=concurrency)) as session:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    async with session.get(url) as response:
+                        await response.read()
+                        if response.status != 200:
+                            errors += 1
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'rps': total / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        'errors': errors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--delay', type=float, default=0.05, help='latência do microsserviço falso (s)')
+    parser.add_argument('--upstream-port', type=int, default=18002)
+    parser.add_argument('--flask-port', type=int, default=18000)
+    parser.add_argument('--async-port', type=int, default=18001)
+    args = parser.parse_args()
+
+    services = {'ms-espacos': f'http://127.0.0.1:{args.upstream_port}'}
+
+    upstream_loop = asyncio.new_event_loop()
+    start_fake_upstream(upstream_loop, args.upstream_port, args.delay)
+    run_loop_in_thread(upstream_loop)
+
+    # Modo atual: servidor Flask com uma thread por requisição
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    flask_gateway.upstream = UpstreamClient(services, pool_size=args.concurrency)
+    flask_server = make_server('127.0.0.1', args.flask_port, flask_gateway.app, threaded=True)
+    flask_server.socket.listen(4096)
+    threading.Thread(target=flask_server.serve_forever, daemon=True).start()
+
+    # Modo assíncrono
+    gateway_loop = asyncio.new_event_loop()
+    runner = web.AppRunner(async_app.create_app(services))
+    gateway_loop.run_until_complete(runner.setup())
+    gateway_loop.run_until_complete(web.TCPSite(runner, '127.0.0.1', args.async_port, backlog=4096).start())
+    run_loop_in_thread(gateway_loop)
+
+    print(f"{args.requests} requisições, concorrência {args.concurrency}, latência do upstream {args.delay * 1000:.0f} ms")
+    print(f"{'modo':<8} {'req/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'erros':>7}")
+    for mode, port in (('flask', args.flask_port), ('async', args.async_port)):
+        result = asyncio.run(hammer(f'http://127.0.0.1:{port}/spaces', args.requests, args.concurrency))
+        print(f"{mode:<8} {result['rps']:>10.1f} {result['p50_ms']:>10.1f} {result['p99_ms']:>10.1f} {result['errors']:>7}")
+
+    flask_server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
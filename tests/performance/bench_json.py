@@ -0,0 +1,83 @@
+"""
+Microbenchmark de serialização JSON: provider padrão do Flask x shared.fastjson.
+
+Usa listas de reservas, usuários e espaços no formato que os serviços devolvem em
+/admin/reservations, /admin/users e /spaces, e mede:
+- jsonify: montagem da resposta completa pelo app.json.response;
+- loads: leitura do corpo, como o gateway faz com as respostas dos microsserviços.
+
+Uso:
+    python tests/performance/bench_json.py --sizes 100 1000 10000 --repeat 20
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from shared.fastjson import FastJSONProvider, orjson  # noqa: E402
+
+
+def reservations(count):
+    return [{
+        'id': index, 'user_id': index % 500, 'space_id': index % 40,
+        'start_time': f'2026-05-{index % 28 + 1:02d}T09:00:00', 'end_time': f'2026-05-{index % 28 + 1:02d}T11:00:00',
+        'status': 'confirmed' if index % 7 else 'cancelled', 'total_price': 150.0 + index % 13,
+        'notes': 'Reunião de planejamento'
+    } for index in range(count)]
+
+
+def users(count):
+    return [{'id': index, 'name': f'Usuário {index}', 'email': f'user{index}@coworkflow.com',
+             'role': 'admin' if index % 50 == 0 else 'user'} for index in range(count)]
+
+
+def spaces(count):
+    return [{'id': index, 'name': f'Sala {index}', 'type': 'meeting_room', 'capacity': 4 + index % 20,
+             'price_per_hour': 50.0 + index % 30, 'amenities': ['wifi', 'projetor', 'café'],
+             'available': bool(index % 5)} for index in range(count)]
+
+
+def best_of(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"orjson {'disponível' if orjson is not None else 'ausente (fallback para json)'}")
+    print(f"{'payload':<22} {'KB':>8} {'jsonify padrão':>15} {'jsonify rápido':>15} {'loads padrão':>13} "
+          f"{'loads rápido':>13}  (ms)")
+    for name, build in (('reservations', reservations), ('users', users), ('spaces', spaces)):
+        for size in args.sizes:
+            document = build(size)
+            results = []
+            for provider_class in (DefaultJSONProvider, FastJSONProvider):
+                app = Flask(f'bench_{provider_class.__name__}')
+                app.json = provider_class(app)
+                with app.app_context():
+                    results.append(best_of(args.repeat, lambda: app.json.response(document)))
+            body = json.dumps(document).encode()
+            app = Flask('bench_loads')
+            default, fast = DefaultJSONProvider(app), FastJSONProvider(app)
+            results.append(best_of(args.repeat, lambda: default.loads(body)))
+            results.append(best_of(args.repeat, lambda: fast.loads(body)))
+            print(f"{name + ' x ' + str(size):<22} {len(body) / 1024:>8.0f} {results[0]:>15.2f} {results[1]:>15.2f} "
+                  f"{results[2]:>13.2f} {results[3]:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
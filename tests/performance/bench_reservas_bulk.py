@@ -0,0 +1,109 @@
+"""
+Benchmark da criação em lote de reservas: reservas/s com inserções avulsas x lotes.
+
+1. Store: N reservas criadas uma a uma (ReservationStore.create) e em lotes do tamanho
+   escolhido (create_many), só em memória e com o log em cada modo de JOURNAL_FSYNC. No modo
+   'always' o lote paga um fsync, as avulsas pagam um cada.
+2. HTTP (test_client do Flask, sem rede): um ano de dias úteis (261 reservas) pedido como 261
+   POST /reservations e como um POST /reservations/bulk com recorrência.
+
+Uso:
+    python tests/performance/bench_reservas_bulk.py --reservations 20000 --batch 261
+"""
+import argparse
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+SERVICE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'ms-reservas')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, SERVICE_DIR)
+
+from journal import Journal  # noqa: E402
+from store import ReservationStore  # noqa: E402
+
+HOUR = 3600.0
+
+
+def load_service():
+    spec = importlib.util.spec_from_file_location('bench_reservas_app', os.path.join(SERVICE_DIR, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def batch(first, count):
+    return [({'user_id': 7, 'space_id': slot % 50, 'start_time': '', 'end_time': '', 'status': 'active',
+              'total_price': 100.0}, slot * HOUR, slot * HOUR + HOUR / 2) for slot in range(first, first + count)]
+
+
+def store_rate(mode, count, size, bulk):
+    directory = tempfile.mkdtemp()
+    try:
+        journal = Journal(directory, fsync=mode, snapshot_every=10 ** 9) if mode else None
+        store = ReservationStore.open(journal) if journal else ReservationStore()
+        started = time.perf_counter()
+        for first in range(0, count, size):
+            items = batch(first, min(size, count - first))
+            if bulk:
+                assert store.create_many(items)[0]
+            else:
+                for reservation, start, end in items:
+                    assert store.create(reservation, start, end)[0]
+        elapsed = time.perf_counter() - started
+        if journal:
+            journal.close()
+        return count / elapsed
+    finally:
+        shutil.rmtree(directory)
+
+
+def http_rates(days):
+    first = datetime(2026, 1, 5, 9)
+    occurrences = [first + timedelta(days=offset) for offset in range(days * 7 // 5 + 7)
+                   if (first + timedelta(days=offset)).weekday() < 5][:days]
+
+    def body(space_id, start):
+        return {'user_id': 7, 'space_id': space_id, 'start_time': start.isoformat(),
+                'end_time': (start + timedelta(hours=1)).isoformat(), 'total_price': 100.0}
+
+    client = load_service().app.test_client()
+    started = time.perf_counter()
+    for start in occurrences:
+        assert client.post('/reservations', json=body(1, start)).status_code == 201
+    single = days / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    response = client.post('/reservations/bulk', json=dict(body(2, first), recurrence={
+        'frequency': 'daily', 'weekdays': [0, 1, 2, 3, 4], 'count': days}))
+    bulk = days / (time.perf_counter() - started)
+    assert response.get_json()['count'] == days
+    return single, bulk
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reservations', type=int, default=20000)
+    parser.add_argument('--batch', type=int, default=261)
+    args = parser.parse_args()
+
+    print(f"Store: {args.reservations} reservas, lotes de {args.batch}")
+    print(f"{'modo':<10} {'avulsas/s':>11} {'lote/s':>11} {'ganho':>7}")
+    for mode in (None, 'off', 'batch', 'always'):
+        # Com fsync por reserva o modo 'always' é lento demais para o total: mede uma fração
+        count = args.reservations if mode != 'always' else max(args.batch, args.reservations // 20)
+        single = store_rate(mode, count, args.batch, bulk=False)
+        bulk = store_rate(mode, count, args.batch, bulk=True)
+        print(f"{mode or 'memória':<10} {single:>11.0f} {bulk:>11.0f} {bulk / single:>6.1f}x")
+
+    print()
+    single, bulk = http_rates(args.batch)
+    print(f"HTTP ({args.batch} ocorrências): avulsas {single:.0f}/s, recorrência {bulk:.0f}/s ({bulk / single:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
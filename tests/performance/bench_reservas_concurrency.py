@@ -0,0 +1,156 @@
+"""
+Teste de estresse do ms-reservas com várias threads criando reservas ao mesmo tempo.
+
+Cada thread pede os mesmos R horários num dos S espaços. As threads que caem no mesmo espaço
+disputam cada horário, então o esperado é exatamente S x R reservas criadas (201), o resto
+recusado com 409, ids únicos e nenhuma gravação perdida. Modos:
+- antigo: a lógica anterior (id = len(reservations_db) + 1, sem locks), para comparação;
+- store: ReservationStore chamado direto, mostrando o custo dos locks;
+- http: POST /reservations pelo test_client do app, com métricas e tracing.
+
+Uso:
+    python tests/performance/bench_reservas_concurrency.py --threads 32 --spaces 8 --slots 200
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+SERVICE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'ms-reservas')
+sys.path.insert(0, SERVICE_DIR)
+
+from intervals import IntervalIndex  # noqa: E402
+
+BASE = datetime(2026, 5, 4, tzinfo=timezone.utc)
+
+
+def load_service():
+    spec = importlib.util.spec_from_file_location('bench_reservas_app', os.path.join(SERVICE_DIR, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def slot_body(space_id, slot, user_id):
+    # Um horário de 30 min por hora a partir de 2026-05-04
+    start = BASE + timedelta(hours=slot)
+    return {'user_id': user_id, 'space_id': space_id, 'start_time': start.isoformat(),
+            'end_time': (start + timedelta(minutes=30)).isoformat(), 'total_price': 100.0}
+
+
+def run_threads(count, target):
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(index):
+        barrier.wait()
+        results[index] = target(index)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - started
+
+
+def stress_store(args):
+    store = load_service().store
+
+    def worker(index):
+        space_id, ids = index % args.spaces, []
+        for slot in range(args.slots):
+            reservation = {'user_id': index, 'space_id': space_id, 'status': 'active'}
+            reservation_id, _ = store.create(reservation, slot * 3600.0, slot * 3600.0 + 1800.0)
+            if reservation_id is not None:
+                ids.append(reservation_id)
+        return {201: len(ids)}, ids
+
+    results, elapsed = run_threads(args.threads, worker)
+    ids = [reservation_id for _, thread_ids in results for reservation_id in thread_ids]
+    booked = sum(len(schedule) for schedule in store.schedules.spaces.values())
+    return {'created': len(ids), 'conflicts': args.threads * args.slots - len(ids), 'unique_ids': len(set(ids)),
+            'stored': len(store), 'booked': booked, 'elapsed': elapsed}
+
+
+def stress_service(args):
+    service = load_service()
+    app = service.app
+
+    def worker(index):
+        client = app.test_client()
+        statuses, ids = {}, []
+        for slot in range(args.slots):
+            response = client.post('/reservations', json=slot_body(index % args.spaces, slot, index))
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code == 201:
+                ids.append(response.get_json()['id'])
+        return statuses, ids
+
+    results, elapsed = run_threads(args.threads, worker)
+    created = sum(statuses.get(201, 0) for statuses, _ in results)
+    conflicts = sum(statuses.get(409, 0) for statuses, _ in results)
+    ids = [reservation_id for _, thread_ids in results for reservation_id in thread_ids]
+    booked = sum(len(schedule) for schedule in service.store.schedules.spaces.values())
+    return {'created': created, 'conflicts': conflicts, 'unique_ids': len(set(ids)),
+            'stored': len(service.store), 'booked': booked, 'elapsed': elapsed}
+
+
+def stress_naive(args):
+    # Lógica anterior ao ReservationStore: verificação e gravação sem lock, id por len()
+    reservations_db = {}
+    schedules = IntervalIndex()
+
+    def worker(index):
+        space_id, ids = index % args.spaces, []
+        for slot in range(args.slots):
+            start, end = slot * 3600.0, slot * 3600.0 + 1800.0
+            if schedules.conflict(space_id, start, end) is not None:
+                continue
+            reservation_id = len(reservations_db) + 1
+            reservations_db[reservation_id] = {'id': reservation_id, 'user_id': index, 'space_id': space_id}
+            schedules.add(space_id, start, end, reservation_id)
+            ids.append(reservation_id)
+        return {201: len(ids)}, ids
+
+    results, elapsed = run_threads(args.threads, worker)
+    ids = [reservation_id for _, thread_ids in results for reservation_id in thread_ids]
+    booked = sum(len(schedule) for schedule in schedules.spaces.values())
+    return {'created': len(ids), 'conflicts': args.threads * args.slots - len(ids), 'unique_ids': len(set(ids)),
+            'stored': len(reservations_db), 'booked': booked, 'elapsed': elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--spaces', type=int, default=8)
+    parser.add_argument('--slots', type=int, default=200)
+    parser.add_argument('--switch-interval', type=float, default=1e-4,
+                        help='sys.setswitchinterval: valores baixos forçam mais trocas de thread')
+    args = parser.parse_args()
+    sys.setswitchinterval(args.switch_interval)
+
+    expected = min(args.threads, args.spaces) * args.slots
+    print(f"{args.threads} threads, {args.spaces} espaços, {args.slots} horários: esperadas {expected} reservas")
+    print(f"{'modo':<10} {'201':>7} {'409':>7} {'ids únicos':>11} {'gravadas':>9} {'na agenda':>10} "
+          f"{'perdidas':>9} {'reservas/s':>11}")
+    failed = False
+    for name, stress in (('antigo', stress_naive), ('store', stress_store), ('http', stress_service)):
+        result = stress(args)
+        lost = result['created'] - result['stored']
+        print(f"{name:<10} {result['created']:>7} {result['conflicts']:>7} {result['unique_ids']:>11} "
+              f"{result['stored']:>9} {result['booked']:>10} {lost:>9} "
+              f"{args.threads * args.slots / result['elapsed']:>11.0f}")
+        if name != 'antigo':
+            failed |= not (result['created'] == result['unique_ids'] == result['stored'] == result['booked'] == expected)
+    if failed:
+        print('FALHA: o store perdeu ou duplicou reservas')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Microbenchmark das buscas por usuário no ms-reservas: varredura x índice secundário.
+
+Preenche o store do próprio app com N reservas (sem passar pelo HTTP) e mede
+GET /reservations/user/<id> pelo test_client:
+- varredura: o filtro antigo sobre todas as reservas;
+- índice: a rota atual, que lê os ids do índice por user_id.
+
+Uso:
+    python tests/performance/bench_reservas_indexes.py --sizes 10000 100000 1000000 --users 50000
+"""
+import argparse
+import importlib.util
+import os
+import random
+import sys
+import time
+
+SERVICE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'ms-reservas')
+sys.path.insert(0, SERVICE_DIR)
+
+
+def load_service():
+    spec = importlib.util.spec_from_file_location('bench_reservas_app', os.path.join(SERVICE_DIR, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def populate(service, count, users):
+    for reservation_id in range(1, count + 1):
+        reservation = {
+            'id': reservation_id, 'user_id': reservation_id % users, 'space_id': reservation_id % 40,
+            'start_time': '2026-05-04T09:00:00', 'end_time': '2026-05-04T11:00:00',
+            'status': 'active' if reservation_id % 7 else 'cancelled', 'total_price': 150.0
+        }
+        service.store.reservations[reservation_id] = reservation
+        service.store.indexes.add(reservation)
+
+
+def per_lookup(function, user_ids):
+    started = time.perf_counter()
+    for user_id in user_ids:
+        function(user_id)
+    return (time.perf_counter() - started) / len(user_ids) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--lookups', type=int, default=500)
+    args = parser.parse_args()
+
+    random.seed(42)
+    print(f"{'reservas':>10} {'por usuário':>12} {'varredura':>12} {'índice':>10} {'rota HTTP':>10}  (ms por busca)")
+    for size in args.sizes:
+        service = load_service()
+        populate(service, size, args.users)
+        client = service.app.test_client()
+        user_ids = [random.randrange(args.users) for _ in range(args.lookups)]
+        db = service.store.reservations
+
+        # A varredura é lenta demais para repetir todas as buscas nos tamanhos grandes
+        scan = per_lookup(lambda user_id: [r for r in db.values() if r['user_id'] == user_id],
+                          user_ids[:max(5, 2000000 // size)])
+        indexed = per_lookup(lambda user_id: [db[i] for i in service.store.indexes.ids('user_id', user_id)], user_ids)
+        route = per_lookup(lambda user_id: client.get(f'/reservations/user/{user_id}'), user_ids)
+        print(f"{size:>10} {size / args.users:>12.1f} {scan:>12.3f} {indexed:>10.4f} {route:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
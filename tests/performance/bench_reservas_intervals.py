@@ -0,0 +1,77 @@
+"""
+Microbenchmark da verificação de conflito de reservas: varredura linear x índice por espaço.
+
+Monta N reservas ativas de 1 h, sem sobreposição, espalhadas por alguns espaços, e mede o
+tempo médio de uma verificação de conflito para horários aleatórios:
+- linear: filtra todas as reservas procurando uma sobreposta no mesmo espaço;
+- índice: IntervalIndex do ms-reservas (busca binária nas reservas do espaço).
+
+Uso:
+    python tests/performance/bench_reservas_intervals.py --sizes 1000 100000 1000000 --spaces 10
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'ms-reservas'))
+
+from intervals import IntervalIndex  # noqa: E402
+
+HOUR = 3600.0
+
+
+def bookings(count, spaces):
+    # Reservas de 1 h a cada 2 h em cada espaço: metade dos horários consultados colide
+    return [(index % spaces, (index // spaces) * 2 * HOUR, (index // spaces) * 2 * HOUR + HOUR, index + 1)
+            for index in range(count)]
+
+
+def linear_conflict(rows, space_id, start, end):
+    for row_space, row_start, row_end, row_id in rows:
+        if row_space == space_id and row_start < end and start < row_end:
+            return row_id
+    return None
+
+
+def per_check(function, queries):
+    started = time.perf_counter()
+    for query in queries:
+        function(*query)
+    return (time.perf_counter() - started) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--spaces', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    random.seed(42)
+    print(f"{'reservas':>10} {'linear':>12} {'índice':>12} {'montagem índice':>16}  (µs por verificação, s)")
+    for size in args.sizes:
+        rows = bookings(size, args.spaces)
+        horizon = (size // args.spaces + 1) * 2 * HOUR
+        queries = []
+        for _ in range(args.queries):
+            start = random.uniform(0, horizon)
+            queries.append((random.randrange(args.spaces), start, start + HOUR / 2))
+
+        started = time.perf_counter()
+        index = IntervalIndex()
+        for space_id, start, end, reservation_id in rows:
+            index.add(space_id, start, end, reservation_id)
+        build = time.perf_counter() - started
+
+        # A varredura linear é lenta demais para repetir todas as consultas nos tamanhos grandes
+        linear = per_check(lambda *query: linear_conflict(rows, *query), queries[:max(10, 200000 // size)])
+        indexed = per_check(index.conflict, queries)
+        for space_id, start, end in queries[:200]:
+            assert (linear_conflict(rows, space_id, start, end) is None) == (index.conflict(space_id, start, end) is None)
+        print(f"{size:>10} {linear:>12.1f} {indexed:>12.2f} {build:>16.2f}")
+
+
+if __name__ == '__main__':
+    main()
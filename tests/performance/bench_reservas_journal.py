@@ -0,0 +1,140 @@
+"""
+Benchmark do log de reservas (ms-reservas/journal.py).
+
+1. Latência de gravação: T threads criam reservas em espaços próprios com o log em cada modo
+   de JOURNAL_FSYNC, mais o store só em memória como referência. Mostra p50/p99/máximo por
+   criação e a média de registros por fsync (group commit).
+2. Recuperação: grava N reservas (10% canceladas) e mede a subida do store a partir só do log
+   e a partir do snapshot compactado.
+
+Uso:
+    python tests/performance/bench_reservas_journal.py --threads 16 --writes 2000 --recovery 1000000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'ms-reservas'))
+
+from journal import Journal  # noqa: E402
+from store import ReservationStore  # noqa: E402
+
+
+def reservation(space_id, user_id):
+    return {'user_id': user_id, 'space_id': space_id, 'start_time': '2026-05-04T09:00:00',
+            'end_time': '2026-05-04T10:00:00', 'status': 'active', 'total_price': 150.0}
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class CountingJournal(Journal):
+    """Conta os fsyncs para mostrar o tamanho médio dos grupos."""
+
+    syncs = 0
+
+    def _sync(self):
+        self.syncs += 1
+        super()._sync()
+
+
+def write_latency(directory, mode, threads, writes):
+    journal = CountingJournal(directory, fsync=mode, snapshot_every=10 ** 9) if mode else None
+    store = ReservationStore.open(journal) if journal else ReservationStore()
+    latencies = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads)
+
+    def worker(index):
+        barrier.wait()
+        for slot in range(writes):
+            started = time.perf_counter()
+            store.create(reservation(index, index), slot * 3600.0, slot * 3600.0 + 1800.0)
+            latencies[index].append(time.perf_counter() - started)
+
+    pool = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if journal:
+        journal.close()
+    values = sorted(value for thread_values in latencies for value in thread_values)
+    group = len(values) / journal.syncs if journal and journal.syncs else 0
+    return values, elapsed, group
+
+
+def populate(directory, count):
+    store = ReservationStore.open(Journal(directory, fsync='off', snapshot_every=10 ** 9))
+    for index in range(count):
+        store.create(reservation(index % 500, index % 20000), (index // 500) * 3600.0, (index // 500) * 3600.0 + 1800.0)
+    for reservation_id in range(1, count + 1, 10):
+        store.cancel(reservation_id)
+    return store
+
+
+def reopen(directory):
+    started = time.perf_counter()
+    store = ReservationStore.open(Journal(directory, snapshot_every=10 ** 9))
+    return store, time.perf_counter() - started
+
+
+def size_of(directory):
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)) / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--writes', type=int, default=2000, help='criações por thread')
+    parser.add_argument('--recovery', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--dir', default=None, help='diretório no disco a medir (padrão: temporário)')
+    args = parser.parse_args()
+
+    print(f"Gravação: {args.threads} threads x {args.writes} criações")
+    print(f"{'modo':<10} {'p50 µs':>9} {'p99 µs':>9} {'máx ms':>9} {'reservas/s':>11} {'por fsync':>10}")
+    for mode in (None, 'off', 'batch', 'always'):
+        directory = tempfile.mkdtemp(dir=args.dir)
+        try:
+            values, elapsed, group = write_latency(directory, mode, args.threads, args.writes)
+        finally:
+            shutil.rmtree(directory)
+        print(f"{mode or 'memória':<10} {percentile(values, 0.5) * 1e6:>9.0f} {percentile(values, 0.99) * 1e6:>9.0f} "
+              f"{values[-1] * 1e3:>9.1f} {len(values) / elapsed:>11.0f} {group:>10.1f}")
+
+    print()
+    print(f"{'reservas':>10} {'origem':<9} {'MB':>7} {'subida s':>9}")
+    for count in args.recovery:
+        directory = tempfile.mkdtemp(dir=args.dir)
+        try:
+            store = populate(directory, count)
+            expected = len(store), len(store.find('status', 'cancelled'))
+            store.journal.close()
+            del store
+            recovered, elapsed = reopen(directory)
+            assert (len(recovered), len(recovered.find('status', 'cancelled'))) == expected
+            print(f"{count:>10} {'log':<9} {size_of(directory):>7.0f} {elapsed:>9.2f}")
+
+            started = time.perf_counter()
+            recovered.compact()
+            compacted = time.perf_counter() - started
+            recovered.journal.close()
+            del recovered
+            recovered, elapsed = reopen(directory)
+            recovered.journal.close()
+            assert (len(recovered), len(recovered.find('status', 'cancelled'))) == expected
+            print(f"{count:>10} {'snapshot':<9} {size_of(directory):>7.0f} {elapsed:>9.2f}   "
+                  f"(compactação: {compacted:.2f} s)")
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark da listagem do admin no ms-reservas: lista inteira x página por cursor x exportação NDJSON.
+
+Preenche o store do app com N reservas e mede, pelo test_client, tempo e pico de memória
+alocada (tracemalloc) de:
+- lista inteira: o comportamento anterior, jsonify de todas as reservas;
+- página: GET /admin/reservations?limit=100 a partir de um cursor no fim da lista;
+- página filtrada: status=cancelled&space_id=7 a partir do mesmo cursor;
+- exportação: GET /admin/reservations?format=ndjson, consumida bloco a bloco.
+
+Uso:
+    python tests/performance/bench_reservas_listing.py --sizes 100000 1000000
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+import tracemalloc
+
+SERVICE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'ms-reservas')
+sys.path.insert(0, SERVICE_DIR)
+
+
+def load_service():
+    spec = importlib.util.spec_from_file_location('bench_reservas_app', os.path.join(SERVICE_DIR, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def populate(store, count):
+    for reservation_id in range(1, count + 1):
+        reservation = {
+            'id': reservation_id, 'user_id': reservation_id % 20000, 'space_id': reservation_id % 40,
+            'start_time': '2026-05-04T09:00:00', 'end_time': '2026-05-04T11:00:00',
+            'status': 'active' if reservation_id % 7 else 'cancelled', 'total_price': 150.0
+        }
+        store.apply({'op': 'create', 'reservation': reservation, 'times': [reservation_id * 3600.0,
+                                                                           reservation_id * 3600.0 + 1800.0]})
+    store.rebuild()
+
+
+def measure(function):
+    """(segundos, pico de MB alocados) da chamada; o tempo é medido sem o tracemalloc ligado."""
+    started = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'reservas':>10} {'modo':<16} {'s':>8} {'pico MB':>9} {'corpo MB':>9}")
+    for size in args.sizes:
+        service = load_service()
+        populate(service.store, size)
+        client = service.app.test_client()
+        cursor = size - 5000
+        sizes = {}
+
+        def full():
+            with service.app.test_request_context():
+                sizes['lista inteira'] = len(service.jsonify(service.store.all()).get_data())
+
+        def page():
+            sizes['página'] = len(client.get(f'/admin/reservations?limit=100&cursor={cursor}').data)
+
+        def filtered():
+            response = client.get(f'/admin/reservations?limit=100&cursor={cursor}&status=cancelled&space_id=7')
+            sizes['página filtrada'] = len(response.data)
+
+        def export():
+            response = client.get('/admin/reservations?format=ndjson')
+            sizes['exportação'] = sum(len(chunk) for chunk in response.response)
+            response.close()
+
+        for name, function in (('lista inteira', full), ('página', page), ('página filtrada', filtered),
+                               ('exportação', export)):
+            elapsed, peak = measure(function)
+            print(f"{size:>10} {name:<16} {elapsed:>8.3f} {peak:>9.1f} {sizes[name] / 2 ** 20:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Microbenchmark da consulta de reservas por período: filtrar tudo x índice por início.
+
+Monta N reservas de 1 h a 8 h espalhadas por alguns espaços e mede o tempo médio de buscar as
+que se sobrepõem a uma janela aleatória de um dia, com e sem space_id:
+- linear: o que restava antes, filtrar a lista inteira convertendo os horários a cada consulta;
+- índice: ReservationStore.between (busca binária no índice por início + k resultados).
+
+Uso:
+    python tests/performance/bench_reservas_period.py --sizes 10000 100000 1000000 --spaces 50
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'ms-reservas'))
+
+from intervals import parse_time  # noqa: E402
+from store import ReservationStore  # noqa: E402
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+
+def iso(moment):
+    return datetime.fromtimestamp(moment, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def populate(size, spaces):
+    store = ReservationStore()
+    for index in range(size):
+        space_id = index % spaces
+        # Uma reserva a cada 8 h por espaço, com duração variável
+        start = (index // spaces) * 8 * HOUR
+        end = start + random.randint(1, 8) * HOUR
+        store.create({'user_id': index % 1000, 'space_id': space_id, 'start_time': iso(start), 'end_time': iso(end),
+                      'status': 'active', 'total_price': 100.0}, start, end)
+    return store
+
+
+def linear(reservations, start, end, space_id):
+    return [reservation for reservation in reservations
+            if (space_id is None or reservation['space_id'] == space_id)
+            and parse_time(reservation['start_time']) < end and parse_time(reservation['end_time']) > start]
+
+
+def per_query(function, queries):
+    started = time.perf_counter()
+    for query in queries:
+        function(*query)
+    return (time.perf_counter() - started) / len(queries) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--spaces', type=int, default=50)
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+
+    random.seed(42)
+    print(f"{'reservas':>10} {'espaço':<7} {'resultados':>10} {'linear ms':>10} {'índice ms':>10}")
+    for size in args.sizes:
+        store = populate(size, args.spaces)
+        reservations = store.all()
+        horizon = (size // args.spaces + 1) * 8 * HOUR
+        for by_space in (False, True):
+            queries = []
+            for _ in range(args.queries):
+                start = random.uniform(0, horizon)
+                queries.append((start, start + DAY, random.randrange(args.spaces) if by_space else None))
+            for query in queries[:20]:
+                assert linear(reservations, *query) == sorted(store.between(*query), key=lambda r: r['id'])
+            # A varredura linear é lenta demais para repetir todas as consultas nos tamanhos grandes
+            slow = per_query(lambda *query: linear(reservations, *query), queries[:max(3, 100000 // size)])
+            fast = per_query(lambda *query: store.between(*query), queries)
+            found = sum(len(store.between(*query)) for query in queries) / len(queries)
+            print(f"{size:>10} {'sim' if by_space else 'não':<7} {found:>10.0f} {slow:>10.2f} {fast:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark de vazão por serviço: servidor de desenvolvimento (python app.py) x perfil de produção
+(gunicorn -c shared/gunicorn_conf.py app:app).
+
+Cada serviço sobe como processo separado nos dois modos e recebe GETs concorrentes numa rota
+que não depende de outros serviços nem de banco.
+
+Uso:
+    python tests/performance/bench_serving.py --requests 3000 --concurrency 50 --services ms-espacos ms-reservas
+"""
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from aiohttp import ClientSession, TCPConnector
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Porta do app.run de cada serviço e uma rota de leitura autocontida
+SERVICES = {
+    'api-gateway': (8000, '/health'),
+    'frontend': (3000, '/metrics'),
+    'ms-usuarios': (5001, '/metrics'),
+    'ms-espacos': (5002, '/spaces'),
+    'ms-reservas': (5003, '/admin/reservations'),
+    'ms-precos': (5005, '/metrics'),
+    'ms-checkin': (5006, '/metrics'),
+    'ms-notificacoes': (5007, '/metrics'),
+    'ms-financeiro': (5008, '/financial/revenue'),
+    'ms-analytics': (5009, '/analytics/dashboard'),
+}
+# Mesmo perfil dos Dockerfiles: serviços com dados em memória rodam um worker só
+SINGLE_WORKER = {'ms-usuarios', 'ms-espacos', 'ms-reservas'}
+
+
+def start(service, mode, port):
+    if mode == 'dev':
+        command = [sys.executable, 'app.py']
+    else:
+        command = [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'shared', 'gunicorn_conf.py'),
+                   'app:app']
+    env = dict(os.environ, PORT=str(port), RATE_LIMIT_ENABLED='false', GUNICORN_LOGLEVEL='warning')
+    if service in SINGLE_WORKER:
+        env.update(WEB_CONCURRENCY='1', GUNICORN_THREADS='8', GUNICORN_MAX_REQUESTS='0')
+    # Sessão própria: o reloader do modo debug cria um processo filho que também precisa ser encerrado
+    return subprocess.Popen(command, cwd=os.path.join(ROOT, service), env=env, start_new_session=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_ready(url, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'{url} did not come up in {timeout}s')
+
+
+async def hammer(url, total, concurrency):
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async with ClientSession(connector=TCPConnector(limit=concurrency)) as session:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    async with session.get(url) as response:
+                        await response.read()
+                        if response.status != 200:
+                            errors += 1
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'rps': total / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        'errors': errors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--services', nargs='+', default=list(SERVICES))
+    args = parser.parse_args()
+
+    print(f"{args.requests} requisições, concorrência {args.concurrency}, {os.cpu_count()} núcleos")
+    print(f"{'serviço':<16} {'modo':<6} {'req/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'erros':>7}")
+    for service in args.services:
+        port, path = SERVICES[service]
+        url = f'http://127.0.0.1:{port}{path}'
+        for mode in ('dev', 'prod'):
+            process = start(service, mode, port)
+            try:
+                wait_ready(f'http://127.0.0.1:{port}/metrics')
+                asyncio.run(hammer(url, min(200, args.requests), args.concurrency))  # aquecimento
+                result = asyncio.run(hammer(url, args.requests, args.concurrency))
+            finally:
+                os.killpg(process.pid, signal.SIGTERM)
+                process.wait()
+            print(f"{service:<16} {mode:<6} {result['rps']:>10.1f} {result['p50_ms']:>10.1f} "
+                  f"{result['p99_ms']:>10.1f} {result['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+import importlib.util
+import os
+import sys
+from unittest.mock import Mock, patch
+
+FRONTEND_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'frontend')
+
+
+def load_frontend():
+    spec = importlib.util.spec_from_file_location('frontend_app', os.path.join(FRONTEND_DIR, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    # O Flask acha a pasta templates/ pelo módulo registrado
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def bff_response(status_code, body):
+    response = Mock(status_code=status_code)
+    response.json.return_value = body
+    return response
+
+
+class TestReservationsPage:
+    """Testes da página de reservas do frontend com o BFF degradado"""
+
+    def setup_method(self):
+        self.frontend = load_frontend()
+        self.client = self.frontend.app.test_client()
+        with self.client.session_transaction() as session:
+            session['token'] = 'token'
+
+    def get_page(self, response):
+        with patch.object(self.frontend.requests, 'get', return_value=response):
+            return self.client.get('/reservations')
+
+    def test_lists_reservations(self):
+        """BFF completo: as reservas aparecem"""
+        page = self.get_page(bff_response(200, {'user': {'id': 7}, 'reservations': [
+            {'id': 42, 'space_id': 3, 'start_time': '', 'end_time': '', 'status': 'active', 'total_price': 10}]}))
+        assert page.status_code == 200
+        assert b'Reserva #42' in page.data
+
+    def test_failed_backend_shows_degraded_page(self):
+        """Reservas indisponíveis (502 do BFF ou corpo sem JSON) mostram a página vazia com aviso"""
+        page = self.get_page(bff_response(502, {'user': {'id': 7}, 'reservations': None,
+                                                'errors': {'reservations': 503}}))
+        assert page.status_code == 200
+        assert 'Erro ao carregar reservas'.encode() in page.data
+
+        broken = bff_response(503, None)
+        broken.json.side_effect = ValueError('not json')
+        assert self.get_page(broken).status_code == 200
+
+    def test_partial_failure_keeps_the_reservations(self):
+        """Se só /users/me falhou, as reservas continuam na página"""
+        page = self.get_page(bff_response(502, {'user': None, 'errors': {'user': 503}, 'reservations': [
+            {'id': 5, 'space_id': 1, 'start_time': '', 'end_time': '', 'status': 'cancelled', 'total_price': 1}]}))
+        assert b'Reserva #5' in page.data
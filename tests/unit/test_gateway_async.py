@@ -0,0 +1,156 @@
+import asyncio
+import datetime
+import os
+import subprocess
+import sys
+
+import jwt
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from aiohttp import ClientSession, web  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'api-gateway'))
+
+import async_app  # noqa: E402
+
+
+def make_token(role='user'):
+    payload = {
+        'user_id': 1,
+        'role': role,
+        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    }
+    return jwt.encode(payload, 'secret-key')
+
+
+async def run_with_gateway(scenario):
+    async def spaces(request):
+        return web.json_response([{'id': 1, 'name': 'Sala 1'}])
+
+    async def admin_reservations(request):
+        return web.json_response([{'id': 7}])
+
+    upstream = web.Application()
+    upstream.router.add_get('/spaces', spaces)
+    upstream.router.add_get('/admin/reservations', admin_reservations)
+    upstream_runner = web.AppRunner(upstream)
+    await upstream_runner.setup()
+    upstream_site = web.TCPSite(upstream_runner, '127.0.0.1', 0)
+    await upstream_site.start()
+    upstream_port = upstream_site._server.sockets[0].getsockname()[1]
+
+    services = {
+        'ms-espacos': f'http://127.0.0.1:{upstream_port}',
+        'ms-reservas': f'http://127.0.0.1:{upstream_port}'
+    }
+    gateway_runner = web.AppRunner(async_app.create_app(services))
+    await gateway_runner.setup()
+    gateway_site = web.TCPSite(gateway_runner, '127.0.0.1', 0)
+    await gateway_site.start()
+    gateway_port = gateway_site._server.sockets[0].getsockname()[1]
+
+    try:
+        async with ClientSession() as session:
+            return await scenario(session, f'http://127.0.0.1:{gateway_port}')
+    finally:
+        await gateway_runner.cleanup()
+        await upstream_runner.cleanup()
+
+
+class TestAsyncGateway:
+    """Testes do modo assíncrono do API Gateway"""
+
+    def test_does_not_build_the_flask_app(self):
+        """O modo assíncrono usa o estado comum sem importar o app Flask"""
+        code = 'import sys, async_app; assert "app" not in sys.modules and "flasgger" not in sys.modules'
+        gateway_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'api-gateway')
+        subprocess.run([sys.executable, '-c', code], cwd=gateway_dir, check=True)
+
+    def test_proxies_public_spaces(self):
+        """GET /spaces é repassado ao ms-espacos sem autenticação"""
+        async_app.spaces_cache.invalidate()
+        async def scenario(session, base_url):
+            async with session.get(f'{base_url}/spaces') as response:
+                return response.status, await response.json()
+
+        status, body = asyncio.run(run_with_gateway(scenario))
+        assert status == 200
+        assert body == [{'id': 1, 'name': 'Sala 1'}]
+
+    def test_spaces_etag_returns_304(self):
+        """Catálogo em cache responde 304 para o ETag atual"""
+        async_app.spaces_cache.invalidate()
+
+        async def scenario(session, base_url):
+            async with session.get(f'{base_url}/spaces') as response:
+                etag = response.headers['ETag']
+            async with session.get(f'{base_url}/spaces', headers={'If-None-Match': etag}) as response:
+                return response.status
+
+        assert asyncio.run(run_with_gateway(scenario)) == 304
+
+    def test_same_token_rules_as_flask_mode(self):
+        """Rotas protegidas respondem 401 sem token e 403 para usuário comum"""
+        async def scenario(session, base_url):
+            statuses = []
+            async with session.get(f'{base_url}/admin/reservations') as response:
+                statuses.append(response.status)
+            headers = {'Authorization': f'Bearer {make_token()}'}
+            async with session.get(f'{base_url}/admin/reservations', headers=headers) as response:
+                statuses.append(response.status)
+            headers = {'Authorization': f'Bearer {make_token("admin")}'}
+            async with session.get(f'{base_url}/admin/reservations', headers=headers) as response:
+                statuses.append(response.status)
+            headers = {'Authorization': f'Bearer {make_token()}'}
+            async with session.get(f'{base_url}/reservations?from=2026-05-04T00:00&to=2026-05-05T00:00',
+                                   headers=headers) as response:
+                statuses.append(response.status)
+            return statuses
+
+        assert asyncio.run(run_with_gateway(scenario)) == [401, 403, 200, 403]
+
+    def test_unavailable_service_returns_503(self):
+        """Microsserviço fora do ar gera 503, como no modo Flask"""
+        async def scenario(session, base_url):
+            headers = {'Authorization': f'Bearer {make_token()}'}
+            async with session.get(f'{base_url}/analytics/dashboard', headers=headers) as response:
+                return response.status
+
+        # ms-analytics não está no mapa de serviços do teste: a chamada falha
+        assert asyncio.run(run_with_gateway(scenario)) == 503
+
+    def test_cancelled_attempt_is_not_an_upstream_failure(self):
+        """Tentativa cancelada (a perdedora do hedging) não conta no breaker nem na réplica"""
+        async def slow(request):
+            await asyncio.sleep(0.5)
+            return web.json_response([])
+
+        async def scenario():
+            upstream = web.Application()
+            upstream.router.add_get('/spaces', slow)
+            runner = web.AppRunner(upstream)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            client = async_app.AsyncUpstreamClient({'ms-espacos': f'http://127.0.0.1:{port}'})
+            await client.start()
+            try:
+                for _ in range(6):
+                    attempt = asyncio.ensure_future(client.fetch('ms-espacos', 'GET', '/spaces'))
+                    await asyncio.sleep(0.05)
+                    attempt.cancel()
+                    with pytest.raises(asyncio.CancelledError):
+                        await attempt
+                return client.stats()['ms-espacos']
+            finally:
+                await client.close()
+                await runner.cleanup()
+
+        stats = asyncio.run(scenario())
+        endpoint = stats['balancer']['endpoints'][0]
+        assert stats['breaker']['window_failures'] == 0
+        assert (endpoint['failures'], endpoint['outstanding'], endpoint['ejected']) == (0, 0, False)
+        assert stats['in_use'] == 0 and stats['bulkhead']['in_flight'] == 0
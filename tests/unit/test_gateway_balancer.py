@@ -0,0 +1,163 @@
+import json
+import os
+import sys
+from unittest.mock import Mock
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'api-gateway'))
+
+from balancer import Balancer, EndpointSource, parse_endpoints  # noqa: E402
+from upstream import ServicePool, UpstreamClient  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestBalancer:
+    """Testes da escolha de réplicas e da ejeção passiva"""
+
+    def test_p2c_prefers_fewer_outstanding(self):
+        """Entre duas réplicas, a com menos chamadas em andamento é escolhida"""
+        balancer = Balancer('ms-reservas', ['http://a', 'http://b'])
+        busy = balancer.choose()
+        for _ in range(20):
+            chosen = balancer.choose()
+            assert chosen is not busy
+            balancer.release(chosen, True)
+
+    def test_least_outstanding_spreads_load(self):
+        """Chamadas simultâneas se espalham pelas réplicas"""
+        balancer = Balancer('ms-reservas', ['http://a', 'http://b', 'http://c'], strategy='least')
+        chosen = {balancer.choose().url for _ in range(3)}
+        assert chosen == {'http://a', 'http://b', 'http://c'}
+
+    def test_failing_endpoint_is_ejected_and_returns(self):
+        """Réplica com falhas seguidas sai da rotação e volta depois do tempo de ejeção"""
+        clock = FakeClock()
+        balancer = Balancer('ms-reservas', ['http://a', 'http://b'], eject_failures=3, eject_seconds=30,
+                            clock=clock)
+        bad = next(endpoint for endpoint in balancer.endpoints if endpoint.url == 'http://a')
+        for _ in range(3):
+            bad.outstanding += 1
+            balancer.release(bad, False)
+
+        assert {balancer.choose().url for _ in range(10)} == {'http://b'}
+        clock.now += 31
+        assert 'http://a' in {balancer.choose().url for _ in range(40)}
+        assert balancer.stats()['endpoints'][0]['ejections'] == 1
+
+    def test_never_ejects_beyond_limit(self):
+        """Com uma réplica só, ela nunca é ejetada (o circuit breaker cuida desse caso)"""
+        balancer = Balancer('ms-reservas', ['http://a'], eject_failures=1)
+        endpoint = balancer.choose()
+        balancer.release(endpoint, False)
+        assert not balancer.stats()['endpoints'][0]['ejected']
+
+    def test_exclude_avoids_tried_endpoint(self):
+        """Segunda tentativa vai para outra réplica quando há alternativa"""
+        balancer = Balancer('ms-espacos', ['http://a', 'http://b'])
+        first = balancer.choose()
+        assert balancer.choose(exclude={first.url}).url != first.url
+
+    def test_update_keeps_existing_state(self):
+        """Recarregar a lista mantém os contadores das réplicas que continuam"""
+        balancer = Balancer('ms-espacos', ['http://a'])
+        balancer.release(balancer.choose(), True)
+        balancer.update(['http://a', 'http://b'])
+        assert [endpoint['requests'] for endpoint in balancer.stats()['endpoints']] == [1, 0]
+
+    def test_empty_update_keeps_the_current_list(self):
+        """Uma lista vazia não deixa o serviço sem réplicas"""
+        balancer = Balancer('ms-espacos', ['http://a'])
+        balancer.update([' ', ''])
+        assert balancer.urls() == ['http://a']
+
+
+class TestEndpointSource:
+    """Testes da configuração e recarga da lista de réplicas"""
+
+    def test_env_overrides_defaults(self):
+        """UPSTREAM_ENDPOINTS sobrescreve SERVICES só para serviços conhecidos"""
+        assert parse_endpoints('ms-reservas=http://r1:5003, http://r2:5003/;x=http://y') == {
+            'ms-reservas': ['http://r1:5003', 'http://r2:5003'], 'x': ['http://y']}
+        source = EndpointSource({'ms-reservas': 'http://ms-reservas:5003'},
+                                env='ms-reservas=http://r1:5003,http://r2:5003;x=http://y', path='')
+        assert source.current == {'ms-reservas': ['http://r1:5003', 'http://r2:5003']}
+
+    def test_empty_lists_keep_the_default(self, tmp_path):
+        """Serviço sem URLs na variável ou só com entradas em branco no arquivo fica com o padrão"""
+        path = tmp_path / 'endpoints.json'
+        path.write_text(json.dumps({'ms-reservas': [' ', ''], 'ms-usuarios': ['http://u2:5001']}))
+        source = EndpointSource({'ms-reservas': 'http://ms-reservas:5003', 'ms-usuarios': 'http://u:5001'},
+                                env='ms-reservas=;ms-usuarios= , ', path=str(path))
+        assert source.current == {'ms-reservas': ['http://ms-reservas:5003'], 'ms-usuarios': ['http://u2:5001']}
+
+    def test_choose_failure_releases_every_slot(self):
+        """Erro ao escolher a réplica devolve bulkhead, breaker e conexão"""
+        pool = ServicePool('ms-reservas', ['http://a'], pool_size=1)
+        pool.balancer.choose = Mock(side_effect=RuntimeError('no endpoints'))
+        for _ in range(3):
+            try:
+                pool.request('GET', '/reservations/1')
+            except RuntimeError:
+                pass
+
+        stats = pool.stats()
+        assert (stats['in_use'], stats['bulkhead']['in_flight'], stats['breaker']['window_failures']) == (0, 0, 0)
+
+    def test_file_is_reloaded_when_changed(self, tmp_path):
+        """Mudanças no arquivo chegam aos pools sem reiniciar o gateway"""
+        path = tmp_path / 'endpoints.json'
+        path.write_text(json.dumps({'ms-reservas': ['http://r1:5003']}))
+        clock = FakeClock()
+        source = EndpointSource({'ms-reservas': 'http://ms-reservas:5003', 'ms-usuarios': 'http://u:5001'},
+                                env='', path=str(path), interval=5, clock=clock)
+        client = UpstreamClient(source.current, source=source)
+        assert client.pools['ms-reservas'].balancer.urls() == ['http://r1:5003']
+
+        path.write_text(json.dumps({'ms-reservas': ['http://r1:5003', 'http://r2:5003']}))
+        os.utime(path, (clock.now, os.stat(path).st_mtime + 10))
+        client.refresh_endpoints()
+        assert client.pools['ms-reservas'].balancer.urls() == ['http://r1:5003']
+
+        clock.now += 6
+        client.refresh_endpoints()
+        assert client.pools['ms-reservas'].balancer.urls() == ['http://r1:5003', 'http://r2:5003']
+        assert client.pools['ms-usuarios'].balancer.urls() == ['http://u:5001']
+
+        # Arquivo inválido mantém a lista atual
+        path.write_text('{')
+        os.utime(path, (clock.now, os.stat(path).st_mtime + 20))
+        clock.now += 6
+        client.refresh_endpoints()
+        assert client.pools['ms-reservas'].balancer.urls() == ['http://r1:5003', 'http://r2:5003']
+        assert source.stats()['errors'] == 1
+
+    def test_pool_routes_around_dead_replica(self):
+        """Réplica fora do ar é ejetada e as chamadas seguintes vão para a saudável"""
+        pool = ServicePool('ms-reservas', ['http://dead', 'http://alive'],
+                           balancer=Balancer('ms-reservas', ['http://dead', 'http://alive'], eject_failures=2))
+        urls = []
+
+        def send(method, url, **kwargs):
+            urls.append(url)
+            if url.startswith('http://dead'):
+                raise requests.exceptions.ConnectionError('refused')
+            return Mock(status_code=200)
+
+        pool.session.request = Mock(side_effect=send)
+        for _ in range(30):
+            try:
+                pool.request('GET', '/reservations/1')
+            except requests.exceptions.ConnectionError:
+                pass
+
+        assert sum(url.startswith('http://dead') for url in urls) == 2
+        assert pool.stats()['balancer']['endpoints'][0]['ejected']
+        assert pool.in_use == 0
@@ -0,0 +1,125 @@
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+import jwt
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'api-gateway'))
+
+import app as gateway  # noqa: E402
+from batch import BatchItemError, parse_items, resolve, run_bounded  # noqa: E402
+
+
+def auth_headers(role='user'):
+    token = jwt.encode({
+        'user_id': 7,
+        'role': role,
+        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    }, 'secret-key')
+    return {'Authorization': f'Bearer {token}'}
+
+
+class TestBatchRouting:
+    """Testes da resolução de rotas dos sub-requests"""
+
+    def test_routes_to_service(self):
+        """Caminhos do gateway são mapeados para o microsserviço certo"""
+        assert resolve('POST', '/pricing/calc', None) == 'ms-precos'
+        assert resolve('GET', '/reservations/user/7', {'role': 'user'}) == 'ms-reservas'
+        assert resolve('GET', '/spaces?capacity=10', None) == 'ms-espacos'
+
+    @pytest.mark.parametrize('method,path,claims,status', [
+        ('GET', '/reservations/1', None, 401),
+        ('GET', '/admin/users', {'role': 'user'}, 403),
+        ('GET', '/reservations?from=2026-05-04T00:00&to=2026-05-05T00:00', {'role': 'user'}, 403),
+        ('DELETE', '/analytics/dashboard', {'role': 'user'}, 405),
+        ('GET', '/inexistente', None, 404),
+    ])
+    def test_access_rules(self, method, path, claims, status):
+        """Mesmas regras de acesso das rotas do gateway"""
+        with pytest.raises(BatchItemError) as error:
+            resolve(method, path, claims)
+        assert error.value.status == status
+
+    def test_batch_size_is_limited(self):
+        """Lote acima do máximo é recusado com 413"""
+        with pytest.raises(BatchItemError) as error:
+            parse_items([{'path': '/spaces'}] * 3, max_size=2)
+        assert error.value.status == 413
+
+    def test_run_bounded_keeps_order_and_limit(self):
+        """No máximo `limit` tarefas simultâneas, resultados na ordem dos pedidos"""
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def task(value):
+            with lock:
+                running.append(value)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.remove(value)
+            return value
+
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            results = run_bounded(executor, [lambda v=v: task(v) for v in range(9)], limit=3)
+
+        assert results == list(range(9))
+        assert max(peak) <= 3
+
+
+class TestGatewayBatch:
+    """Testes do endpoint POST /batch"""
+
+    def setup_method(self):
+        gateway.spaces_cache.invalidate()
+        self.client = gateway.app.test_client()
+
+    def test_dispatches_items_and_reports_per_item_status(self):
+        """Cada item tem seu status e corpo; token é verificado uma vez"""
+        def fake_request(service, method, path, **kwargs):
+            response = Mock()
+            response.status_code = 200
+            response.content = json.dumps({'service': service, 'path': path}).encode()
+            return response
+
+        requests_payload = [
+            {'method': 'POST', 'path': '/pricing/calc', 'body': {'space_id': 1}},
+            {'method': 'GET', 'path': '/reservations/3'},
+            {'method': 'GET', 'path': '/admin/reservations'},
+        ]
+        with patch.object(gateway, 'upstream') as upstream, \
+                patch.object(gateway, 'decode_token', wraps=gateway.decode_token) as decode:
+            upstream.request.side_effect = fake_request
+            response = self.client.post('/batch', json=requests_payload, headers=auth_headers())
+
+        assert response.status_code == 200
+        assert response.json == [
+            {'status': 200, 'body': {'service': 'ms-precos', 'path': '/pricing/calc'}},
+            {'status': 200, 'body': {'service': 'ms-reservas', 'path': '/reservations/3'}},
+            {'status': 403, 'body': {'error': 'Admin access required'}},
+        ]
+        assert decode.call_count == 1
+
+    def test_rejects_invalid_payload(self):
+        """Corpo que não é lista de requests recebe 400"""
+        response = self.client.post('/batch', json={'requests': []})
+        assert response.status_code == 400
+
+    def test_dot_segments_cannot_reach_admin_routes(self):
+        """Caminhos com '.', '..', '//' ou suas formas codificadas são recusados antes das regras de acesso"""
+        paths = ['/reservations/../admin/reservations', '/users/../admin/users', '/users/%2e%2e/admin/users',
+                 '/users/%2E%2E%2Fadmin/users', '/reservations/./1', '/reservations//1', '/users/..\\admin/users']
+        with patch.object(gateway, 'upstream') as upstream:
+            response = self.client.post('/batch', json=[{'method': 'GET', 'path': path} for path in paths],
+                                        headers=auth_headers())
+
+        assert response.json == [{'status': 400, 'body': {'error': 'Invalid path'}}] * len(paths)
+        upstream.request.assert_not_called()
@@ -0,0 +1,86 @@
+import datetime
+import json
+import os
+import sys
+import time
+from unittest.mock import Mock, patch
+
+import jwt
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'api-gateway'))
+
+import app as gateway  # noqa: E402
+
+
+def auth_headers(role='user'):
+    token = jwt.encode({
+        'user_id': 42,
+        'role': role,
+        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    }, 'secret-key')
+    return {'Authorization': f'Bearer {token}'}
+
+
+class SlowUpstream:
+    """Microsserviços falsos com 0,2 s de latência por chamada"""
+
+    def __init__(self, failing=()):
+        self.paths = []
+        self.failing = failing
+
+    def get(self, service, path, **kwargs):
+        self.paths.append(path)
+        time.sleep(0.2)
+        response = Mock()
+        response.status_code = 500 if path in self.failing else 200
+        response.content = b'[]' if path == '/spaces' else json.dumps({'path': path}).encode()
+        response.headers = {'Content-Type': 'application/json'}
+        return response
+
+
+class TestGatewayBff:
+    """Testes dos endpoints de composição (BFF) do gateway"""
+
+    def setup_method(self):
+        gateway.spaces_cache.invalidate()
+        self.client = gateway.app.test_client()
+
+    def test_admin_dashboard_calls_run_concurrently(self):
+        """Painel admin espera só pela dependência mais lenta"""
+        upstream = SlowUpstream()
+        with patch.object(gateway, 'upstream', upstream):
+            started = time.perf_counter()
+            response = self.client.get('/bff/admin-dashboard', headers=auth_headers('admin'))
+            elapsed = time.perf_counter() - started
+
+        assert response.status_code == 200
+        assert response.json == {
+            'analytics': {'path': '/analytics/dashboard'},
+            'spaces': [],
+            'revenue': {'path': '/financial/revenue'}
+        }
+        assert elapsed < 0.5
+
+    def test_reservations_uses_user_id_from_token(self):
+        """Reservas do usuário saem junto com /users/me, usando o user_id do token"""
+        upstream = SlowUpstream()
+        with patch.object(gateway, 'upstream', upstream):
+            response = self.client.get('/bff/reservations', headers=auth_headers())
+
+        assert response.status_code == 200
+        assert sorted(upstream.paths) == ['/reservations/user/42', '/users/me']
+
+    def test_failed_dependency_returns_502(self):
+        """Falha numa dependência é informada em errors com status 502"""
+        upstream = SlowUpstream(failing=('/financial/expenses',))
+        with patch.object(gateway, 'upstream', upstream):
+            response = self.client.get('/bff/financial', headers=auth_headers())
+
+        assert response.status_code == 502
+        assert response.json['errors'] == {'expenses': 500}
+        assert response.json['revenue'] == {'path': '/financial/revenue'}
+
+    def test_admin_dashboard_requires_admin(self):
+        """Usuário comum não acessa o painel admin composto"""
+        response = self.client.get('/bff/admin-dashboard', headers=auth_headers())
+        assert response.status_code == 403
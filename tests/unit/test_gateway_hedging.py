@@ -0,0 +1,142 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'api-gateway'))
+
+from hedging import Hedger, LatencyTracker, RetryBudget  # noqa: E402
+from upstream import UpstreamClient  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def slow_then_fast(slow=0.3):
+    """Primeira chamada demora `slow` segundos; as seguintes respondem na hora"""
+    calls = []
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        if first:
+            time.sleep(slow)
+        response = Mock(status_code=200)
+        response.attempt = 'primary' if first else 'hedge'
+        return response
+
+    return call, calls
+
+
+class TestRetryBudget:
+    """Testes do orçamento de retries"""
+
+    def test_retries_limited_to_ratio_of_requests(self):
+        """Retries ficam limitados à fração das requisições na janela"""
+        clock = FakeClock()
+        budget = RetryBudget(ratio=0.1, min_per_second=0, window=10, clock=clock)
+        assert not budget.try_spend()
+
+        for _ in range(20):
+            budget.record_request()
+        assert budget.try_spend()
+        assert budget.try_spend()
+        assert not budget.try_spend()
+
+        # Fora da janela, requisições e retries antigos deixam de contar
+        clock.now += 11
+        assert budget.stats()['window_requests'] == 0
+        assert budget.stats()['rejected'] == 2
+
+    def test_reserve_allows_retries_at_low_traffic(self):
+        """Reserva mínima por segundo permite retries com pouco tráfego"""
+        budget = RetryBudget(ratio=0, min_per_second=0.2, window=10, clock=FakeClock())
+        assert budget.try_spend() and budget.try_spend()
+        assert not budget.try_spend()
+
+
+class TestHedging:
+    """Testes das segundas tentativas de GETs idempotentes"""
+
+    def test_percentile_needs_enough_samples(self):
+        """Percentil só é usado depois de amostras suficientes"""
+        tracker = LatencyTracker(min_samples=10)
+        for value in range(9):
+            tracker.observe(value / 100)
+        assert tracker.percentile(95) is None
+        tracker.observe(0.5)
+        assert tracker.percentile(95) == 0.5
+        assert tracker.percentile(50) == 0.05
+
+    def test_hedge_wins_over_slow_primary(self):
+        """Tentativa extra responde antes e a primeira é fechada quando terminar"""
+        events = []
+        hedger = Hedger(budget=RetryBudget(min_per_second=10), default_delay=0.05,
+                        on_event=lambda service, event: events.append(event))
+        call, calls = slow_then_fast()
+
+        started = time.perf_counter()
+        response = hedger.run('ms-espacos', call)
+        elapsed = time.perf_counter() - started
+
+        assert response.attempt == 'hedge'
+        assert elapsed < 0.25
+        assert events == ['sent', 'won']
+        time.sleep(0.35)
+        assert len(calls) == 2
+        assert hedger.stats()['events'] == {'sent': 1, 'won': 1, 'budget_exhausted': 0}
+
+    def test_exhausted_budget_waits_for_primary(self):
+        """Sem orçamento, nenhuma tentativa extra sai e a resposta original é usada"""
+        hedger = Hedger(budget=RetryBudget(ratio=0, min_per_second=0), default_delay=0.02)
+        call, calls = slow_then_fast(slow=0.1)
+
+        response = hedger.run('ms-analytics', call)
+
+        assert response.attempt == 'primary'
+        assert len(calls) == 1
+        assert hedger.stats()['events']['budget_exhausted'] == 1
+
+    def test_async_hedge_cancels_loser(self):
+        """No runtime assíncrono a tentativa perdedora é cancelada"""
+        hedger = Hedger(budget=RetryBudget(min_per_second=10), default_delay=0.05)
+        cancelled = []
+
+        async def scenario():
+            calls = []
+
+            async def call():
+                calls.append(1)
+                try:
+                    await asyncio.sleep(0.5 if len(calls) == 1 else 0)
+                except asyncio.CancelledError:
+                    cancelled.append(True)
+                    raise
+                return 200, {}, b'hedge' if len(calls) > 1 else b'primary'
+
+            return await hedger.run_async('ms-espacos', call)
+
+        assert asyncio.run(scenario())[2] == b'hedge'
+        assert cancelled == [True]
+
+    def test_client_hedges_only_marked_gets(self):
+        """Só GETs marcados com hedge=True passam pelo hedger"""
+        hedger = Mock()
+        client = UpstreamClient({'ms-espacos': 'http://upstream'}, hedger=hedger)
+        client.pools['ms-espacos'].request = Mock()
+
+        client.get('ms-espacos', '/spaces', hedge=True)
+        client.post('ms-espacos', '/spaces', hedge=True)
+        client.get('ms-espacos', '/spaces')
+
+        assert hedger.run.call_count == 1
+        assert client.pools['ms-espacos'].request.call_count == 2
@@ -0,0 +1,185 @@
+import datetime
+import os
+import queue
+import sys
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import jwt
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'api-gateway'))
+
+import app as gateway  # noqa: E402
+import ratelimit  # noqa: E402
+from ratelimit import (LoadShedder, LocalBackend, RateLimiter, client_address, parse_group_limits,  # noqa: E402
+                       parse_limit)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def auth_headers(user_id):
+    token = jwt.encode({
+        'user_id': user_id,
+        'role': 'user',
+        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    }, 'secret-key')
+    return {'Authorization': f'Bearer {token}'}
+
+
+class TestTokenBucket:
+    """Testes dos baldes de tokens e dos limites por escopo"""
+
+    def test_parse_limits(self):
+        """Limites são lidos no formato taxa:rajada"""
+        assert parse_limit('5:10') == (5.0, 10.0)
+        assert parse_limit('5') == (5.0, 5.0)
+        assert parse_group_limits('bff=2:4, batch=1') == {'bff': (2.0, 4.0), 'batch': (1.0, 1.0)}
+
+    def test_limits_must_be_positive(self):
+        """Taxa zero ou balde menor que um token são recusados ao montar o limitador"""
+        for limits in (((0, 10), (1, 1), (1, 1), None), ((1, 1), (1, 0.5), (1, 1), None),
+                       ((1, 1), (1, 1), (1, 1), {'batch': (0, 1)})):
+            with pytest.raises(ValueError):
+                RateLimiter(*limits)
+
+    def test_sweep_is_amortized_and_bounded(self):
+        """Acima de max_keys a varredura roda no máximo uma vez por intervalo e limita o total de chaves"""
+        clock = FakeClock()
+        backend = LocalBackend(max_keys=10, sweep_interval=5, clock=clock)
+        for index in range(50):
+            backend.take(f'ip:{index}', 1, 1)
+        assert backend.sweeps == 0
+
+        clock.now += 5
+        for index in range(50, 60):
+            backend.take(f'ip:{index}', 1, 1)
+        assert backend.sweeps == 1
+        assert len(backend._buckets) <= 19
+        assert backend.take('ip:59', 1, 1) > 0
+
+    def test_bucket_refills_over_time(self):
+        """Balde vazio devolve a espera até o próximo token e reabastece com o tempo"""
+        clock = FakeClock()
+        backend = LocalBackend(clock=clock)
+
+        assert [backend.take('k', 2, 3) for _ in range(3)] == [0, 0, 0]
+        assert backend.take('k', 2, 3) == 0.5
+
+        clock.now += 0.5
+        assert backend.take('k', 2, 3) == 0
+
+    def test_user_limit_is_per_identity(self):
+        """Cada usuário tem seu próprio balde e a recusa informa o Retry-After"""
+        clock = FakeClock()
+        limiter = RateLimiter((1, 2), (100, 100), (100, 100), backend=LocalBackend(clock=clock))
+
+        assert limiter.check('id:1', 'spaces') == 0
+        assert limiter.check('id:1', 'spaces') == 0
+        assert limiter.check('id:1', 'spaces') == 1
+        assert limiter.check('id:2', 'spaces') == 0
+        assert limiter.stats()['limited'] == {'user': 1, 'group': 0, 'global': 0}
+
+    def test_group_override(self):
+        """Grupo de rotas com limite próprio é recusado antes do limite padrão"""
+        limiter = RateLimiter((100, 100), (100, 100), (100, 100), group_limits={'batch': (0.5, 1)},
+                              backend=LocalBackend(clock=FakeClock()))
+
+        assert limiter.check('id:1', 'batch') == 0
+        assert limiter.check('id:2', 'batch') == 2
+        assert limiter.check('id:2', 'spaces') == 0
+        assert limiter.stats()['limited']['group'] == 1
+
+
+class TestLoadShedding:
+    """Testes do descarte de carga e da integração com o gateway"""
+
+    def test_shedder_rejects_above_limit(self):
+        """Acima do limite de requisições em andamento, a entrada é recusada"""
+        shedder = LoadShedder(max_in_flight=2)
+
+        assert shedder.enter() and shedder.enter()
+        assert not shedder.enter()
+        shedder.leave()
+        assert shedder.enter()
+        assert shedder.stats() == {'max_in_flight': 2, 'in_flight': 2, 'queued': 0, 'shed': 1}
+
+    def test_worker_queue_counts_towards_the_limit(self):
+        """No gthread as requisições esperando uma thread do worker também contam"""
+        waiting = queue.Queue()
+        worker = SimpleNamespace(tpool=SimpleNamespace(_work_queue=waiting))
+        shedder = LoadShedder(max_in_flight=3)
+        with patch.object(gateway, 'shedder', shedder):
+            gateway.on_worker_init(worker)
+        gateway.on_worker_init(SimpleNamespace())
+
+        assert shedder.enter()
+        waiting.put('conn')
+        assert shedder.enter()
+        waiting.put('conn')
+        assert not shedder.enter()
+        assert shedder.stats() == {'max_in_flight': 3, 'in_flight': 2, 'queued': 2, 'shed': 1}
+
+    def test_client_address_from_trusted_proxies(self):
+        """O IP do cliente é o que o último proxy confiável acrescentou ao X-Forwarded-For"""
+        assert client_address('10.0.0.5', None, trusted=1) == '10.0.0.5'
+        assert client_address('10.0.0.5', '203.0.113.9', trusted=1) == '203.0.113.9'
+        assert client_address('10.0.0.5', '1.2.3.4, 203.0.113.9', trusted=1) == '203.0.113.9'
+        assert client_address('10.0.0.5', '1.2.3.4, 203.0.113.9, 10.0.0.7', trusted=2) == '203.0.113.9'
+        assert client_address('10.0.0.5', '203.0.113.9', trusted=2) == '10.0.0.5'
+        assert client_address('10.0.0.5', '203.0.113.9', trusted=0) == '10.0.0.5'
+        # Sem proxy configurado o cabeçalho vem do cliente e é ignorado
+        assert client_address('10.0.0.5', '203.0.113.9') == '10.0.0.5'
+
+    def test_anonymous_clients_behind_proxy_have_own_buckets(self):
+        """Sem token, clientes atrás do mesmo proxy não dividem o balde por IP"""
+        limiter = RateLimiter((1, 1), (100, 100), (100, 100), backend=LocalBackend(clock=FakeClock()))
+        client = gateway.app.test_client()
+        with patch.object(gateway, 'rate_limiter', limiter), patch.object(gateway, 'RATE_LIMIT_ENABLED', True), \
+                patch.object(ratelimit, 'TRUSTED_PROXIES', 1):
+            first = [client.get('/spaces', headers={'X-Forwarded-For': '203.0.113.9'}).status_code for _ in range(2)]
+            other = client.get('/spaces', headers={'X-Forwarded-For': '198.51.100.4'}).status_code
+
+        assert first[1] == 429
+        assert other != 429
+
+    def test_forged_forwarded_for_is_ignored_by_default(self):
+        """Acessado direto, trocar o X-Forwarded-For não dá um balde novo ao cliente"""
+        limiter = RateLimiter((1, 1), (100, 100), (100, 100), backend=LocalBackend(clock=FakeClock()))
+        client = gateway.app.test_client()
+        with patch.object(gateway, 'rate_limiter', limiter), patch.object(gateway, 'RATE_LIMIT_ENABLED', True):
+            statuses = [client.get('/spaces', headers={'X-Forwarded-For': f'203.0.113.{index}'}).status_code
+                        for index in range(3)]
+
+        assert statuses[1:] == [429, 429]
+
+    def test_gateway_returns_429_with_retry_after(self):
+        """Usuário acima do limite recebe 429 antes de o gateway chamar o microsserviço"""
+        limiter = RateLimiter((1, 1), (100, 100), (100, 100), backend=LocalBackend(clock=FakeClock()))
+        client = gateway.app.test_client()
+        with patch.object(gateway, 'rate_limiter', limiter), patch.object(gateway, 'RATE_LIMIT_ENABLED', True):
+            client.get('/analytics/dashboard', headers=auth_headers(7))
+            response = client.get('/analytics/dashboard', headers=auth_headers(7))
+
+        assert response.status_code == 429
+        assert response.json == {'error': 'Too many requests'}
+        assert response.headers['Retry-After'] == '1'
+
+    def test_gateway_sheds_when_full(self):
+        """Gateway cheio responde 503 imediatamente e libera a vaga ao fim de cada requisição"""
+        client = gateway.app.test_client()
+        full = LoadShedder(max_in_flight=0)
+        with patch.object(gateway, 'shedder', full):
+            response = client.get('/spaces')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+
+        before = gateway.shedder.stats()['in_flight']
+        client.get('/users/me')
+        assert gateway.shedder.stats()['in_flight'] == before
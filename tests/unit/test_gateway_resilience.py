@@ -0,0 +1,176 @@
+import datetime
+import os
+import sys
+from unittest.mock import patch
+
+import jwt
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'api-gateway'))
+
+import app as gateway  # noqa: E402
+from resilience import Bulkhead, BulkheadFull, CircuitBreaker, CircuitOpen  # noqa: E402
+from upstream import PoolExhausted, ServicePool, UpstreamClient  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_breaker(clock, **options):
+    defaults = dict(window=10, min_requests=4, failure_rate=0.5, slow_call_seconds=1,
+                    slow_call_rate=0.8, open_seconds=5, half_open_calls=2, clock=clock)
+    defaults.update(options)
+    return CircuitBreaker('ms-pagamentos', **defaults)
+
+
+class TestCircuitBreaker:
+    """Testes do circuit breaker por microsserviço"""
+
+    def test_opens_after_failure_rate(self):
+        """Taxa de erro acima do limite abre o circuito"""
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+        for success in (True, False, True, False):
+            breaker.before_call()
+            breaker.record(success, 0.01)
+
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpen) as error:
+            breaker.before_call()
+        assert error.value.retry_after == pytest.approx(5)
+
+    def test_opens_on_slow_calls(self):
+        """Chamadas lentas também abrem o circuito"""
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+        for _ in range(4):
+            breaker.before_call()
+            breaker.record(True, 3)
+
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_old_failures_leave_the_window(self):
+        """Falhas fora da janela deslizante não contam"""
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+        for _ in range(3):
+            breaker.record(False, 0.01)
+        clock.now += 20
+        breaker.record(False, 0.01)
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_closes_after_trial_successes(self):
+        """Após o tempo aberto, chamadas de teste bem-sucedidas fecham o circuito"""
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+        for _ in range(4):
+            breaker.record(False, 0.01)
+        clock.now += 6
+
+        breaker.before_call()
+        breaker.before_call()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpen):
+            breaker.before_call()
+
+        breaker.record(True, 0.01)
+        breaker.record(True, 0.01)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_failure_reopens(self):
+        """Falha numa chamada de teste reabre o circuito"""
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+        for _ in range(4):
+            breaker.record(False, 0.01)
+        clock.now += 6
+
+        breaker.before_call()
+        breaker.record(False, 0.01)
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.stats()['times_opened'] == 2
+
+    def test_cancelled_trial_frees_its_slot(self):
+        """Chamada de teste que desiste antes de sair não conta como sucesso nem como falha"""
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+        for _ in range(4):
+            breaker.record(False, 0.01)
+        clock.now += 6
+
+        breaker.before_call()
+        breaker.before_call()
+        breaker.cancel()
+        breaker.before_call()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.stats()['times_opened'] == 1
+
+
+class TestBulkhead:
+    """Testes do limite de chamadas simultâneas"""
+
+    def test_rejects_when_full(self):
+        """Bulkhead cheio recusa na hora"""
+        bulkhead = Bulkhead('ms-pagamentos', max_concurrent=1)
+        bulkhead.acquire()
+        with pytest.raises(BulkheadFull):
+            bulkhead.acquire()
+        bulkhead.release()
+        bulkhead.acquire()
+        assert bulkhead.stats()['rejected'] == 1
+
+    def test_default_never_exceeds_the_pool(self):
+        """O bulkhead padrão recusa antes de a chamada ter que esperar por conexão"""
+        assert ServicePool('ms-pagamentos', 'http://127.0.0.1:1', pool_size=4).bulkhead.max_concurrent == 4
+
+    def test_pool_wait_is_not_a_breaker_failure(self):
+        """Sem conexão livre a chamada é recusada com Retry-After e o breaker não registra falha"""
+        pool = ServicePool('ms-pagamentos', 'http://127.0.0.1:1', pool_size=1, connect_timeout=0.01,
+                           bulkhead=Bulkhead('ms-pagamentos', max_concurrent=5))
+        pool.acquire()
+        try:
+            for _ in range(3):
+                with pytest.raises(PoolExhausted):
+                    pool.request('GET', '/payments')
+        finally:
+            pool.release()
+
+        stats = pool.stats()
+        assert stats['breaker']['window_failures'] == 0
+        assert stats['bulkhead']['in_flight'] == 0
+        with gateway.app.app_context():
+            assert gateway.service_unavailable(PoolExhausted('No free connection')).headers['Retry-After'] == '1'
+
+
+class TestGatewayFastFail:
+    """Testes da resposta rápida do gateway com o circuito aberto"""
+
+    def test_open_circuit_returns_503_with_retry_after(self):
+        """Circuito aberto responde 503 com Retry-After sem chamar o microsserviço"""
+        token = jwt.encode({
+            'user_id': 1,
+            'role': 'user',
+            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        }, 'secret-key')
+        client = UpstreamClient({'ms-pagamentos': 'http://127.0.0.1:1'})
+        breaker = client.pools['ms-pagamentos'].breaker
+        breaker.min_requests = 1
+        breaker.open_seconds = 30
+
+        with patch.object(gateway, 'upstream', client):
+            test_client = gateway.app.test_client()
+            headers = {'Authorization': f'Bearer {token}'}
+            first = test_client.post('/payments/charge', json={}, headers=headers)
+            second = test_client.post('/payments/charge', json={}, headers=headers)
+
+        assert first.status_code == 503
+        assert 'Retry-After' not in first.headers
+        assert second.status_code == 503
+        assert second.headers['Retry-After'] == '30'
+        assert client.stats()['ms-pagamentos']['breaker']['rejected'] == 1
@@ -0,0 +1,144 @@
+import datetime
+import gzip
+import json
+import os
+import sys
+from unittest.mock import Mock, patch
+
+import jwt
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'api-gateway'))
+
+import app as gateway  # noqa: E402
+import shared.compression as compression  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+
+
+def upstream_response(status_code=200, content=b'[{"id": 1, "name": "Sala 1"}]'):
+    response = Mock()
+    response.status_code = status_code
+    response.content = content
+    response.headers = {'Content-Type': 'application/json'}
+    response.raw.stream.side_effect = lambda *args, **kwargs: iter([content])
+    return response
+
+
+def admin_headers():
+    payload = {
+        'user_id': 1,
+        'role': 'admin',
+        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    }
+    return {'Authorization': f"Bearer {jwt.encode(payload, 'secret-key')}"}
+
+
+class TestResponseCache:
+    """Testes do cache de respostas do catálogo de espaços"""
+
+    def test_entry_expires_after_ttl(self):
+        """Entrada com TTL zero nunca é servida"""
+        cache = ResponseCache(ttl=0)
+        cache.put('/spaces?', b'[]')
+        assert cache.get('/spaces?') is None
+
+    def test_same_body_same_etag(self):
+        """ETag forte depende apenas do corpo"""
+        cache = ResponseCache()
+        assert cache.put('/a', b'[1]').etag == cache.put('/b', b'[1]').etag
+        assert cache.put('/a', b'[1]').etag != cache.put('/a', b'[2]').etag
+
+    def test_put_after_invalidation_is_not_stored(self):
+        """Corpo buscado antes de uma invalidação volta para quem pediu, mas não entra no cache"""
+        cache = ResponseCache()
+        generation = cache.generation
+        cache.invalidate()
+        assert cache.put('/spaces?', b'[1]', generation=generation).body == b'[1]'
+        assert cache.get('/spaces?') is None
+        assert cache.stats()['stale_puts'] == 1
+
+        cache.put('/spaces?', b'[2]', generation=cache.generation)
+        assert cache.get('/spaces?').body == b'[2]'
+
+
+class TestGatewaySpacesCache:
+    """Testes do cache de GET /spaces no gateway"""
+
+    def setup_method(self):
+        gateway.spaces_cache.invalidate()
+        self.client = gateway.app.test_client()
+
+    def test_repeated_reads_hit_the_cache(self):
+        """Leituras repetidas não saem do gateway"""
+        with patch.object(gateway, 'upstream') as upstream:
+            upstream.get.return_value = upstream_response()
+            first = self.client.get('/spaces')
+            second = self.client.get('/spaces')
+
+        assert upstream.get.call_count == 1
+        assert first.status_code == second.status_code == 200
+        assert first.data == second.data
+        assert first.headers['ETag'] == second.headers['ETag']
+
+    def test_if_none_match_returns_304(self):
+        """Cliente com o ETag atual recebe 304 sem corpo"""
+        with patch.object(gateway, 'upstream') as upstream:
+            upstream.get.return_value = upstream_response()
+            etag = self.client.get('/spaces/1').headers['ETag']
+            response = self.client.get('/spaces/1', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_catalogue_is_compressed_once_per_entry(self):
+        """Catálogo grande sai comprimido; a versão gzip é gerada uma vez e reaproveitada"""
+        body = json.dumps([{'id': index, 'name': f'Sala {index}'} for index in range(200)]).encode()
+        headers = {'Accept-Encoding': 'gzip'}
+        with patch.object(gateway, 'upstream') as upstream, \
+                patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            upstream.get.return_value = upstream_response(content=body)
+            first = self.client.get('/spaces', headers=headers)
+            second = self.client.get('/spaces', headers=headers)
+            revalidated = self.client.get('/spaces', headers=dict(headers, **{'If-None-Match': first.headers['ETag']}))
+
+        assert compress.call_count == 1
+        assert first.headers['Content-Encoding'] == 'gzip'
+        assert first.headers['ETag'].startswith('W/')
+        assert 'Accept-Encoding' in first.headers['Vary']
+        assert gzip.decompress(second.data) == body
+        assert revalidated.status_code == 304
+
+    def test_write_invalidates_cache(self):
+        """POST em /spaces invalida o catálogo em cache"""
+        with patch.object(gateway, 'upstream') as upstream:
+            upstream.get.return_value = upstream_response()
+            upstream.post.return_value = upstream_response(201)
+            self.client.get('/spaces')
+            self.client.post('/spaces', json={'name': 'Nova sala'}, headers=admin_headers())
+            self.client.get('/spaces')
+
+        assert upstream.get.call_count == 2
+
+    def test_write_during_fetch_is_not_undone(self):
+        """Uma escrita que termina enquanto o catálogo é buscado não deixa o corpo antigo no cache"""
+        def fetch_while_writing(*args, **kwargs):
+            # O que o POST /spaces de outra thread faz ao terminar
+            gateway.spaces_cache.invalidate()
+            return upstream_response()
+
+        with patch.object(gateway, 'upstream') as upstream:
+            upstream.get.side_effect = fetch_while_writing
+            assert self.client.get('/spaces').status_code == 200
+            upstream.get.side_effect = None
+            upstream.get.return_value = upstream_response()
+            self.client.get('/spaces')
+
+        assert upstream.get.call_count == 2
+
+    def test_errors_are_not_cached(self):
+        """Respostas de erro do ms-espacos não entram no cache"""
+        with patch.object(gateway, 'upstream') as upstream:
+            upstream.get.return_value = upstream_response(404)
+            self.client.get('/spaces/99')
+            self.client.get('/spaces/99')
+
+        assert upstream.get.call_count == 2
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'api-gateway'))
+
+from singleflight import AsyncSingleFlight, SingleFlight  # noqa: E402
+
+
+class TestSingleFlight:
+    """Testes do agrupamento de GETs idênticos simultâneos"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Chamadas simultâneas com a mesma chave executam a função uma vez"""
+        group = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            release.wait(2)
+            return 'catalogo'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(group.do('spaces', fetch))) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        while group.stats()['coalesced'] < 9:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ['catalogo'] * 10
+        assert group.stats() == {'in_flight': 0, 'leaders': 1, 'coalesced': 9}
+
+    def test_error_is_shared_and_not_cached(self):
+        """Erro do líder chega a todos e a próxima chamada executa de novo"""
+        group = SingleFlight()
+
+        def failing():
+            raise ConnectionError('ms-analytics fora do ar')
+
+        with pytest.raises(ConnectionError):
+            group.do('dashboard', failing)
+        assert group.do('dashboard', lambda: 'ok') == 'ok'
+
+    def test_async_calls_share_one_execution(self):
+        """Versão asyncio também executa uma única vez por chave"""
+        group = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'receita'
+
+        async def scenario():
+            return await asyncio.gather(*(group.do('revenue', fetch) for _ in range(5)))
+
+        assert asyncio.run(scenario()) == ['receita'] * 5
+        assert len(calls) == 1
+
+    def test_cancelled_leader_does_not_fail_followers(self):
+        """Cancelar quem abriu a chamada (cliente desconectou) não derruba os demais na mesma chave"""
+        group = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'receita'
+
+        async def scenario():
+            leader = asyncio.ensure_future(group.do('revenue', fetch))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(group.do('revenue', fetch))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            result = await follower
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return result
+
+        assert asyncio.run(scenario()) == 'receita'
+        assert len(calls) == 1
+        assert group.stats()['in_flight'] == 0
+
+    def test_call_is_cancelled_when_nobody_waits(self):
+        """Sem ninguém esperando a chamada compartilhada é cancelada e a chave liberada"""
+        group = AsyncSingleFlight()
+        cancelled = []
+
+        async def fetch():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+
+        async def scenario():
+            waiter = asyncio.ensure_future(group.do('revenue', fetch))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            await asyncio.sleep(0)
+
+        asyncio.run(scenario())
+        assert cancelled == [1]
+        assert group.stats()['in_flight'] == 0
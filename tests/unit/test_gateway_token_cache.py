@@ -0,0 +1,79 @@
+import datetime
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import jwt
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'api-gateway'))
+
+import app as gateway  # noqa: E402
+from token_cache import TokenCache  # noqa: E402
+
+
+def make_token(role='user', expires_in=3600):
+    payload = {
+        'user_id': 1,
+        'role': role,
+        'exp': datetime.datetime.utcnow() + datetime.timedelta(seconds=expires_in)
+    }
+    return jwt.encode(payload, 'secret-key')
+
+
+class TestTokenCache:
+    """Testes do cache de tokens JWT verificados"""
+
+    def test_hit_and_miss_counters(self):
+        """Segunda consulta do mesmo token é um hit"""
+        cache = TokenCache()
+        assert cache.get('abc') is None
+        cache.put('abc', {'user_id': 1})
+        assert cache.get('abc') == {'user_id': 1}
+
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+
+    def test_entry_honours_token_exp(self):
+        """Entrada expira junto com o exp do token, mesmo com TTL maior"""
+        cache = TokenCache(ttl=3600)
+        cache.put('abc', {'user_id': 1, 'exp': time.time() - 1})
+        assert cache.get('abc') is None
+
+    def test_lru_eviction(self):
+        """Cache cheio descarta o token usado há mais tempo"""
+        cache = TokenCache(max_entries=2)
+        cache.put('a', {'user_id': 1})
+        cache.put('b', {'user_id': 2})
+        cache.get('a')
+        cache.put('c', {'user_id': 3})
+
+        assert cache.get('b') is None
+        assert cache.get('a') == {'user_id': 1}
+        assert cache.get('c') == {'user_id': 3}
+
+
+class TestGatewayTokenVerification:
+    """Testes da verificação de token no gateway Flask"""
+
+    def setup_method(self):
+        gateway.token_cache.clear()
+
+    def test_admin_route_decodes_token_once(self):
+        """Rota admin verifica o token uma única vez por requisição e reusa entre requisições"""
+        client = gateway.app.test_client()
+        headers = {'Authorization': f'Bearer {make_token("user")}'}
+
+        with patch.object(jwt, 'decode', wraps=jwt.decode) as decode:
+            for _ in range(3):
+                response = client.get('/admin/users', headers=headers)
+                assert response.status_code == 403
+        assert decode.call_count == 1
+
+    def test_invalid_token_is_rejected(self):
+        """Token inválido continua retornando 401"""
+        client = gateway.app.test_client()
+        response = client.get('/admin/users', headers={'Authorization': 'Bearer invalido'})
+        assert response.status_code == 401
+        assert gateway.token_cache.stats()['size'] == 0
@@ -0,0 +1,185 @@
+import datetime
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import jwt
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'api-gateway'))
+
+import app as gateway  # noqa: E402
+from upstream import PoolExhausted, ServicePool, UpstreamClient  # noqa: E402
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.client_ports.add(self.client_address[1])
+        if self.path.startswith('/financial/'):
+            body = b'upstream error page'
+            self.send_response(502)
+            self.send_header('Content-Type', 'text/plain')
+        else:
+            body = json.dumps({'path': self.path}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def echo_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _EchoHandler)
+    server.client_ports = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestUpstreamClient:
+    """Testes do cliente upstream com pool keep-alive do gateway"""
+
+    def test_reuses_connection_between_calls(self, echo_server):
+        """Chamadas sequenciais reaproveitam a mesma conexão TCP"""
+        url = f'http://127.0.0.1:{echo_server.server_address[1]}'
+        client = UpstreamClient({'ms-espacos': url}, pool_size=2)
+
+        for _ in range(5):
+            response = client.get('ms-espacos', '/spaces')
+            assert response.json() == {'path': '/spaces'}
+
+        assert len(echo_server.client_ports) == 1
+        stats = client.stats()['ms-espacos']
+        assert stats['requests'] == 5
+        assert stats['in_use'] == 0
+        assert stats['idle'] == 1
+
+    def test_idle_pool_is_reset_after_max_idle(self, echo_server):
+        """Pool parado além do max_idle descarta as conexões antigas"""
+        url = f'http://127.0.0.1:{echo_server.server_address[1]}'
+        pool = ServicePool('ms-espacos', url, max_idle=0)
+
+        pool.request('GET', '/spaces')
+        pool.request('GET', '/spaces')
+
+        assert pool.stats()['idle_resets'] >= 1
+        assert len(echo_server.client_ports) == 2
+
+    def test_streamed_response_holds_slot_until_closed(self, echo_server):
+        """Resposta em streaming ocupa a vaga até ser fechada e depois devolve a conexão"""
+        url = f'http://127.0.0.1:{echo_server.server_address[1]}'
+        pool = ServicePool('ms-espacos', url)
+
+        response = pool.request('GET', '/spaces', stream=True)
+        assert pool.stats()['in_use'] == 1
+        assert b''.join(response.raw.stream(1024, decode_content=False)) == b'{"path": "/spaces"}'
+        response.close()
+        response.close()
+
+        assert pool.stats()['in_use'] == 0
+        pool.request('GET', '/spaces')
+        assert len(echo_server.client_ports) == 1
+
+    def test_waits_are_counted_and_bounded(self):
+        """Pool cheio conta esperas e falha após o timeout de conexão"""
+        pool = ServicePool('ms-espacos', 'http://127.0.0.1:1', pool_size=1, connect_timeout=0.05)
+        pool.acquire()
+        try:
+            with pytest.raises(PoolExhausted):
+                pool.acquire()
+        finally:
+            pool.release()
+
+        stats = pool.stats()
+        assert stats['waits'] == 1
+        assert stats['in_use'] == 0
+
+
+class TestGatewayPassthrough:
+    """Testes do repasse em streaming do gateway"""
+
+    def test_error_body_passes_through_unchanged(self, echo_server):
+        """Corpo não JSON de erro chega ao cliente byte a byte, com status e Content-Type"""
+        url = f'http://127.0.0.1:{echo_server.server_address[1]}'
+        token = jwt.encode({
+            'user_id': 1,
+            'role': 'user',
+            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        }, 'secret-key')
+
+        with patch.object(gateway, 'upstream', UpstreamClient({'ms-financeiro': url})):
+            response = gateway.app.test_client().get(
+                '/financial/revenue', headers={'Authorization': f'Bearer {token}'}
+            )
+            assert response.status_code == 502
+            assert response.data == b'upstream error page'
+            assert response.headers['Content-Type'] == 'text/plain'
+            assert gateway.upstream.stats()['ms-financeiro']['in_use'] == 0
+
+    def test_admin_reservations_forwards_filters(self, echo_server):
+        """Filtros e cursor da listagem do admin chegam ao ms-reservas"""
+        url = f'http://127.0.0.1:{echo_server.server_address[1]}'
+        token = jwt.encode({
+            'user_id': 1,
+            'role': 'admin',
+            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        }, 'secret-key')
+
+        with patch.object(gateway, 'upstream', UpstreamClient({'ms-reservas': url})):
+            response = gateway.app.test_client().get(
+                '/admin/reservations?status=active&cursor=5&format=ndjson',
+                headers={'Authorization': f'Bearer {token}'}
+            )
+            assert response.json == {'path': '/admin/reservations?status=active&cursor=5&format=ndjson'}
+
+    def test_head_releases_the_upstream_slot(self, echo_server):
+        """HEAD não consome o corpo, mas a vaga do pool e o bulkhead voltam mesmo assim"""
+        url = f'http://127.0.0.1:{echo_server.server_address[1]}'
+        token = jwt.encode({
+            'user_id': 1,
+            'role': 'admin',
+            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        }, 'secret-key')
+        headers = {'Authorization': f'Bearer {token}'}
+
+        with patch.object(gateway, 'upstream', UpstreamClient({'ms-usuarios': url}, pool_size=2)):
+            client = gateway.app.test_client()
+            for _ in range(5):
+                response = client.head('/admin/users', headers=headers)
+                # Como um servidor WSGI: a resposta é fechada sem que o corpo seja lido
+                response.close()
+                assert response.status_code == 200
+            stats = gateway.upstream.stats()['ms-usuarios']
+            assert stats['in_use'] == 0
+            assert stats['bulkhead']['in_flight'] == 0
+            assert client.get('/admin/users', headers=headers).status_code == 200
+
+    def test_period_query_requires_admin(self, echo_server):
+        """GET /reservations traz reservas de todos os usuários: 403 para usuário comum, repassado para o admin"""
+        url = f'http://127.0.0.1:{echo_server.server_address[1]}'
+        query = '/reservations?from=2026-05-04T00%3A00&to=2026-05-05T00%3A00'
+
+        def headers(role):
+            token = jwt.encode({
+                'user_id': 1,
+                'role': role,
+                'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+            }, 'secret-key')
+            return {'Authorization': f'Bearer {token}'}
+
+        with patch.object(gateway, 'upstream', UpstreamClient({'ms-reservas': url})):
+            client = gateway.app.test_client()
+            assert client.get(query, headers=headers('user')).status_code == 403
+            assert client.get('/reservations/user/1', headers=headers('user')).status_code == 200
+            assert client.get(query, headers=headers('admin')).json == {'path': query}
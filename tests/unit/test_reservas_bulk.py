@@ -0,0 +1,122 @@
+import pytest
+
+from tests.unit.test_reservas_intervals import booking, load_service
+
+from journal import Journal
+from recurrence import expand
+from store import ReservationStore
+
+
+class TestRecurrence:
+    """Testes da expansão das regras de recorrência"""
+
+    def test_weekdays_until_date(self):
+        """Dias úteis até uma data, que entra inteira; a duração de cada ocorrência é a da primeira"""
+        periods = expand('2026-05-07T09:00:00', '2026-05-07T10:30:00',
+                         {'frequency': 'daily', 'weekdays': [0, 1, 2, 3, 4], 'until': '2026-05-12'}, 100)
+        assert periods == [('2026-05-07T09:00:00', '2026-05-07T10:30:00'), ('2026-05-08T09:00:00', '2026-05-08T10:30:00'),
+                           ('2026-05-11T09:00:00', '2026-05-11T10:30:00'), ('2026-05-12T09:00:00', '2026-05-12T10:30:00')]
+
+    def test_weekly_interval_and_count(self):
+        """A cada duas semanas, segunda e quarta, a partir de uma quarta"""
+        periods = expand('2026-05-06T09:00:00+00:00', '2026-05-06T10:00:00+00:00',
+                         {'frequency': 'weekly', 'interval': 2, 'weekdays': [0, 2], 'count': 4}, 100)
+        assert [start[:10] for start, _ in periods] == ['2026-05-06', '2026-05-18', '2026-05-20', '2026-06-01']
+        assert expand('2026-05-06T09:00', '2026-05-06T10:00', {'frequency': 'weekly', 'count': 2}, 100)[1][0] == \
+            '2026-05-13T09:00:00'
+
+    def test_invalid_rules(self):
+        """Regras inválidas, sem ocorrências ou com ocorrências demais são recusadas"""
+        start, end = '2026-05-04T09:00', '2026-05-04T10:00'
+        for rule in ({'frequency': 'monthly', 'count': 2}, {'frequency': 'daily'},
+                     {'frequency': 'daily', 'count': 0}, {'frequency': 'daily', 'interval': 0, 'count': 2},
+                     {'frequency': 'daily', 'weekdays': [7], 'count': 2}, {'frequency': 'daily', 'until': 'ontem'},
+                     {'frequency': 'daily', 'weekdays': 3, 'count': 2}, {'frequency': 'daily', 'weekdays': 'mon', 'count': 2},
+                     {'frequency': 'daily', 'weekdays': [True], 'count': 2},
+                     {'frequency': 'daily', 'until': '2026-05-01'},
+                     {'frequency': 'daily', 'interval': 7, 'weekdays': [1], 'count': 2}):
+            with pytest.raises(ValueError):
+                expand(start, end, rule, 100)
+        with pytest.raises(ValueError, match='more than 10'):
+            expand(start, end, {'frequency': 'daily', 'count': 11}, 10)
+
+    def test_rules_are_bounded_by_the_horizon(self):
+        """Regras que continuam além do horizonte são recusadas sem percorrer o calendário até lá"""
+        start, end = '2026-05-04T09:00', '2026-05-04T10:00'
+        assert len(expand(start, end, {'frequency': 'daily', 'until': '2026-05-14'}, 100, max_days=10)) == 11
+        for rule in ({'frequency': 'daily', 'until': '2026-05-15'},
+                     {'frequency': 'weekly', 'interval': 2, 'count': 2},
+                     {'frequency': 'daily', 'interval': 100000, 'until': '9999-12-31'}):
+            with pytest.raises(ValueError, match='more than 10 days'):
+                expand(start, end, rule, 100, max_days=10)
+        with pytest.raises(ValueError, match='last supported date'):
+            expand('9999-12-30T23:00', '9999-12-30T23:30', {'frequency': 'daily', 'count': 3}, 100)
+
+
+class TestBulkReservations:
+    """Testes do POST /reservations/bulk"""
+
+    def setup_method(self):
+        self.client = load_service().app.test_client()
+
+    def test_list_is_created_in_order(self):
+        """Os ids voltam na ordem do pedido, com a soma dos preços"""
+        response = self.client.post('/reservations/bulk', json={'reservations': [
+            booking(space_id=1), booking(space_id=2), booking(space_id=1, start='2026-05-04T11:00:00',
+                                                               end='2026-05-04T12:00:00')]})
+        assert response.status_code == 201
+        assert response.get_json() == {'ids': [1, 2, 3], 'count': 3, 'total_price': 300.0}
+        assert self.client.get('/reservations/3').get_json()['space_id'] == 1
+
+    def test_conflicts_reject_the_whole_batch(self):
+        """Conflito com reserva existente ou entre itens do lote: 409 e nada é criado"""
+        self.client.post('/reservations', json=booking(space_id=1))
+        response = self.client.post('/reservations/bulk', json={'reservations': [
+            booking(space_id=2), booking(space_id=1, start='2026-05-04T10:00:00', end='2026-05-04T12:00:00'),
+            booking(space_id=2, start='2026-05-04T10:00:00', end='2026-05-04T12:00:00')]})
+        assert response.status_code == 409
+        assert response.get_json()['conflicts'] == [{'index': 1, 'conflict_id': 1}, {'index': 2, 'conflict_index': 0}]
+        assert self.client.get('/reservations/2').status_code == 404
+        assert self.client.post('/reservations', json=booking(space_id=2)).get_json()['id'] == 2
+
+    def test_recurrence_is_expanded(self):
+        """Uma reserva com recorrência vira uma reserva por ocorrência"""
+        response = self.client.post('/reservations/bulk', json=dict(
+            booking(space_id=3), recurrence={'frequency': 'daily', 'weekdays': [0, 1, 2, 3, 4], 'count': 10}))
+        assert response.get_json()['count'] == 10
+        period = self.client.get('/reservations?from=2026-05-04T00:00&to=2026-05-18T00:00&space_id=3').get_json()
+        assert [reservation['start_time'][:10] for reservation in period][-2:] == ['2026-05-14', '2026-05-15']
+
+    def test_invalid_requests(self):
+        """Corpo, item ou regra inválidos recebem 400 com o índice do item"""
+        assert self.client.post('/reservations/bulk', json={'reservations': []}).status_code == 400
+        response = self.client.post('/reservations/bulk', json={'reservations': [booking(), booking(start='amanhã')]})
+        assert response.status_code == 400
+        assert response.get_json()['index'] == 1
+        response = self.client.post('/reservations/bulk', json=dict(booking(), recurrence={'frequency': 'hourly'}))
+        assert response.status_code == 400
+        response = self.client.post('/reservations/bulk', json=dict(booking(), recurrence={
+            'frequency': 'daily', 'interval': 100000, 'until': '9999-12-31'}))
+        assert response.status_code == 400
+        response = self.client.post('/reservations/bulk', json=dict(booking(), recurrence={
+            'frequency': 'weekly', 'weekdays': 3, 'count': 2}))
+        assert response.status_code == 400
+        assert self.client.get('/reservations/1').status_code == 404
+
+
+class TestBulkJournal:
+    """O lote vai para o log num único registro"""
+
+    def test_batch_is_replayed(self, tmp_path):
+        """Depois de reabrir, o lote inteiro está de volta e os ids continuam depois dele"""
+        store = ReservationStore.open(Journal(str(tmp_path)))
+        batch = [({'user_id': 7, 'space_id': slot % 2, 'start_time': '', 'end_time': '', 'status': 'active',
+                   'total_price': 10.0}, slot * 10, slot * 10 + 5) for slot in range(6)]
+        assert store.create_many(batch) == ([1, 2, 3, 4, 5, 6], [])
+        store.journal.close()
+
+        reopened = ReservationStore.open(Journal(str(tmp_path)))
+        assert len(reopened) == 6
+        assert reopened.create_many(batch[:1])[1] == [{'index': 0, 'conflict_id': 1}]
+        assert reopened.create(dict(batch[0][0]), 100, 105)[0] == 7
+        reopened.journal.close()
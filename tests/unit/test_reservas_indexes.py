@@ -0,0 +1,45 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'ms-reservas'))
+
+from indexes import ReservationIndexes  # noqa: E402
+from tests.unit.test_reservas_intervals import booking, load_service  # noqa: E402
+
+
+class TestReservationIndexes:
+    """Testes dos índices secundários do ms-reservas"""
+
+    def test_update_moves_between_groups(self):
+        """Alterar um campo indexado move o id de grupo; grupos vazios somem"""
+        indexes = ReservationIndexes(('user_id', 'status'))
+        first = {'id': 1, 'user_id': 7, 'status': 'active'}
+        second = {'id': 2, 'user_id': 7, 'status': 'active'}
+        indexes.add(first)
+        indexes.add(second)
+
+        indexes.update(first, status='cancelled')
+
+        assert first['status'] == 'cancelled'
+        assert indexes.ids('user_id', 7) == [1, 2]
+        assert indexes.ids('status', 'active') == [2]
+        assert indexes.ids('status', 'cancelled') == [1]
+        indexes.update(second, status='cancelled')
+        assert 'active' not in indexes.indexes['status'].groups
+        assert indexes.count('status', 'cancelled') == 2
+
+    def test_user_and_status_lookups(self):
+        """GET /reservations/user/<id> e /admin/reservations?status= usam os índices"""
+        service = load_service()
+        client = service.app.test_client()
+        ids = [client.post('/reservations', json=booking(space_id=space_id, user_id=user_id)).get_json()['id']
+               for space_id, user_id in ((1, 7), (2, 8), (3, 7))]
+        client.delete(f'/reservations/{ids[0]}')
+
+        mine = client.get('/reservations/user/7').get_json()
+        assert [r['id'] for r in mine] == [ids[0], ids[2]]
+        assert mine[0]['status'] == 'cancelled'
+        assert client.get('/reservations/user/99').get_json() == []
+        active = client.get('/admin/reservations?status=active').get_json()
+        assert [r['id'] for r in active] == ids[1:]
+        assert len(client.get('/admin/reservations').get_json()) == 3
@@ -0,0 +1,104 @@
+import importlib.util
+import os
+import sys
+
+SERVICE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'ms-reservas')
+sys.path.insert(0, SERVICE_DIR)
+
+from intervals import IntervalIndex, SpaceSchedule, parse_time  # noqa: E402
+
+
+def load_service():
+    # O app.py do ms-reservas é carregado com outro nome: 'app' já é o gateway nesta sessão de testes
+    spec = importlib.util.spec_from_file_location('reservas_app', os.path.join(SERVICE_DIR, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def booking(space_id=1, start='2026-05-04T09:00:00', end='2026-05-04T11:00:00', user_id=7):
+    return {'user_id': user_id, 'space_id': space_id, 'start_time': start, 'end_time': end, 'total_price': 100.0}
+
+
+class TestSpaceSchedule:
+    """Testes do índice de intervalos por espaço"""
+
+    def test_detects_overlaps_and_allows_adjacent(self):
+        """Intervalos semiabertos: encostar no fim de outra reserva não é conflito"""
+        schedule = SpaceSchedule()
+        schedule.add(10, 20, 1)
+        schedule.add(30, 40, 2)
+
+        assert schedule.conflict(15, 25) == 1
+        assert schedule.conflict(25, 35) == 2
+        assert schedule.conflict(5, 50) == 2
+        assert schedule.conflict(12, 18) == 1
+        assert schedule.conflict(20, 30) is None
+        assert schedule.conflict(0, 10) is None
+
+    def test_remove_frees_the_slot(self):
+        """Cancelar tira a reserva do índice; espaços diferentes não interferem"""
+        index = IntervalIndex()
+        index.add(1, 10, 20, 1)
+        index.add(2, 10, 20, 2)
+        assert index.remove(1, 10, 1)
+        assert not index.remove(1, 10, 1)
+        assert index.conflict(1, 10, 20) is None
+        assert index.conflict(2, 10, 20) == 2
+
+    def test_parse_time_treats_naive_as_utc(self):
+        """Horário sem fuso é UTC; com fuso é convertido"""
+        assert parse_time('2026-05-04T09:00:00') == parse_time('2026-05-04T06:00:00-03:00')
+        assert parse_time('2026-05-04T09:00') == parse_time('2026-05-04T09:00:00Z')
+
+
+class TestReservationConflicts:
+    """Testes da recusa de reservas sobrepostas no POST /reservations"""
+
+    def setup_method(self):
+        self.service = load_service()
+        self.client = self.service.app.test_client()
+
+    def test_overlapping_booking_is_rejected(self):
+        """Reserva sobreposta a uma ativa do mesmo espaço recebe 409"""
+        first = self.client.post('/reservations', json=booking())
+        overlap = self.client.post('/reservations', json=booking(start='2026-05-04T10:00:00',
+                                                                 end='2026-05-04T12:00:00'))
+        other_space = self.client.post('/reservations', json=booking(space_id=2))
+        adjacent = self.client.post('/reservations', json=booking(start='2026-05-04T11:00:00',
+                                                                  end='2026-05-04T12:00:00'))
+
+        assert first.status_code == 201
+        assert overlap.status_code == 409
+        assert overlap.get_json()['conflict_id'] == first.get_json()['id']
+        assert other_space.status_code == 201
+        assert adjacent.status_code == 201
+
+    def test_cancelled_booking_frees_the_period(self):
+        """Depois do cancelamento o mesmo horário pode ser reservado de novo"""
+        reservation_id = self.client.post('/reservations', json=booking()).get_json()['id']
+        self.client.delete(f'/reservations/{reservation_id}')
+        self.client.delete(f'/reservations/{reservation_id}')
+        assert self.client.post('/reservations', json=booking()).status_code == 201
+
+    def test_invalid_period_is_rejected(self):
+        """Horário inválido ou fim antes do início recebe 400"""
+        assert self.client.post('/reservations', json=booking(start='amanhã')).status_code == 400
+        assert self.client.post('/reservations', json=booking(end='2026-05-04T08:00:00')).status_code == 400
+
+    def test_invalid_field_types_are_rejected(self):
+        """user_id e total_price de tipo errado recebem 400 e nada é gravado"""
+        for body in (booking(user_id={'id': 7}), booking(user_id='7'), dict(booking(), total_price='100')):
+            response = self.client.post('/reservations', json=body)
+            assert response.status_code == 400
+        assert self.client.post('/reservations', json=booking()).get_json()['id'] == 1
+
+    def test_space_id_must_be_an_integer(self):
+        """space_id em texto ou composto é recusado: não abre brecha para reservar o mesmo espaço duas vezes"""
+        assert self.client.post('/reservations', json=booking(space_id=1)).status_code == 201
+        for space_id in ('1', [1], {'id': 1}, True):
+            assert self.client.post('/reservations', json=booking(space_id=space_id)).status_code == 400
+        response = self.client.post('/reservations/bulk', json={'reservations': [booking(space_id=2),
+                                                                                 booking(space_id='1')]})
+        assert response.status_code == 400
+        assert response.get_json()['index'] == 1
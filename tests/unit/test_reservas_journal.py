@@ -0,0 +1,102 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'ms-reservas'))
+
+from journal import SEGMENT, SNAPSHOT, Journal  # noqa: E402
+from store import ReservationStore  # noqa: E402
+
+
+def reservation(space_id, user_id=7):
+    return {'user_id': user_id, 'space_id': space_id, 'start_time': '', 'end_time': '', 'status': 'active',
+            'total_price': 100.0}
+
+
+def state(store):
+    return store.all(), {space_id: list(schedule.ids) for space_id, schedule in store.schedules.spaces.items()}
+
+
+class TestReservationJournal:
+    """Testes do log de reservas: group commit, replay e snapshots"""
+
+    def test_restart_replays_creates_and_cancels(self, tmp_path):
+        """Depois de fechar e reabrir, o store volta igual e os ids continuam de onde pararam"""
+        store = ReservationStore.open(Journal(str(tmp_path)))
+        threads = [threading.Thread(target=lambda space_id=space_id: [
+            store.create(reservation(space_id), slot * 10, slot * 10 + 5) for slot in range(20)])
+            for space_id in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        store.cancel(3)
+        store.cancel(3)
+        before = state(store)
+        store.journal.close()
+
+        reopened = ReservationStore.open(Journal(str(tmp_path)))
+        assert state(reopened) == before
+        assert len(reopened) == 160
+        assert reopened.get(3)['status'] == 'cancelled'
+        assert reopened.find('status', 'cancelled') == [reopened.get(3)]
+        assert reopened.create(reservation(1), 0, 5)[0] is None
+        assert reopened.create(reservation(99), 0, 5) == (161, None)
+        reopened.journal.close()
+
+    def test_unindexable_reservation_never_reaches_the_log(self, tmp_path):
+        """Campo indexado que não serve de chave é recusado antes do log e da memória"""
+        store = ReservationStore.open(Journal(str(tmp_path), fsync='off'))
+        with pytest.raises(ValueError, match='user_id'):
+            store.create(reservation(1, user_id={'id': 7}), 0, 5)
+        with pytest.raises(ValueError, match='space_id'):
+            store.create_many([(reservation(2), 0, 5), (reservation([1]), 0, 5)])
+        assert len(store) == 0
+        assert store.create(reservation(1), 0, 5) == (1, None)
+        store.journal.close()
+
+        reopened = ReservationStore.open(Journal(str(tmp_path)))
+        assert len(reopened) == 1
+        reopened.journal.close()
+
+    def test_torn_tail_is_discarded(self, tmp_path):
+        """Linha final cortada por uma queda é descartada e o segmento, truncado"""
+        store = ReservationStore.open(Journal(str(tmp_path)))
+        store.create(reservation(1), 0, 5)
+        store.journal.close()
+        segment = tmp_path / SEGMENT.format(1)
+        size = segment.stat().st_size
+        with open(segment, 'ab') as log:
+            log.write(b'{"op":"cancel","i')
+
+        reopened = ReservationStore.open(Journal(str(tmp_path)))
+        assert reopened.get(1)['status'] == 'active'
+        assert segment.stat().st_size == size
+        reopened.journal.close()
+
+    def test_corruption_in_the_middle_is_an_error(self, tmp_path):
+        """Linha inválida no meio de um segmento não é tratada como queda"""
+        (tmp_path / SEGMENT.format(1)).write_bytes(b'{"op":"cancel","id":1}\nlixo\n{"op":"cancel","id":2}\n')
+        with pytest.raises(RuntimeError):
+            ReservationStore.open(Journal(str(tmp_path)))
+
+    def test_compaction_replaces_old_segments(self, tmp_path):
+        """O snapshot cobre os segmentos anteriores, que são apagados; o replay continua igual"""
+        store = ReservationStore.open(Journal(str(tmp_path), fsync='batch'))
+        for slot in range(30):
+            store.create(reservation(slot % 3), slot * 10, slot * 10 + 5)
+        store.cancel(2)
+        store.compact()
+        store.cancel(4)
+        store.create(reservation(1), 1000, 1005)
+        before = state(store)
+        store.journal.close()
+
+        assert sorted(os.listdir(tmp_path)) == ['LOCK', SEGMENT.format(2), SNAPSHOT]
+        reopened = ReservationStore.open(Journal(str(tmp_path)))
+        assert state(reopened) == before
+        assert [reopened.get(i)['status'] for i in (2, 4, 5)] == ['cancelled', 'cancelled', 'active']
+        reopened.journal.close()
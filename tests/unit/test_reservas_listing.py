@@ -0,0 +1,48 @@
+import json
+
+from tests.unit.test_reservas_intervals import booking, load_service
+
+
+class TestAdminReservationListing:
+    """Testes da listagem paginada e da exportação NDJSON de /admin/reservations"""
+
+    def setup_method(self):
+        self.client = load_service().app.test_client()
+        for day in range(1, 6):
+            self.client.post('/reservations', json=booking(space_id=day % 2, start=f'2026-05-0{day}T09:00:00',
+                                                          end=f'2026-05-0{day}T10:00:00'))
+        self.client.delete('/reservations/2')
+
+    def test_pages_follow_the_cursor(self):
+        """Cada página traz X-Next-Cursor e Link até a última, sem repetir nem pular reservas"""
+        seen, url = [], '/admin/reservations?limit=2'
+        while url:
+            response = self.client.get(url)
+            seen.append([reservation['id'] for reservation in response.get_json()])
+            link = response.headers.get('Link')
+            url = link[1:link.index('>')] if link else None
+        assert seen == [[1, 2], [3, 4], [5]]
+        assert self.client.get('/admin/reservations?limit=2&cursor=4').headers.get('X-Next-Cursor') is None
+
+    def test_filters(self):
+        """status, space_id e intervalo de datas do início combinam entre si"""
+        def ids(query):
+            return [reservation['id'] for reservation in self.client.get(f'/admin/reservations?{query}').get_json()]
+
+        assert ids('status=cancelled') == [2]
+        assert ids('space_id=1') == [1, 3, 5]
+        assert ids('space_id=1&status=active&limit=1&cursor=1') == [3]
+        assert ids('from=2026-05-02T00:00&to=2026-05-04T00:00') == [2, 3]
+        assert ids('status=active&from=2026-05-02T00:00') == [3, 4, 5]
+
+    def test_invalid_parameters(self):
+        """Parâmetros inválidos recebem 400"""
+        for query in ('cursor=abc', 'status=pending', 'space_id=x', 'from=ontem', 'limit=dez'):
+            assert self.client.get(f'/admin/reservations?{query}').status_code == 400
+
+    def test_ndjson_export_streams_everything(self):
+        """format=ndjson ignora o tamanho da página e envia uma reserva por linha, em streaming"""
+        response = self.client.get('/admin/reservations?format=ndjson&limit=1&status=active')
+        assert response.is_streamed
+        assert response.mimetype == 'application/x-ndjson'
+        assert [json.loads(line)['id'] for line in response.data.splitlines()] == [1, 3, 4, 5]
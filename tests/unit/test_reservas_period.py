@@ -0,0 +1,83 @@
+import random
+
+from tests.unit.test_reservas_intervals import booking, load_service
+
+from intervals import HOUR, TimeIndex, duration_class
+
+
+class TestTimeIndex:
+    """Testes do índice por início usado nas consultas por período"""
+
+    def test_matches_a_linear_scan(self):
+        """Durações variadas e sobreposições: igual a filtrar tudo, com o índice montado aos poucos ou de uma vez"""
+        generator = random.Random(7)
+        rows = []
+        for reservation_id in range(1, 2001):
+            start = generator.randrange(0, 50000)
+            duration = generator.choice((1, 5, 30, 400, 5000, 7200, 10 ** 8))
+            rows.append((generator.randrange(3), start, start + duration, reservation_id))
+        incremental = TimeIndex()
+        for space_id, start, end, reservation_id in rows:
+            incremental.add(space_id, start, end, reservation_id)
+        built = TimeIndex.build([(start, reservation_id, end, space_id) for space_id, start, end, reservation_id in rows])
+
+        for _ in range(200):
+            start = generator.randrange(-50, 52000)
+            end = start + generator.randrange(1, 300)
+            space_id = generator.choice((None, 0, 1, 2, 9))
+            expected = sorted((row_start, row_id) for row_space, row_start, row_end, row_id in rows
+                              if row_start < end and row_end > start and space_id in (None, row_space))
+            expected = [row_id for _, row_id in expected]
+            assert incremental.overlapping(start, end, space_id) == expected
+            assert built.overlapping(start, end, space_id) == expected
+
+    def test_long_booking_does_not_widen_short_lookups(self):
+        """Uma reserva de anos fica na sua classe de duração: a janela das reservas de 1 h não cresce"""
+        index = TimeIndex()
+        for slot in range(100):
+            index.add(1, slot * HOUR, slot * HOUR + HOUR, slot + 1)
+        index.add(1, 0, 5 * 365 * 24 * HOUR, 101)
+        assert index.everything.classes[duration_class(0, HOUR)].longest == HOUR
+        assert index.overlapping(50 * HOUR, 50 * HOUR + 1) == [101, 51]
+        assert len(index.everything) == 101
+
+    def test_half_open_bounds(self):
+        """Reserva que termina em `from` ou começa em `to` fica de fora"""
+        index = TimeIndex()
+        index.add(1, 10, 20, 1)
+        assert index.overlapping(20, 30) == []
+        assert index.overlapping(0, 10) == []
+        assert index.overlapping(19, 21) == [1]
+
+
+class TestReservationPeriodQuery:
+    """Testes do GET /reservations?from=&to="""
+
+    def setup_method(self):
+        self.client = load_service().app.test_client()
+        self.client.post('/reservations', json=booking(space_id=1, start='2026-05-04T08:00', end='2026-05-04T18:00'))
+        self.client.post('/reservations', json=booking(space_id=2, start='2026-05-04T09:00', end='2026-05-04T10:00'))
+        self.client.post('/reservations', json=booking(space_id=2, start='2026-05-04T12:00', end='2026-05-04T13:00'))
+        self.client.post('/reservations', json=booking(space_id=2, start='2026-05-05T09:00', end='2026-05-05T10:00'))
+        self.client.delete('/reservations/3')
+
+    def ids(self, query):
+        response = self.client.get(f'/reservations?{query}')
+        assert response.status_code == 200
+        return [reservation['id'] for reservation in response.get_json()]
+
+    def test_returns_overlapping_reservations_by_start(self):
+        """Inclui a reserva longa que começou antes de `from`; filtra por espaço e status"""
+        assert self.ids('from=2026-05-04T09:30&to=2026-05-04T12:30') == [1, 2, 3]
+        assert self.ids('from=2026-05-04T09:30&to=2026-05-04T12:30&space_id=2') == [2, 3]
+        assert self.ids('from=2026-05-04T09:30&to=2026-05-04T12:30&status=active') == [1, 2]
+        assert self.ids('from=2026-05-04T18:00&to=2026-05-05T09:00') == []
+        assert self.ids('from=2026-05-04T00:00&to=2026-05-06T00:00&space_id=5') == []
+
+    def test_invalid_parameters(self):
+        """from/to ausentes ou inválidos, período vazio, espaço ou status inválidos recebem 400"""
+        for query in ('', 'from=2026-05-04T09:00', 'from=ontem&to=2026-05-04T09:00',
+                      'from=2026-05-04T10:00&to=2026-05-04T09:00',
+                      'from=2026-05-04T09:00&to=2026-05-04T10:00&space_id=x',
+                      'from=2026-05-04T09:00&to=2026-05-04T10:00&status=pending'):
+            assert self.client.get(f'/reservations?{query}').status_code == 400
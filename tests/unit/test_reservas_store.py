@@ -0,0 +1,74 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'ms-reservas'))
+
+from store import ReservationStore  # noqa: E402
+
+
+def reservation(space_id, user_id=7):
+    return {'user_id': user_id, 'space_id': space_id, 'start_time': '', 'end_time': '', 'status': 'active',
+            'total_price': 100.0}
+
+
+def run_threads(count, target):
+    barrier = threading.Barrier(count)
+
+    def worker(index):
+        barrier.wait()
+        target(index)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class TestReservationStore:
+    """Testes do store de reservas sob concorrência"""
+
+    def setup_method(self):
+        self.interval = sys.getswitchinterval()
+        # Trocas de thread frequentes aumentam as chances de expor uma corrida
+        sys.setswitchinterval(1e-6)
+
+    def teardown_method(self):
+        sys.setswitchinterval(self.interval)
+
+    def test_concurrent_creates_get_unique_ids(self):
+        """Criações simultâneas em espaços e horários livres: nenhuma se perde"""
+        store = ReservationStore()
+        created = []
+
+        def create(index):
+            for slot in range(50):
+                created.append(store.create(reservation(index % 4, user_id=index), slot * 10, slot * 10 + 5)[0])
+
+        run_threads(16, create)
+
+        # 4 espaços x 50 horários, com 4 threads disputando cada espaço
+        winners = [reservation_id for reservation_id in created if reservation_id is not None]
+        assert len(winners) == len(set(winners)) == len(store) == 200
+        assert sorted(winners) == list(range(1, 201))
+        assert sum(store.indexes.count('user_id', user) for user in range(16)) == 200
+
+    def test_same_slot_has_a_single_winner(self):
+        """Muitas threads pedindo o mesmo horário: só uma reserva, as outras veem o conflito"""
+        store = ReservationStore()
+        results = []
+        run_threads(32, lambda index: results.append(store.create(reservation(1), 0, 10)))
+
+        winners = [reservation_id for reservation_id, _ in results if reservation_id is not None]
+        assert len(winners) == 1
+        assert {conflict_id for _, conflict_id in results if conflict_id is not None} == set(winners)
+
+    def test_cancel_frees_the_slot(self):
+        """Cancelar libera o horário e move a reserva no índice de status"""
+        store = ReservationStore()
+        reservation_id, _ = store.create(reservation(1), 0, 10)
+        assert store.cancel(reservation_id)['status'] == 'cancelled'
+        assert store.cancel(999) is None
+        assert store.find('status', 'cancelled')[0]['id'] == reservation_id
+        assert store.create(reservation(1), 0, 10) == (2, None)
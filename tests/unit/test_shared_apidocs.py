@@ -0,0 +1,83 @@
+import json
+import os
+import sys
+
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from shared.apidocs import build, setup_apidocs  # noqa: E402
+
+SERVICE = '''
+from flask import Flask, jsonify
+from shared.apidocs import setup_apidocs
+
+app = Flask(__name__)
+swagger = setup_apidocs(app, mode='live')
+
+
+@app.route('/rooms')
+def list_rooms():
+    """
+    Listar salas
+    ---
+    tags:
+      - Salas
+    responses:
+      200:
+        description: Lista de salas
+    """
+    return jsonify([])
+'''
+
+
+def static_app(tmp_path, mode='static'):
+    app = Flask('static_docs', root_path=str(tmp_path))
+
+    @app.route('/health')
+    def health():
+        return {'status': 'healthy'}
+
+    return app, setup_apidocs(app, mode=mode)
+
+
+class TestApiDocs:
+    """Testes da spec pré-gerada e dos modos de documentação"""
+
+    def test_build_writes_spec_from_docstrings(self, tmp_path):
+        """O build importa o serviço e grava a spec montada pelo flasgger"""
+        (tmp_path / 'app.py').write_text(SERVICE)
+        output, paths = build(str(tmp_path))
+
+        spec = json.loads((tmp_path / 'apispec.json').read_text())
+        assert output == str(tmp_path / 'apispec.json') and paths == 1
+        assert spec['paths']['/rooms']['get']['summary'] == 'Listar salas'
+
+    def test_static_mode_serves_prebuilt_spec(self, tmp_path):
+        """No modo static a spec vem do arquivo, com ETag, e o Swagger UI aponta para ela"""
+        (tmp_path / 'apispec.json').write_text(json.dumps({'info': {'title': 'Salas'}, 'paths': {}}))
+        app, swagger = static_app(tmp_path)
+        client = app.test_client()
+
+        response = client.get('/apispec_1.json')
+        assert swagger is None
+        assert response.get_json()['info']['title'] == 'Salas'
+        assert client.get('/apispec_1.json', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+        page = client.get('/apidocs/').get_data(as_text=True)
+        assert '<title>Salas</title>' in page and 'url: "/apispec_1.json"' in page
+        assert client.get('/flasgger_static/swagger-ui-bundle.js').status_code == 200
+
+    def test_static_mode_without_spec_falls_back_to_live(self, tmp_path):
+        """Sem o arquivo gerado, a documentação continua disponível pelo flasgger"""
+        app, swagger = static_app(tmp_path)
+        assert swagger is not None
+        assert app.test_client().get('/apispec_1.json').status_code == 200
+
+    def test_off_mode_registers_nothing(self, tmp_path):
+        """No modo off não há rotas de documentação"""
+        app, swagger = static_app(tmp_path, mode='off')
+        client = app.test_client()
+        assert swagger is None
+        assert client.get('/apispec_1.json').status_code == 404
+        assert client.get('/apidocs/').status_code == 404
@@ -0,0 +1,84 @@
+import gzip
+import os
+import sys
+
+import pytest
+from flask import Flask, Response, jsonify
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from shared.compression import choose_encoding, compress_responses  # noqa: E402
+
+brotli = pytest.importorskip('brotli')
+
+ROWS = [{'id': index, 'space': f'Sala {index}', 'status': 'confirmed'} for index in range(100)]
+
+
+def make_app(closed=None):
+    app = Flask('compression')
+    compress_responses(app)
+
+    @app.route('/rows')
+    def rows():
+        return jsonify(ROWS)
+
+    @app.route('/small')
+    def small():
+        return jsonify({'status': 'healthy'})
+
+    @app.route('/stream')
+    def stream():
+        def body():
+            try:
+                for index in range(50):
+                    yield f'{{"id": {index}, "status": "confirmed"}}\n'.encode()
+            finally:
+                closed.append(True)
+        return Response(body(), mimetype='application/x-ndjson')
+
+    return app
+
+
+class TestCompression:
+    """Testes da compressão negociada de respostas"""
+
+    def test_choose_encoding(self):
+        """Prefere brotli, respeita q e q=0, e não comprime sem Accept-Encoding"""
+        assert choose_encoding('gzip, deflate, br') == 'br'
+        assert choose_encoding('br;q=0, gzip') == 'gzip'
+        assert choose_encoding('gzip;q=0.8, br;q=0.2') == 'gzip'
+        assert choose_encoding('*') == 'br'
+        assert choose_encoding('identity') is None
+        assert choose_encoding('') is None
+
+    def test_large_response_is_compressed(self):
+        """Resposta acima do limite sai comprimida e com Vary"""
+        client = make_app().test_client()
+        plain = client.get('/rows')
+        gzipped = client.get('/rows', headers={'Accept-Encoding': 'gzip'})
+        brotlied = client.get('/rows', headers={'Accept-Encoding': 'br, gzip'})
+
+        assert 'Content-Encoding' not in plain.headers
+        assert plain.headers['Vary'] == 'Accept-Encoding'
+        assert gzipped.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(gzipped.data) == plain.data
+        assert brotli.decompress(brotlied.data) == plain.data
+        assert int(brotlied.headers['Content-Length']) == len(brotlied.data) < len(plain.data)
+
+    def test_small_response_is_left_alone(self):
+        """Corpo abaixo do limite não compensa a compressão"""
+        response = make_app().test_client().get('/small', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+        assert response.get_json() == {'status': 'healthy'}
+
+    def test_streamed_response_is_compressed_in_chunks(self):
+        """Resposta em blocos é comprimida sem buffer e o gerador original é encerrado"""
+        closed = []
+        client = make_app(closed).test_client()
+        response = client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in response.headers
+        lines = gzip.decompress(response.data).splitlines()
+        assert len(lines) == 50 and lines[-1] == b'{"id": 49, "status": "confirmed"}'
+        assert closed == [True]
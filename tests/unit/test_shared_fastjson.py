@@ -0,0 +1,70 @@
+import datetime
+import decimal
+import json
+import os
+import sys
+import uuid
+from dataclasses import dataclass
+
+from flask import Flask, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from shared.fastjson import dumps, loads, use_fast_json  # noqa: E402
+
+
+@dataclass
+class Slot:
+    space_id: int
+    start: datetime.datetime
+
+
+def make_app():
+    app = Flask('fastjson')
+    use_fast_json(app)
+
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        return jsonify(request.get_json())
+
+    return app
+
+
+class TestFastJson:
+    """Testes do provider JSON compartilhado pelos serviços"""
+
+    def test_output_matches_default_provider(self):
+        """Mesmo documento que o provider padrão do Flask: chaves ordenadas, datas HTTP, UUID, Decimal"""
+        document = {
+            'z': 1, 'a': [1.5, None, True, 'reunião'],
+            'when': datetime.datetime(2026, 5, 4, 9, 30), 'day': datetime.date(2026, 5, 4),
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'), 'price': decimal.Decimal('10.50'),
+            'slot': Slot(3, datetime.datetime(2026, 5, 4, 10, 0))
+        }
+        default = DefaultJSONProvider(Flask('default'))
+        assert json.loads(dumps(document)) == json.loads(default.dumps(document))
+        assert list(json.loads(dumps(document))) == sorted(document)
+
+    def test_falls_back_for_values_orjson_rejects(self):
+        """Inteiros acima de 64 bits e NaN continuam funcionando pelo json da biblioteca padrão"""
+        assert loads(dumps({'big': 2 ** 70})) == {'big': 2 ** 70}
+        assert loads('{"value": NaN}')['value'] != loads('{"value": NaN}')['value']
+        assert loads(b'{"id": 1}') == {'id': 1}
+
+    def test_request_and_response_use_provider(self):
+        """jsonify e get_json passam pelo provider; JSON inválido continua recebendo 400"""
+        client = make_app().test_client()
+        response = client.post('/echo', json={'b': 2, 'a': 1})
+        assert response.get_data() == b'{"a":1,"b":2}\n'
+        assert response.mimetype == 'application/json'
+
+        invalid = client.post('/echo', data='{', content_type='application/json')
+        assert invalid.status_code == 400
+
+    def test_debug_mode_indents(self):
+        """Em modo debug a resposta sai indentada, como no provider padrão"""
+        app = make_app()
+        app.debug = True
+        response = app.test_client().post('/echo', json={'a': 1})
+        assert response.get_data() == b'{\n  "a": 1\n}\n'
@@ -0,0 +1,95 @@
+import os
+import sys
+import threading
+from unittest.mock import Mock
+
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'api-gateway'))
+
+from shared.metrics import Registry, instrument, registry  # noqa: E402
+from upstream import ServicePool  # noqa: E402
+
+
+class TestMetricsRegistry:
+    """Testes dos contadores por thread e da exposição no formato Prometheus"""
+
+    def test_counters_from_all_threads_are_summed(self):
+        """Contadores de threads vivas e já encerradas entram na coleta"""
+        metrics = Registry()
+        threads = [threading.Thread(target=lambda: [metrics.inc('hits', (('route', '/x'),)) for _ in range(1000)])
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        metrics.inc('hits', (('route', '/x'),))
+
+        counters, _ = metrics.collect()
+        assert counters[('hits', (('route', '/x'),))] == 8001
+        # As threads encerradas foram consolidadas e não ficam mais na lista
+        assert len(metrics._shards) == 1
+
+    def test_dead_threads_are_folded_without_collect(self):
+        """Sem coleta, os shards de threads encerradas não se acumulam e nada se perde"""
+        metrics = Registry(prune_every=4)
+        for _ in range(50):
+            thread = threading.Thread(target=metrics.inc, args=('hits', ()))
+            thread.start()
+            thread.join()
+
+        assert len(metrics._shards) < 4
+        assert metrics.collect()[0][('hits', ())] == 50
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Histograma exposto com buckets cumulativos, soma e contagem"""
+        metrics = Registry(buckets=(0.01, 0.1, 1.0))
+        metrics.describe('latency', 'histogram', 'Latência')
+        for seconds in (0.005, 0.05, 0.05, 2.0):
+            metrics.observe('latency', (('route', '/x'),), seconds)
+
+        text = metrics.render()
+        assert '# TYPE latency histogram' in text
+        assert 'latency_bucket{route="/x",le="0.01"} 1' in text
+        assert 'latency_bucket{route="/x",le="0.1"} 3' in text
+        assert 'latency_bucket{route="/x",le="1.0"} 3' in text
+        assert 'latency_bucket{route="/x",le="+Inf"} 4' in text
+        assert 'latency_count{route="/x"} 4' in text
+        assert 'latency_sum{route="/x"} 2.105' in text
+
+    def test_flask_app_records_route_template_and_status(self):
+        """Rotas são rotuladas pelo template, não pelo caminho com IDs"""
+        app = Flask('metrics_test_app')
+        instrument(app, 'ms-teste')
+
+        @app.route('/items/<int:item_id>')
+        def item(item_id):
+            return {'id': item_id}, 200 if item_id < 10 else 404
+
+        client = app.test_client()
+        client.get('/items/1')
+        client.get('/items/2')
+        client.get('/items/99')
+        text = client.get('/metrics').data.decode()
+
+        labels = 'service="ms-teste",method="GET",route="/items/<int:item_id>"'
+        assert f'http_requests_total{{{labels},status="200"}} 2' in text
+        assert f'http_requests_total{{{labels},status="404"}} 1' in text
+        assert f'http_request_duration_seconds_count{{{labels}}} 3' in text
+        assert 'http_requests_in_flight{service="ms-teste"} 0' in text
+
+    def test_gateway_pool_reports_upstream_latency(self):
+        """Cada chamada do gateway a um microsserviço é observada com o status obtido"""
+        calls = []
+        pool = ServicePool('ms-teste', 'http://upstream', observer=lambda *args: calls.append(args))
+        pool.session.request = Mock(return_value=Mock(status_code=503))
+        pool.request('GET', '/x')
+        pool.session.request = Mock(side_effect=ConnectionError('refused'))
+        try:
+            pool.request('GET', '/x')
+        except ConnectionError:
+            pass
+
+        assert [(name, status) for name, status, _ in calls] == [('ms-teste', 503), ('ms-teste', 'error')]
+        assert registry.descriptions['upstream_request_duration_seconds'][0] == 'histogram'
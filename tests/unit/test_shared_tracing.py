@@ -0,0 +1,102 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'api-gateway'))
+
+from shared.tracing import (BatchExporter, Tracer, breakdown, client_span, current_span, parse_traceparent,  # noqa: E402
+                            trace_requests)
+from batch import run_bounded  # noqa: E402
+from upstream import ServicePool  # noqa: E402
+
+INCOMING = '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01'
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span.to_dict())
+
+
+class TestTracing:
+    """Testes da propagação do traceparent e dos spans por salto"""
+
+    def test_parse_traceparent(self):
+        """Só cabeçalhos W3C bem formados continuam um trace"""
+        assert parse_traceparent(INCOMING) == ('0af7651916cd43dd8448eb211c80319c', 'b7ad6b7169203331', True)
+        assert parse_traceparent('00-xyz-b7ad6b7169203331-01') is None
+        assert parse_traceparent('00-' + '0' * 32 + '-b7ad6b7169203331-01') is None
+        assert parse_traceparent(None) is None
+
+    def test_server_span_continues_incoming_trace(self):
+        """Span de servidor herda o trace recebido e os spans do handler ficam abaixo dele"""
+        exporter = ListExporter()
+        app = Flask('tracing_test_app')
+        trace_requests(app, 'ms-teste', exporter)
+
+        @app.route('/items/<int:item_id>')
+        def item(item_id):
+            with client_span('ms-outro', 'GET', '/outro') as headers:
+                return {'traceparent': headers['traceparent']}
+
+        response = app.test_client().get('/items/1', headers={'traceparent': INCOMING})
+
+        client, server = exporter.spans
+        assert response.headers['X-Trace-Id'] == '0af7651916cd43dd8448eb211c80319c'
+        assert server['name'] == 'GET /items/<int:item_id>'
+        assert server['parent_id'] == 'b7ad6b7169203331'
+        assert server['attributes']['status'] == 200
+        assert client['parent_id'] == server['span_id']
+        assert client['kind'] == 'client'
+        assert response.json['traceparent'] == f"00-{server['trace_id']}-{client['span_id']}-01"
+        assert current_span() is None
+
+    def test_gateway_pool_propagates_trace(self):
+        """Chamada do gateway leva o traceparent do span de espera, substituindo o do cliente"""
+        exporter = ListExporter()
+        tracer = Tracer('api-gateway', exporter)
+        pool = ServicePool('ms-teste', 'http://upstream', span=client_span)
+        pool.session.request = Mock(return_value=Mock(status_code=200))
+
+        with tracer.span('GET /spaces', 'server') as root:
+            pool.request('GET', '/spaces', headers={'Traceparent': INCOMING, 'Authorization': 'Bearer x'})
+
+        headers = pool.session.request.call_args.kwargs['headers']
+        wait = exporter.spans[0]
+        assert headers == {'Authorization': 'Bearer x', 'traceparent': f'00-{root.trace_id}-{wait["span_id"]}-01'}
+        assert wait['parent_id'] == root.span_id
+        assert wait['attributes'] == {'upstream': 'ms-teste'}
+
+    def test_batch_tasks_keep_request_trace(self):
+        """Sub-requests executados no pool de threads continuam no trace da requisição"""
+        tracer = Tracer('api-gateway')
+        with ThreadPoolExecutor(max_workers=2) as executor, tracer.span('POST /batch', 'server') as root:
+            seen = run_bounded(executor, [current_span, current_span, current_span], limit=2)
+        assert seen == [root, root, root]
+
+    def test_breakdown_reports_own_time(self):
+        """Relatório desconta o tempo dos filhos para mostrar onde o tempo ficou"""
+        spans = [
+            {'span_id': 'a', 'parent_id': None, 'start': 0, 'duration_ms': 100.0},
+            {'span_id': 'b', 'parent_id': 'a', 'start': 1, 'duration_ms': 60.0},
+            {'span_id': 'c', 'parent_id': 'b', 'start': 2, 'duration_ms': 45.0},
+        ]
+        rows = [(depth, span['span_id'], own) for depth, span, own in breakdown(spans)]
+        assert rows == [(0, 'a', 40.0), (1, 'b', 15.0), (2, 'c', 45.0)]
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires os.fork')
+    def test_exporter_restarts_after_fork(self):
+        """Worker criado por fork (preload do gunicorn) volta a ter a thread de envio"""
+        exporter = BatchExporter(lambda batch: None, interval=0.01)
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if exporter._thread.is_alive() else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0